@@ -0,0 +1,120 @@
+# infra/cache.py
+"""
+Cache de leituras versionado por tabela.
+
+Cada tabela tem um contador de versão em memória, incrementado pelos
+repositórios depois de todo INSERT/UPDATE/DELETE confirmado (invalidar). As
+funções de serviço decoradas com cache_por_tabelas usam st.cache_data com as
+versões das tabelas de que dependem como parte da chave: reruns reaproveitam o
+resultado até que uma dessas tabelas mude.
+
+A versão é lida antes da consulta e incrementada depois do commit, então uma
+sessão sempre lê a própria escrita e um resultado antigo nunca fica guardado
+sob a versão nova. Escritas feitas fora deste processo só aparecem depois do
+TTL (CACHE_TTL_SEGUNDOS, padrão 300).
+"""
+
+import functools
+import os
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+import streamlit as st
+
+_versoes: Dict[str, int] = {}
+_estatisticas: Dict[str, Dict[str, int]] = {}
+_lock = threading.Lock()
+_execucoes = threading.local()
+
+
+def versoes(*tabelas: str) -> Tuple[int, ...]:
+    """
+    Retorna a versão atual de cada tabela.
+
+    Args:
+        *tabelas (str): Nomes das tabelas.
+
+    Returns:
+        Tuple[int, ...]: Versões na mesma ordem.
+    """
+    with _lock:
+        return tuple(_versoes.get(t, 0) for t in tabelas)
+
+
+def invalidar(*tabelas: str) -> None:
+    """
+    Incrementa a versão das tabelas alteradas. Chamar depois do commit.
+
+    Args:
+        *tabelas (str): Nomes das tabelas.
+    """
+    with _lock:
+        for t in tabelas:
+            _versoes[t] = _versoes.get(t, 0) + 1
+
+
+def ttl_padrao() -> int:
+    """Tempo máximo de vida de um resultado em cache (CACHE_TTL_SEGUNDOS)."""
+    return int(os.getenv("CACHE_TTL_SEGUNDOS", "300"))
+
+
+def cache_por_tabelas(*tabelas: str, ttl: Optional[int] = None, max_entries: int = 64) -> Callable:
+    """
+    Decorador que guarda o resultado da função até que uma das tabelas mude.
+
+    Args:
+        *tabelas (str): Tabelas lidas pela função.
+        ttl (Optional[int]): Segundos de validade (padrão CACHE_TTL_SEGUNDOS).
+            Use um valor menor em funções que dependem do horário atual.
+        max_entries (int): Quantidade máxima de resultados guardados.
+
+    Returns:
+        Callable: Decorador. A função original fica em __wrapped__.
+    """
+    def decorador(func: Callable) -> Callable:
+        nome = f"{func.__module__}.{func.__qualname__}"
+
+        def _carregar(versao_tabelas, *args, **kwargs):
+            _execucoes.pilha[-1] = True
+            return func(*args, **kwargs)
+
+        # st.cache_data identifica a função pelo módulo/qualname: sem isso, todas
+        # as funções decoradas dividiriam o mesmo cache.
+        _carregar.__module__ = func.__module__
+        _carregar.__qualname__ = f"{func.__qualname__}__cache"
+        carregar = st.cache_data(
+            ttl=ttl if ttl is not None else ttl_padrao(),
+            max_entries=max_entries,
+            show_spinner=False
+        )(_carregar)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            pilha = getattr(_execucoes, "pilha", None)
+            if pilha is None:
+                pilha = _execucoes.pilha = []
+            pilha.append(False)
+            try:
+                resultado = carregar(versoes(*tabelas), *args, **kwargs)
+            finally:
+                executou = pilha.pop()
+            with _lock:
+                item = _estatisticas.setdefault(nome, {"hits": 0, "misses": 0})
+                item["misses" if executou else "hits"] += 1
+            return resultado
+
+        wrapper.limpar = carregar.clear
+        return wrapper
+
+    return decorador
+
+
+def estatisticas_cache() -> Dict[str, Dict[str, int]]:
+    """
+    Retorna os acertos e falhas de cache de cada função decorada.
+
+    Returns:
+        Dict[str, Dict[str, int]]: Função -> {"hits": int, "misses": int}.
+    """
+    with _lock:
+        return {nome: dict(item) for nome, item in _estatisticas.items()}
@@ -0,0 +1,340 @@
+# infra/consultas_lentas.py
+"""
+Log de consultas lentas com captura automática do plano de execução.
+
+Com CONSULTAS_LENTAS_MS definido, as conexões do pool usam o
+CursorInstrumentado e todo comando que passar desse limite é gravado como uma
+linha JSON em CONSULTAS_LENTAS_ARQUIVO (padrão: logs/consultas_lentas.jsonl),
+com rotação por tamanho. Como no painel de consultas, os parâmetros são
+gravados apenas pelos tipos, nunca pelos valores.
+
+Para cada consulta normalizada (literais e parâmetros trocados por ?), uma
+thread em segundo plano executa EXPLAIN (ANALYZE, BUFFERS) em uma conexão
+própria, fora do pool, e grava o plano no mesmo arquivo. Só SELECTs são
+explicados, dentro de uma transação READ ONLY desfeita em seguida e com
+statement_timeout; a mesma consulta é explicada no máximo uma vez a cada
+CONSULTAS_LENTAS_EXPLAIN_INTERVALO segundos. O texto do plano pode conter os
+valores usados na execução.
+
+Variáveis:
+- CONSULTAS_LENTAS_MS: limite em ms (não definido ou 0: desligado)
+- CONSULTAS_LENTAS_ARQUIVO: caminho do arquivo
+- CONSULTAS_LENTAS_MAX_MB / CONSULTAS_LENTAS_BACKUPS: rotação (padrão 5 MB / 5 arquivos)
+- CONSULTAS_LENTAS_EXPLAIN: 0 desliga a captura dos planos
+- CONSULTAS_LENTAS_EXPLAIN_INTERVALO: segundos entre planos da mesma consulta (padrão 3600)
+- CONSULTAS_LENTAS_EXPLAIN_TIMEOUT_MS: statement_timeout do EXPLAIN (padrão 30000)
+
+O relatório agrupado fica em scripts/run.py (studio-consultas-lentas).
+"""
+
+import json
+import logging
+import os
+import queue
+import re
+import statistics
+import threading
+import time
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+_logger: Optional[logging.Logger] = None
+_logger_lock = threading.Lock()
+
+_fila: "queue.Queue[tuple]" = queue.Queue(maxsize=100)
+_explicadas: Dict[str, float] = {}  # consulta normalizada -> momento do último EXPLAIN
+_explicadas_lock = threading.Lock()
+_worker: Optional[threading.Thread] = None
+
+_LITERAL_TEXTO = re.compile(r"'(?:[^']|'')*'")
+_NUMERO = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+_PARAMETRO = re.compile(r"%(?:\(\w+\))?s")
+_LISTA = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)")
+_VALUES = re.compile(r"(VALUES\s*\(\.\.\.\))(?:\s*,\s*\(\.\.\.\))+", re.IGNORECASE)
+_SET_INICIAL = re.compile(r"^\s*(?:SET\s[^;]*;\s*)+", re.IGNORECASE)
+_SO_LEITURA = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+_ESCRITA = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE)\b|\bFOR\s+(UPDATE|SHARE)\b", re.IGNORECASE)
+
+
+def limite_ms() -> Optional[float]:
+    """
+    Retorna o limite a partir do qual um comando é considerado lento.
+
+    Returns:
+        Optional[float]: Limite em ms (CONSULTAS_LENTAS_MS), ou None se desligado.
+    """
+    valor = float(os.getenv("CONSULTAS_LENTAS_MS", "0") or 0)
+    return valor if valor > 0 else None
+
+
+def ativo() -> bool:
+    """Indica se o log de consultas lentas está ligado."""
+    return limite_ms() is not None
+
+
+def arquivo() -> Path:
+    """Arquivo do log de consultas lentas (CONSULTAS_LENTAS_ARQUIVO)."""
+    return Path(os.getenv("CONSULTAS_LENTAS_ARQUIVO", "logs/consultas_lentas.jsonl"))
+
+
+def normalizar(sql: str) -> str:
+    """
+    Normaliza o texto de um comando para agrupar execuções da mesma consulta.
+
+    Literais, números e parâmetros viram ?, listas IN (?, ?, ...) e lotes de
+    VALUES viram (...), e os espaços são colapsados.
+
+    Args:
+        sql (str): Comando SQL.
+
+    Returns:
+        str: Texto normalizado.
+    """
+    texto = " ".join(sql.split())
+    texto = _LITERAL_TEXTO.sub("?", texto)
+    texto = _PARAMETRO.sub("?", texto)
+    texto = _NUMERO.sub("?", texto)
+    texto = _LISTA.sub("(...)", texto)
+    return _VALUES.sub(r"\1", texto)
+
+
+def _obter_logger() -> logging.Logger:
+    global _logger
+    if _logger is None:
+        with _logger_lock:
+            if _logger is None:
+                caminho = arquivo()
+                caminho.parent.mkdir(parents=True, exist_ok=True)
+                handler = RotatingFileHandler(
+                    caminho,
+                    maxBytes=int(float(os.getenv("CONSULTAS_LENTAS_MAX_MB", "5")) * 2**20),
+                    backupCount=int(os.getenv("CONSULTAS_LENTAS_BACKUPS", "5")),
+                    encoding="utf-8"
+                )
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                logger = logging.getLogger("studio.consultas_lentas")
+                logger.setLevel(logging.INFO)
+                logger.propagate = False
+                logger.addHandler(handler)
+                _logger = logger
+    return _logger
+
+
+def _gravar(registro: dict) -> None:
+    registro = {"em": datetime.now().isoformat(timespec="milliseconds"), "pid": os.getpid(), **registro}
+    _obter_logger().info(json.dumps(registro, ensure_ascii=False, default=str))
+
+
+def _explicavel(sql: str) -> bool:
+    return bool(_SO_LEITURA.match(sql)) and ";" not in sql.rstrip().rstrip(";") and not _ESCRITA.search(sql)
+
+
+def _reservar_explain(consulta: str) -> bool:
+    """Marca a consulta como explicada agora, se o intervalo desde o último plano já passou."""
+    intervalo = float(os.getenv("CONSULTAS_LENTAS_EXPLAIN_INTERVALO", "3600"))
+    agora = time.monotonic()
+    with _explicadas_lock:
+        ultimo = _explicadas.get(consulta)
+        if ultimo is not None and agora - ultimo < intervalo:
+            return False
+        _explicadas[consulta] = agora
+        return True
+
+
+def verificar(
+    cursor,
+    sql,
+    parametros,
+    duracao_ms: float,
+    linhas: int,
+    origem: str,
+    formato: str,
+    explicar: bool = True
+) -> None:
+    """
+    Grava o comando se ele passou do limite e agenda a captura do plano.
+
+    Chamado pelo CursorInstrumentado depois de cada comando.
+
+    Args:
+        cursor: Cursor que executou o comando (usado para montar o SQL do EXPLAIN).
+        sql: Comando executado.
+        parametros: Parâmetros passados ao execute.
+        duracao_ms (float): Duração do comando.
+        linhas (int): Linhas afetadas/retornadas.
+        origem (str): Função de repositório/serviço que originou o comando.
+        formato (str): Tipos dos parâmetros.
+        explicar (bool): False para nunca capturar o plano (executemany, COPY).
+    """
+    limite = limite_ms()
+    if limite is None or duracao_ms < limite:
+        return
+    texto = sql.decode("utf-8", errors="replace") if isinstance(sql, bytes) else str(sql)
+    consulta = normalizar(texto)
+    _gravar({
+        "tipo": "lenta",
+        "consulta": consulta,
+        "duracao_ms": round(duracao_ms, 3),
+        "limite_ms": limite,
+        "linhas": linhas,
+        "origem": origem,
+        "parametros": formato,
+    })
+
+    # "SET TRANSACTION ...; SELECT ...": o EXPLAIN recebe só o SELECT
+    alvo = _SET_INICIAL.sub("", texto)
+    if (
+        explicar
+        and os.getenv("CONSULTAS_LENTAS_EXPLAIN", "1").lower() not in ("0", "false", "nao", "não")
+        and _explicavel(alvo)
+        and _reservar_explain(consulta)
+    ):
+        try:
+            comando = cursor.mogrify(alvo, parametros)
+            _fila.put_nowait((consulta, origem, comando))
+        except Exception:
+            # fila cheia ou parâmetros que não se deixam montar: tenta de novo na próxima vez
+            with _explicadas_lock:
+                _explicadas.pop(consulta, None)
+            return
+        _iniciar_worker()
+
+
+def _iniciar_worker() -> None:
+    global _worker
+    with _explicadas_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_capturar_planos, name="explain-consultas-lentas", daemon=True)
+            _worker.start()
+
+
+def _capturar_planos() -> None:
+    """Consome a fila de consultas e grava o plano de cada uma, em uma conexão fora do pool."""
+    from infra.database import abrir_conexao_avulsa
+
+    conn = None
+    while True:
+        consulta, origem, comando = _fila.get()
+        try:
+            if conn is None or conn.closed:
+                conn = abrir_conexao_avulsa()
+            cursor = conn.cursor()
+            try:
+                cursor.execute("SET TRANSACTION READ ONLY")
+                cursor.execute(
+                    "SET LOCAL statement_timeout = %s",
+                    (int(os.getenv("CONSULTAS_LENTAS_EXPLAIN_TIMEOUT_MS", "30000")),)
+                )
+                inicio = time.perf_counter()
+                cursor.execute(b"EXPLAIN (ANALYZE, BUFFERS) " + comando)
+                plano = "\n".join(linha[0] for linha in cursor.fetchall())
+                _gravar({
+                    "tipo": "plano",
+                    "consulta": consulta,
+                    "origem": origem,
+                    "explain_ms": round((time.perf_counter() - inicio) * 1000, 3),
+                    "plano": plano,
+                })
+            finally:
+                cursor.close()
+                conn.rollback()
+        except Exception as erro:
+            _gravar({"tipo": "plano", "consulta": consulta, "origem": origem, "erro": str(erro).strip()})
+            if conn is not None and not conn.closed:
+                try:
+                    conn.rollback()
+                except Exception:
+                    conn.close()
+        finally:
+            _fila.task_done()
+
+
+def aguardar_planos(timeout: Optional[float] = None) -> bool:
+    """
+    Espera a fila de planos esvaziar (útil em scripts e benchmarks antes de sair).
+
+    Args:
+        timeout (Optional[float]): Espera máxima em segundos.
+
+    Returns:
+        bool: True se a fila esvaziou.
+    """
+    prazo = time.monotonic() + timeout if timeout is not None else None
+    while _fila.unfinished_tasks:
+        if prazo is not None and time.monotonic() >= prazo:
+            return False
+        time.sleep(0.05)
+    return True
+
+
+def ler_registros(caminho: Optional[Path] = None) -> Iterator[dict]:
+    """
+    Lê os registros do log, incluindo os arquivos rotacionados, do mais antigo ao mais novo.
+
+    Args:
+        caminho (Optional[Path]): Arquivo do log (padrão CONSULTAS_LENTAS_ARQUIVO).
+
+    Yields:
+        dict: Registro ("tipo" lenta ou plano). Linhas inválidas são ignoradas.
+    """
+    caminho = Path(caminho or arquivo())
+    rotacionados = sorted(
+        (p for p in caminho.parent.glob(caminho.name + ".*") if p.suffix[1:].isdigit()),
+        key=lambda p: int(p.suffix[1:]),
+        reverse=True
+    )
+    for parte in rotacionados + ([caminho] if caminho.exists() else []):
+        with open(parte, encoding="utf-8") as f:
+            for linha in f:
+                try:
+                    yield json.loads(linha)
+                except ValueError:
+                    continue
+
+
+def agrupar(registros: Iterator[dict], desde: Optional[datetime] = None) -> List[dict]:
+    """
+    Agrupa as execuções lentas por consulta normalizada.
+
+    Args:
+        registros (Iterator[dict]): Registros do log (ver ler_registros).
+        desde (Optional[datetime]): Ignora registros anteriores a esta data.
+
+    Returns:
+        List[dict]: Um item por consulta, ordenado pelo tempo total: consulta,
+            execucoes, total_ms, media_ms, p95_ms, max_ms, origens, ultima_em
+            e o plano mais recente (plano, plano_em ou plano_erro).
+    """
+    grupos: Dict[str, dict] = {}
+    for r in registros:
+        if desde is not None and r.get("em", "") < desde.isoformat():
+            continue
+        grupo = grupos.setdefault(r.get("consulta", ""), {"duracoes": [], "origens": set()})
+        if r.get("tipo") == "plano":
+            grupo.update(plano=r.get("plano"), plano_erro=r.get("erro"), plano_em=r.get("em"))
+            continue
+        grupo["duracoes"].append(r["duracao_ms"])
+        grupo["origens"].add(r.get("origem", "-"))
+        grupo["ultima_em"] = r.get("em")
+
+    resultado = []
+    for consulta, grupo in grupos.items():
+        duracoes = sorted(grupo["duracoes"])
+        if not duracoes:
+            continue
+        resultado.append({
+            "consulta": consulta,
+            "execucoes": len(duracoes),
+            "total_ms": sum(duracoes),
+            "media_ms": statistics.fmean(duracoes),
+            "p95_ms": duracoes[min(len(duracoes) - 1, int(len(duracoes) * 0.95))],
+            "max_ms": duracoes[-1],
+            "origens": sorted(grupo["origens"]),
+            "ultima_em": grupo.get("ultima_em"),
+            "plano": grupo.get("plano"),
+            "plano_erro": grupo.get("plano_erro"),
+            "plano_em": grupo.get("plano_em"),
+        })
+    return sorted(resultado, key=lambda g: g["total_ms"], reverse=True)
@@ -14,22 +14,37 @@ Cenários de execução:
 3. Cloud + Neon (APP_ENV=cloud ou não definido):
    - Usa st.secrets["database"]
    - Padrão para Streamlit Cloud
+
+As conexões vêm de um pool compartilhado pelo processo (ver PoolConexoes),
+reaproveitado entre reruns e sessões do Streamlit. Os limites do pool são
+configurados por ambiente (LOCAL_DB_POOL_*, NEON_DB_POOL_* ou pool_min/pool_max
+nos secrets).
 """
 
 import os
+import threading
+import time
+import uuid
 from pathlib import Path
+from typing import Iterator, Optional
 from dotenv import load_dotenv
 import psycopg2
+from psycopg2 import extensions
+from psycopg2.pool import PoolError
 import streamlit as st
 
+from infra import consultas_lentas, instrumentacao
+from infra.migracoes import aplicar_migracoes
+
 # Força o carregamento do .env pela raiz do projeto
 dotenv_path = Path(__file__).resolve().parent.parent / ".env"
 load_dotenv(dotenv_path=dotenv_path)
 
-def get_connection():
+
+def _parametros_conexao() -> dict:
     """
-    Retorna uma conexão com o banco PostgreSQL baseada no ambiente de execução.
-    
+    Retorna os parâmetros de conexão do psycopg2 conforme o ambiente de execução.
+
     APP_ENV:
     - local_docker: usa variáveis LOCAL_* do .env
     - local_neon: usa variáveis NEON_* do .env
@@ -39,7 +54,7 @@ def get_connection():
 
     if app_env == "local_docker":
         # Configuração para desenvolvimento local com Docker
-        return psycopg2.connect(
+        return dict(
             dbname=os.getenv("LOCAL_DB_NAME", "studio_finance"),
             user=os.getenv("LOCAL_DB_USER", "studio"),
             password=os.getenv("LOCAL_DB_PASSWORD", "studio123"),
@@ -49,7 +64,7 @@ def get_connection():
         )
     elif app_env == "local_neon":
         # Configuração para desenvolvimento local com Neon
-        return psycopg2.connect(
+        return dict(
             dbname=os.getenv("NEON_DB_NAME"),
             user=os.getenv("NEON_DB_USER"),
             password=os.getenv("NEON_DB_PASSWORD"),
@@ -60,7 +75,7 @@ def get_connection():
     else:
         # Configuração para Streamlit Cloud
         db_config = st.secrets["database"]
-        return psycopg2.connect(
+        return dict(
             dbname=db_config["dbname"],
             user=db_config["user"],
             password=db_config["password"],
@@ -69,60 +84,383 @@ def get_connection():
             sslmode=db_config.get("sslmode", "require")
         )
 
-def inicializar_banco():
-    """
-    Inicializa as tabelas do banco de dados, caso ainda não existam.
-    """
-    comandos = [
-        '''
-        CREATE TABLE IF NOT EXISTS clientes (
-            id SERIAL PRIMARY KEY,
-            nome TEXT NOT NULL,
-            telefone TEXT,
-            email TEXT,
-            data_cadastro TIMESTAMP,
-            ultima_visita TIMESTAMP,
-            observacoes TEXT
-        )''',
-        '''
-        CREATE TABLE IF NOT EXISTS servicos (
-            id SERIAL PRIMARY KEY,
-            nome TEXT NOT NULL,
-            categoria TEXT NOT NULL,
-            preco NUMERIC NOT NULL,
-            duracao_minutos INTEGER NOT NULL,
-            descricao TEXT
-        )''',
-        '''
-        CREATE TABLE IF NOT EXISTS agendamentos (
-            id SERIAL PRIMARY KEY,
-            cliente_id INTEGER REFERENCES clientes(id),
-            servico_id INTEGER REFERENCES servicos(id),
-            data_hora TIMESTAMP NOT NULL,
-            status TEXT NOT NULL,
-            pago BOOLEAN DEFAULT FALSE,
-            metodo_pagamento TEXT,
-            cliente_confirmado BOOLEAN DEFAULT FALSE,
-            observacoes TEXT
-        )''',
-        '''
-        CREATE TABLE IF NOT EXISTS custos (
-            id SERIAL PRIMARY KEY,
-            descricao TEXT NOT NULL,
-            valor NUMERIC NOT NULL,
-            tipo TEXT NOT NULL,
-            data TIMESTAMP NOT NULL,
-            categoria TEXT,
-            recorrente BOOLEAN DEFAULT FALSE
-        )'''
-    ]
+
+def _limites_pool() -> tuple[int, int]:
+    """
+    Retorna os tamanhos mínimo e máximo do pool conforme o ambiente de execução.
+
+    APP_ENV:
+    - local_docker: LOCAL_DB_POOL_MIN / LOCAL_DB_POOL_MAX (padrão 1 / 5)
+    - local_neon: NEON_DB_POOL_MIN / NEON_DB_POOL_MAX (padrão 1 / 5)
+    - cloud: pool_min / pool_max em st.secrets["database"] (padrão 1 / 10)
+    """
+    app_env = os.getenv("APP_ENV", "cloud")
+
+    if app_env == "local_docker":
+        minimo = os.getenv("LOCAL_DB_POOL_MIN", "1")
+        maximo = os.getenv("LOCAL_DB_POOL_MAX", "5")
+    elif app_env == "local_neon":
+        minimo = os.getenv("NEON_DB_POOL_MIN", "1")
+        maximo = os.getenv("NEON_DB_POOL_MAX", "5")
+    else:
+        db_config = st.secrets["database"]
+        minimo = db_config.get("pool_min", "1")
+        maximo = db_config.get("pool_max", "10")
+
+    minimo = max(int(minimo), 0)
+    return minimo, max(int(maximo), minimo, 1)
+
+
+class ConexaoPool:
+    """
+    Conexão emprestada do pool.
+
+    Repassa atributos e métodos para a conexão psycopg2 original, mas ``close()``
+    devolve a conexão ao pool em vez de encerrá-la. Assim os repositórios
+    continuam usando o padrão ``conn = get_connection() ... conn.close()``.
+    """
+
+    def __init__(self, pool: "PoolConexoes", conn):
+        self._pool = pool
+        self._conn = conn
+
+    def close(self) -> None:
+        """Devolve a conexão ao pool. Chamadas repetidas são ignoradas."""
+        conn = self.__dict__.get("_conn")
+        if conn is not None:
+            self._conn = None
+            self._pool.devolver(conn)
+
+    @property
+    def closed(self) -> int:
+        conn = self.__dict__.get("_conn")
+        return 1 if conn is None else conn.closed
+
+    def __getattr__(self, nome):
+        if nome.startswith("_"):
+            raise AttributeError(nome)
+        conn = self.__dict__.get("_conn")
+        if conn is None:
+            raise psycopg2.InterfaceError("Conexão já devolvida ao pool")
+        return getattr(conn, nome)
+
+    def __setattr__(self, nome, valor):
+        if nome.startswith("_"):
+            object.__setattr__(self, nome, valor)
+        else:
+            setattr(self._conn, nome, valor)
+
+    def __enter__(self) -> "ConexaoPool":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        conn = self.__dict__.get("_conn")
+        if conn is not None and not conn.closed:
+            if exc_type is None:
+                conn.commit()
+            else:
+                conn.rollback()
+        self.close()
+
+    def __del__(self):
+        # Rede de segurança: uma exceção entre get_connection() e close()
+        # não deve deixar a conexão presa fora do pool.
+        self.close()
+
+
+class PoolConexoes:
+    """
+    Pool de conexões compartilhado por todo o processo (todas as sessões do Streamlit).
+
+    Conexões ociosas são reaproveitadas. Quando todas estão em uso e o limite
+    máximo foi atingido, o pedido aguarda até que alguma seja devolvida.
+    Conexões ociosas há mais de ``ping_segundos`` são verificadas com ``SELECT 1``
+    antes de serem entregues (o Neon encerra conexões inativas).
+    """
+
+    def __init__(
+        self,
+        parametros: dict,
+        minimo: int,
+        maximo: int,
+        ping_segundos: float = 30.0,
+        timeout_segundos: float = 30.0
+    ):
+        self._parametros = parametros
+        self.minimo = minimo
+        self.maximo = maximo
+        self._ping_segundos = ping_segundos
+        self._timeout_segundos = timeout_segundos
+        self._ociosas: list[tuple[object, float]] = []  # (conexão, momento da devolução)
+        self._abertas = 0
+        self._condicao = threading.Condition()
+        self._estatisticas = {
+            "checkouts": 0,
+            "reaproveitadas": 0,
+            "novas": 0,
+            "esperas": 0,
+            "descartadas": 0,
+            "tempo_checkout_ms_total": 0.0,
+            "tempo_checkout_ms_max": 0.0,
+        }
+        for _ in range(minimo):
+            self._ociosas.append((self._conectar(), time.monotonic()))
+            self._abertas += 1
+
+    def _conectar(self):
+        return psycopg2.connect(**self._parametros)
+
+    def _conexao_saudavel(self, conn, devolvida_em: float) -> bool:
+        if conn.closed:
+            return False
+        if time.monotonic() - devolvida_em < self._ping_segundos:
+            return True
+        try:
+            conn.autocommit = True
+            cursor = conn.cursor(cursor_factory=extensions.cursor)
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            cursor.close()
+            conn.autocommit = False
+        except psycopg2.Error:
+            return False
+        return True
+
+    def _descartar(self, conn) -> None:
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+        with self._condicao:
+            self._abertas -= 1
+            self._estatisticas["descartadas"] += 1
+            self._condicao.notify()
+
+    def obter(self) -> ConexaoPool:
+        """
+        Empresta uma conexão do pool, abrindo uma nova se houver espaço.
+
+        Raises:
+            PoolError: Se nenhuma conexão for liberada dentro do tempo limite.
+        """
+        inicio = time.perf_counter()
+        prazo = time.monotonic() + self._timeout_segundos
+        esperou = False
+
+        while True:
+            conn = None
+            with self._condicao:
+                while not self._ociosas and self._abertas >= self.maximo:
+                    esperou = True
+                    restante = prazo - time.monotonic()
+                    if restante <= 0 or not self._condicao.wait(timeout=restante):
+                        raise PoolError("Nenhuma conexão disponível no pool")
+                if self._ociosas:
+                    conn, devolvida_em = self._ociosas.pop()
+                else:
+                    self._abertas += 1
+
+            if conn is None:
+                try:
+                    conn = self._conectar()
+                except Exception:
+                    with self._condicao:
+                        self._abertas -= 1
+                        self._condicao.notify()
+                    raise
+                reaproveitada = False
+                break
+            if self._conexao_saudavel(conn, devolvida_em):
+                reaproveitada = True
+                break
+            self._descartar(conn)
+
+        duracao_ms = (time.perf_counter() - inicio) * 1000
+        with self._condicao:
+            estat = self._estatisticas
+            estat["checkouts"] += 1
+            estat["reaproveitadas" if reaproveitada else "novas"] += 1
+            estat["esperas"] += 1 if esperou else 0
+            estat["tempo_checkout_ms_total"] += duracao_ms
+            estat["tempo_checkout_ms_max"] = max(estat["tempo_checkout_ms_max"], duracao_ms)
+
+        return ConexaoPool(self, conn)
+
+    def devolver(self, conn) -> None:
+        """
+        Recebe uma conexão de volta, desfazendo transações abertas.
+        Conexões quebradas são descartadas.
+        """
+        descartar = bool(conn.closed)
+        if not descartar:
+            status = conn.info.transaction_status
+            if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                descartar = True
+            elif status != extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    descartar = True
+
+        if descartar:
+            self._descartar(conn)
+            return
+
+        with self._condicao:
+            self._ociosas.append((conn, time.monotonic()))
+            self._condicao.notify()
+
+    def estatisticas(self) -> dict:
+        """
+        Retorna contadores de uso do pool.
+
+        Returns:
+            dict: checkouts, reaproveitadas (hits), novas, esperas, descartadas,
+            tempo médio e máximo de checkout (ms), conexões abertas e ociosas.
+        """
+        with self._condicao:
+            estat = dict(self._estatisticas)
+            estat["abertas"] = self._abertas
+            estat["ociosas"] = len(self._ociosas)
+        checkouts = estat["checkouts"]
+        estat["tempo_checkout_ms_medio"] = estat["tempo_checkout_ms_total"] / checkouts if checkouts else 0.0
+        return estat
+
+    def fechar(self) -> None:
+        """Encerra todas as conexões ociosas."""
+        with self._condicao:
+            ociosas, self._ociosas = self._ociosas, []
+            self._abertas -= len(ociosas)
+        for conn, _ in ociosas:
+            try:
+                conn.close()
+            except psycopg2.Error:
+                pass
+
+
+_pool: Optional[PoolConexoes] = None
+_pool_lock = threading.Lock()
+
+
+def obter_pool() -> PoolConexoes:
+    """
+    Retorna o pool do processo, criando-o na primeira chamada.
+
+    Variáveis opcionais:
+    - DB_POOL_PING_SEGUNDOS: ociosidade a partir da qual a conexão é testada (padrão 30)
+    - DB_POOL_TIMEOUT_SEGUNDOS: espera máxima por uma conexão livre (padrão 30)
+
+    Com a instrumentação ou o log de consultas lentas ativos, as conexões
+    usam o CursorInstrumentado.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                minimo, maximo = _limites_pool()
+                parametros = _parametros_conexao()
+                if instrumentacao.ativa() or consultas_lentas.ativo():
+                    parametros["cursor_factory"] = instrumentacao.CursorInstrumentado
+                _pool = PoolConexoes(
+                    parametros,
+                    minimo,
+                    maximo,
+                    ping_segundos=float(os.getenv("DB_POOL_PING_SEGUNDOS", "30")),
+                    timeout_segundos=float(os.getenv("DB_POOL_TIMEOUT_SEGUNDOS", "30"))
+                )
+    return _pool
+
+
+def abrir_conexao_avulsa():
+    """
+    Abre uma conexão nova, fora do pool e sem instrumentação.
+
+    Usada por tarefas internas que não devem disputar o pool com as páginas
+    nem aparecer nas próprias medições (ex.: EXPLAIN das consultas lentas).
+    Quem abre é responsável por fechar.
+    """
+    return psycopg2.connect(**_parametros_conexao())
+
+
+def get_connection():
+    """
+    Retorna uma conexão com o banco PostgreSQL emprestada do pool do processo.
+
+    A conexão se comporta como uma conexão psycopg2 comum; ``close()`` a devolve
+    ao pool. Os parâmetros de conexão e os limites do pool dependem de APP_ENV.
+    """
+    return obter_pool().obter()
+
+
+def tamanho_lote_padrao() -> int:
+    """Quantidade de linhas trazidas por ida ao banco nos cursores de streaming (DB_FETCH_SIZE)."""
+    return int(os.getenv("DB_FETCH_SIZE", "2000"))
+
+
+def iterar_consulta(query: str, params=None, tamanho_lote: Optional[int] = None) -> Iterator[list]:
+    """
+    Executa uma consulta com um cursor nomeado (server-side) e devolve as linhas em lotes.
+
+    Apenas um lote fica em memória por vez. A conexão permanece emprestada do
+    pool até o gerador terminar ou ser fechado (inclusive por um break no laço
+    do chamador).
+
+    Args:
+        query (str): Consulta SELECT.
+        params: Parâmetros da consulta.
+        tamanho_lote (Optional[int]): Linhas por lote (padrão DB_FETCH_SIZE).
+
+    Yields:
+        list: Lote de linhas (tuplas).
+    """
+    tamanho_lote = tamanho_lote or tamanho_lote_padrao()
+    conn = get_connection()
+    cursor = conn.cursor(name=f"iter_{uuid.uuid4().hex}")
+    try:
+        cursor.itersize = tamanho_lote
+        cursor.execute(query, params)
+        while True:
+            lote = cursor.fetchmany(tamanho_lote)
+            if not lote:
+                break
+            yield lote
+    finally:
+        try:
+            cursor.close()
+        finally:
+            conn.close()  # devolver() desfaz a transação aberta pelo cursor nomeado
+
+
+def estatisticas_pool() -> dict:
+    """
+    Retorna as estatísticas do pool (vazio se o pool ainda não foi criado).
+    """
+    return _pool.estatisticas() if _pool is not None else {}
+
+
+def fechar_pool() -> None:
+    """
+    Encerra as conexões ociosas e descarta o pool do processo.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.fechar()
+            _pool = None
+
+def inicializar_banco() -> list[int]:
+    """
+    Cria ou atualiza o esquema do banco aplicando as migrações pendentes.
+
+    Returns:
+        list[int]: Versões de migração aplicadas nesta execução.
+    """
     conn = get_connection()
-    cursor = conn.cursor()
-    for cmd in comandos:
-        cursor.execute(cmd)
-    conn.commit()
-    cursor.close()
-    conn.close()
+    try:
+        aplicadas = aplicar_migracoes(conn)
+    finally:
+        conn.close()
+    return aplicadas
 
 def mostrar_conexao_atual():
     """
@@ -136,16 +474,19 @@ def mostrar_conexao_atual():
         print(f"- Database: {os.getenv('LOCAL_DB_NAME', 'studio_finance')}")
         print(f"- Host: {os.getenv('LOCAL_DB_HOST', 'localhost')}")
         print(f"- Porta: {os.getenv('LOCAL_DB_PORT', '5432')}")
+        print(f"- Pool: {os.getenv('LOCAL_DB_POOL_MIN', '1')} a {os.getenv('LOCAL_DB_POOL_MAX', '5')} conexões")
     elif app_env == "local_neon":
         print("Conectando ao Neon (local):")
         print(f"- Database: {os.getenv('NEON_DB_NAME')}")
         print(f"- Host: {os.getenv('NEON_DB_HOST')}")
+        print(f"- Pool: {os.getenv('NEON_DB_POOL_MIN', '1')} a {os.getenv('NEON_DB_POOL_MAX', '5')} conexões")
     else:
         print("Conectando via Streamlit Cloud:")
         if "database" in st.secrets:
             db_config = st.secrets["database"]
             print(f"- Database: {db_config.get('dbname')}")
             print(f"- Host: {db_config.get('host')}")
+            print(f"- Pool: {db_config.get('pool_min', '1')} a {db_config.get('pool_max', '10')} conexões")
         else:
             print("⚠️ Secrets não encontrados!")
 
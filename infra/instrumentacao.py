@@ -0,0 +1,271 @@
+# infra/instrumentacao.py
+"""
+Instrumentação das consultas ao banco.
+
+Quando ativa (DEV_PAINEL_CONSULTAS=1), as conexões do pool usam o
+CursorInstrumentado, que registra para cada comando: o SQL, o formato dos
+parâmetros (apenas tipos, nunca valores), a duração, as linhas retornadas e a
+função de repositório/serviço que originou a chamada.
+
+Os registros são agrupados por sessão do Streamlit e zerados no início de cada
+rerun (iniciar_rerun), de modo que resumo_rerun descreve apenas a execução
+atual da página. Trabalho feito em outras threads (infra.paralelo) pode ser
+vinculado ao rerun que o disparou (vincular_rerun); o que terminar depois que
+esse rerun foi substituído é descartado em vez de ser contado no seguinte.
+
+O mesmo cursor alimenta o log de consultas lentas (infra.consultas_lentas),
+que pode ser ligado sem o painel (CONSULTAS_LENTAS_MS).
+"""
+
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from psycopg2 import extensions
+
+from infra import consultas_lentas
+
+try:
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+except ImportError:  # pragma: no cover - versões antigas do Streamlit
+    get_script_run_ctx = None
+
+MAX_REGISTROS_POR_SESSAO = 2000
+MAX_SESSOES = 100  # sessões com registros guardados; as menos recentes são descartadas
+_PACOTES_ORIGEM = ("repositories.", "services.")
+
+
+@dataclass
+class RegistroConsulta:
+    sql: str
+    parametros: str
+    duracao_ms: float
+    linhas: int
+    origem: str
+    inicio: float
+
+
+# sessão -> registros do rerun atual, da sessão menos recente para a mais recente
+_registros: "OrderedDict[str, List[RegistroConsulta]]" = OrderedDict()
+_reruns: Dict[str, int] = {}  # sessão -> número do rerun atual (único no processo)
+_numeros_rerun = itertools.count(1)
+_thread = threading.local()  # rerun vinculado à thread atual, se houver
+_totais = {"consultas": 0, "tempo_ms": 0.0}  # acumulado do processo, todas as sessões
+_lock = threading.Lock()
+
+
+def ativa() -> bool:
+    """
+    Indica se a instrumentação das consultas está ligada.
+
+    Returns:
+        bool: True se DEV_PAINEL_CONSULTAS estiver definido como 1/true/sim.
+    """
+    return os.getenv("DEV_PAINEL_CONSULTAS", "").lower() in ("1", "true", "sim")
+
+
+def top_n_padrao() -> int:
+    """Quantidade de consultas mais lentas exibidas no painel (DEV_PAINEL_TOP_N)."""
+    return int(os.getenv("DEV_PAINEL_TOP_N", "10"))
+
+
+def _chave_sessao() -> str:
+    if get_script_run_ctx is not None:
+        ctx = get_script_run_ctx(suppress_warning=True)
+        if ctx is not None:
+            return ctx.session_id
+    return f"thread-{threading.get_ident()}"
+
+
+def _origem_chamada() -> str:
+    frame = sys._getframe(2)
+    while frame is not None:
+        modulo = frame.f_globals.get("__name__", "")
+        if modulo.startswith(_PACOTES_ORIGEM):
+            return f"{modulo}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return "-"
+
+
+def _formato_parametros(params) -> str:
+    if params is None:
+        return ""
+    if isinstance(params, dict):
+        return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in params.items()) + "}"
+    return "(" + ", ".join(type(v).__name__ for v in params) + ")"
+
+
+def registrar(sql, parametros: str, duracao_ms: float, linhas: int, origem: str) -> None:
+    """
+    Guarda o registro de uma consulta na sessão atual.
+    """
+    if not ativa():
+        return
+    if isinstance(sql, bytes):
+        sql = sql.decode("utf-8", errors="replace")
+    registro = RegistroConsulta(
+        sql=" ".join(str(sql).split()),
+        parametros=parametros,
+        duracao_ms=duracao_ms,
+        linhas=linhas,
+        origem=origem,
+        inicio=time.time()
+    )
+    chave = _chave_sessao()
+    vinculado = getattr(_thread, "rerun", None)
+    with _lock:
+        _totais["consultas"] += 1
+        _totais["tempo_ms"] += duracao_ms
+        if vinculado is not None and vinculado != _reruns.get(chave):
+            return  # consulta atrasada de um rerun que já terminou
+        lista = _registros.get(chave)
+        if lista is None:
+            lista = _nova_lista(chave)
+        if len(lista) < MAX_REGISTROS_POR_SESSAO:
+            lista.append(registro)
+
+
+def _nova_lista(chave: str) -> List[RegistroConsulta]:
+    """Cria a lista da sessão como a mais recente e descarta as excedentes. Chamar com _lock."""
+    lista = _registros[chave] = []
+    _registros.move_to_end(chave)
+    while len(_registros) > MAX_SESSOES:
+        descartada, _ = _registros.popitem(last=False)
+        _reruns.pop(descartada, None)
+    return lista
+
+
+class CursorInstrumentado(extensions.cursor):
+    """
+    Cursor psycopg2 que mede e registra cada comando executado.
+    """
+
+    def execute(self, query, vars=None):
+        origem = _origem_chamada()
+        inicio = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            duracao_ms = (time.perf_counter() - inicio) * 1000
+            formato = _formato_parametros(vars)
+            registrar(query, formato, duracao_ms, self.rowcount, origem)
+            consultas_lentas.verificar(self, query, vars, duracao_ms, self.rowcount, origem, formato)
+
+    def executemany(self, query, vars_list):
+        origem = _origem_chamada()
+        vars_list = list(vars_list)
+        inicio = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            duracao_ms = (time.perf_counter() - inicio) * 1000
+            formato = f"{len(vars_list)} × {_formato_parametros(vars_list[0])}" if vars_list else ""
+            registrar(query, formato, duracao_ms, self.rowcount, origem)
+            consultas_lentas.verificar(
+                self, query, None, duracao_ms, self.rowcount, origem, formato, explicar=False
+            )
+
+    def copy_expert(self, sql, file, size=8192):
+        origem = _origem_chamada()
+        inicio = time.perf_counter()
+        try:
+            return super().copy_expert(sql, file, size)
+        finally:
+            duracao_ms = (time.perf_counter() - inicio) * 1000
+            registrar(sql, "", duracao_ms, self.rowcount, origem)
+            consultas_lentas.verificar(self, sql, None, duracao_ms, self.rowcount, origem, "", explicar=False)
+
+
+def iniciar_rerun() -> None:
+    """
+    Descarta os registros da sessão atual. Deve ser chamado no início de cada página.
+
+    Só as MAX_SESSOES sessões com rerun mais recente mantêm registros; as
+    demais (sessões encerradas, threads fora do Streamlit) são descartadas.
+    """
+    chave = _chave_sessao()
+    with _lock:
+        _nova_lista(chave)
+        _reruns[chave] = next(_numeros_rerun)
+
+
+def rerun_atual() -> Optional[int]:
+    """
+    Retorna o número do rerun atual da sessão, para vincular a ele o trabalho feito em outras threads.
+
+    Returns:
+        Optional[int]: Número do rerun, ou None se iniciar_rerun não foi chamado.
+    """
+    with _lock:
+        return _reruns.get(_chave_sessao())
+
+
+def vincular_rerun(numero: Optional[int]) -> None:
+    """
+    Vincula a thread atual a um rerun (None desfaz o vínculo).
+
+    Enquanto vinculada, as consultas da thread só são registradas se esse ainda
+    for o rerun atual da sessão; as que terminam depois são descartadas.
+
+    Args:
+        numero (Optional[int]): Valor obtido com rerun_atual na thread da página.
+    """
+    _thread.rerun = numero
+
+
+def consultas_rerun() -> List[RegistroConsulta]:
+    """
+    Retorna uma cópia dos registros da sessão atual.
+    """
+    with _lock:
+        return list(_registros.get(_chave_sessao(), []))
+
+
+def resumo_rerun(top_n: Optional[int] = None) -> dict:
+    """
+    Resume as consultas do rerun atual.
+
+    Args:
+        top_n (Optional[int]): Quantidade de consultas mais lentas (padrão DEV_PAINEL_TOP_N).
+
+    Returns:
+        dict: Dicionário contendo:
+            - total_consultas (int)
+            - tempo_total_ms (float)
+            - mais_lentas (List[RegistroConsulta])
+            - por_origem (Dict[str, dict]): consultas e tempo por função de origem
+    """
+    registros = consultas_rerun()
+    top_n = top_n or top_n_padrao()
+
+    por_origem: Dict[str, dict] = {}
+    for r in registros:
+        item = por_origem.setdefault(r.origem, {"consultas": 0, "tempo_ms": 0.0})
+        item["consultas"] += 1
+        item["tempo_ms"] += r.duracao_ms
+
+    return {
+        "total_consultas": len(registros),
+        "tempo_total_ms": sum(r.duracao_ms for r in registros),
+        "mais_lentas": sorted(registros, key=lambda r: r.duracao_ms, reverse=True)[:top_n],
+        "por_origem": por_origem,
+    }
+
+
+def totais_processo() -> dict:
+    """
+    Retorna o total de consultas e o tempo no banco acumulados pelo processo.
+
+    Diferente de resumo_rerun, não depende da sessão: serve para medir um
+    trecho de código pela diferença entre duas leituras.
+
+    Returns:
+        dict: consultas (int) e tempo_ms (float).
+    """
+    with _lock:
+        return dict(_totais)
@@ -0,0 +1,565 @@
+# infra/migracoes.py
+"""
+Migrações versionadas do esquema do banco PostgreSQL.
+
+Cada migração tem um número de versão, uma descrição e a lista de comandos SQL.
+As versões aplicadas ficam registradas na tabela schema_migrations, então rodar
+o processo novamente só aplica o que falta. Os comandos também usam
+IF NOT EXISTS sempre que possível, para que bancos criados antes deste controle
+(apenas com CREATE TABLE) sejam atualizados sem erro.
+"""
+
+from typing import List, Tuple
+
+MIGRACOES: List[Tuple[int, str, List[str]]] = [
+    (
+        1,
+        "Tabelas iniciais",
+        [
+            '''
+            CREATE TABLE IF NOT EXISTS clientes (
+                id SERIAL PRIMARY KEY,
+                nome TEXT NOT NULL,
+                telefone TEXT,
+                email TEXT,
+                data_cadastro TIMESTAMP,
+                ultima_visita TIMESTAMP,
+                observacoes TEXT
+            )''',
+            '''
+            CREATE TABLE IF NOT EXISTS servicos (
+                id SERIAL PRIMARY KEY,
+                nome TEXT NOT NULL,
+                categoria TEXT NOT NULL,
+                preco NUMERIC NOT NULL,
+                duracao_minutos INTEGER NOT NULL,
+                descricao TEXT
+            )''',
+            '''
+            CREATE TABLE IF NOT EXISTS agendamentos (
+                id SERIAL PRIMARY KEY,
+                cliente_id INTEGER REFERENCES clientes(id),
+                servico_id INTEGER REFERENCES servicos(id),
+                data_hora TIMESTAMP NOT NULL,
+                status TEXT NOT NULL,
+                pago BOOLEAN DEFAULT FALSE,
+                metodo_pagamento TEXT,
+                cliente_confirmado BOOLEAN DEFAULT FALSE,
+                observacoes TEXT
+            )''',
+            '''
+            CREATE TABLE IF NOT EXISTS custos (
+                id SERIAL PRIMARY KEY,
+                descricao TEXT NOT NULL,
+                valor NUMERIC NOT NULL,
+                tipo TEXT NOT NULL,
+                data TIMESTAMP NOT NULL,
+                categoria TEXT,
+                recorrente BOOLEAN DEFAULT FALSE
+            )'''
+        ]
+    ),
+    (
+        2,
+        "Índices para listagens, agenda por serviço e resumo do estúdio",
+        [
+            # listar_agendamentos, obter_proximos_agendamentos e métricas por período
+            "CREATE INDEX IF NOT EXISTS idx_agendamentos_data_hora ON agendamentos (data_hora)",
+            # listar_agendamentos_por_servico e verificação de sobreposição
+            "CREATE INDEX IF NOT EXISTS idx_agendamentos_servico_data_hora ON agendamentos (servico_id, data_hora)",
+            # excluir_cliente (checagem de agendamentos do cliente)
+            "CREATE INDEX IF NOT EXISTS idx_agendamentos_cliente_id ON agendamentos (cliente_id)",
+            # faturamento (realizado) e cancelamentos por período
+            "CREATE INDEX IF NOT EXISTS idx_agendamentos_status_data_hora ON agendamentos (status, data_hora)",
+            # pendentes: contagem, atrasados e próximos agendamentos
+            '''
+            CREATE INDEX IF NOT EXISTS idx_agendamentos_pendentes_data_hora
+            ON agendamentos (data_hora)
+            WHERE status = 'pendente'
+            ''',
+            # listar_custos e custos do mês no relatório
+            "CREATE INDEX IF NOT EXISTS idx_custos_data ON custos (data)",
+            "ANALYZE agendamentos",
+            "ANALYZE custos"
+        ]
+    ),
+    (
+        3,
+        "Período do agendamento e restrição de não sobreposição por serviço",
+        [
+            "CREATE EXTENSION IF NOT EXISTS btree_gist",
+            "ALTER TABLE agendamentos ADD COLUMN IF NOT EXISTS duracao_minutos INTEGER",
+            '''
+            UPDATE agendamentos a
+            SET duracao_minutos = s.duracao_minutos
+            FROM servicos s
+            WHERE s.id = a.servico_id AND a.duracao_minutos IS NULL
+            ''',
+            "UPDATE agendamentos SET duracao_minutos = 60 WHERE duracao_minutos IS NULL",
+            "ALTER TABLE agendamentos ALTER COLUMN duracao_minutos SET NOT NULL",
+            # Preenche a duração a partir do serviço quando não informada
+            # (ou quando o serviço do agendamento muda)
+            '''
+            CREATE OR REPLACE FUNCTION preencher_duracao_agendamento() RETURNS trigger AS $$
+            BEGIN
+                IF NEW.duracao_minutos IS NULL
+                   OR (TG_OP = 'UPDATE'
+                       AND NEW.servico_id IS DISTINCT FROM OLD.servico_id
+                       AND NEW.duracao_minutos IS NOT DISTINCT FROM OLD.duracao_minutos) THEN
+                    SELECT COALESCE(MAX(duracao_minutos), 60) INTO NEW.duracao_minutos
+                    FROM servicos
+                    WHERE id = NEW.servico_id;
+                END IF;
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql
+            ''',
+            "DROP TRIGGER IF EXISTS trg_agendamentos_duracao ON agendamentos",
+            '''
+            CREATE TRIGGER trg_agendamentos_duracao
+            BEFORE INSERT OR UPDATE ON agendamentos
+            FOR EACH ROW EXECUTE FUNCTION preencher_duracao_agendamento()
+            ''',
+            '''
+            ALTER TABLE agendamentos ADD COLUMN IF NOT EXISTS periodo TSRANGE
+            GENERATED ALWAYS AS (tsrange(data_hora, data_hora + duracao_minutos * INTERVAL '1 minute')) STORED
+            ''',
+            # A restrição não pode ser criada com agendamentos já sobrepostos (comuns em
+            # bancos antigos): interrompe com a lista dos pares e como resolvê-los
+            '''
+            DO $$
+            DECLARE
+                total INTEGER;
+                pares TEXT;
+            BEGIN
+                SELECT COUNT(*), array_to_string((array_agg(a.id || ' e ' || b.id ORDER BY a.id, b.id))[1:50], ', ')
+                INTO total, pares
+                FROM agendamentos a
+                JOIN agendamentos b
+                  ON b.servico_id = a.servico_id
+                 AND b.id > a.id
+                 AND b.periodo && a.periodo
+                WHERE a.status <> 'cancelado' AND b.status <> 'cancelado';
+
+                IF total > 0 THEN
+                    RAISE EXCEPTION 'Há % par(es) de agendamentos sobrepostos no mesmo serviço (ids, até 50 pares): %',
+                        total, pares
+                    USING HINT = 'Em cada par, cancele (status = ''cancelado'') ou remarque um dos agendamentos '
+                                 'e rode studio-init de novo; as migrações seguintes só são aplicadas depois desta.';
+                END IF;
+            END
+            $$
+            ''',
+            "ALTER TABLE agendamentos DROP CONSTRAINT IF EXISTS agendamentos_sem_sobreposicao",
+            '''
+            ALTER TABLE agendamentos ADD CONSTRAINT agendamentos_sem_sobreposicao
+            EXCLUDE USING gist (servico_id WITH =, periodo WITH &&)
+            WHERE (status <> 'cancelado')
+            '''
+        ]
+    ),
+    (
+        4,
+        "Índice (data_hora, id) para paginação por cursor da lista de agendamentos",
+        [
+            "CREATE INDEX IF NOT EXISTS idx_agendamentos_data_hora_id ON agendamentos (data_hora, id)",
+            # Coberto pelo novo índice (mesmo prefixo)
+            "DROP INDEX IF EXISTS idx_agendamentos_data_hora"
+        ]
+    ),
+    (
+        5,
+        "Faturamento mensal consolidado por profissional e serviço",
+        [
+            '''
+            CREATE TABLE IF NOT EXISTS faturamento_mensal (
+                ano INTEGER NOT NULL,
+                mes INTEGER NOT NULL,
+                profissional TEXT NOT NULL,
+                servico_id INTEGER NOT NULL,
+                faturamento NUMERIC NOT NULL,
+                atendimentos INTEGER NOT NULL,
+                clientes_distintos INTEGER NOT NULL,
+                PRIMARY KEY (ano, mes, profissional, servico_id)
+            )''',
+            # Recalcula uma chave (serviço, mês) a partir dos agendamentos realizados.
+            # servico_id 0 agrupa agendamentos sem serviço. O advisory lock serializa
+            # transações concorrentes que recalculam a mesma chave.
+            '''
+            CREATE OR REPLACE FUNCTION recalcular_faturamento_mensal(p_servico_id INTEGER, p_mes TIMESTAMP)
+            RETURNS void AS $$
+            DECLARE
+                v_inicio TIMESTAMP := date_trunc('month', p_mes);
+                v_ano INTEGER := EXTRACT(YEAR FROM v_inicio);
+                v_mes INTEGER := EXTRACT(MONTH FROM v_inicio);
+            BEGIN
+                PERFORM pg_advisory_xact_lock(COALESCE(p_servico_id, 0), v_ano * 12 + v_mes);
+
+                DELETE FROM faturamento_mensal
+                WHERE ano = v_ano AND mes = v_mes AND servico_id = COALESCE(p_servico_id, 0);
+
+                INSERT INTO faturamento_mensal
+                    (ano, mes, profissional, servico_id, faturamento, atendimentos, clientes_distintos)
+                SELECT v_ano, v_mes, COALESCE(s.categoria, 'Não definido'), COALESCE(p_servico_id, 0),
+                       SUM(COALESCE(s.preco, 0)), COUNT(*), COUNT(DISTINCT a.cliente_id)
+                FROM agendamentos a
+                LEFT JOIN servicos s ON s.id = a.servico_id
+                WHERE a.status = 'realizado'
+                  AND a.data_hora >= v_inicio AND a.data_hora < v_inicio + INTERVAL '1 month'
+                  AND (a.servico_id = p_servico_id OR (p_servico_id IS NULL AND a.servico_id IS NULL))
+                GROUP BY s.categoria;
+            END;
+            $$ LANGUAGE plpgsql
+            ''',
+            '''
+            CREATE OR REPLACE FUNCTION reconstruir_faturamento_mensal() RETURNS INTEGER AS $$
+            DECLARE
+                v_linhas INTEGER;
+            BEGIN
+                LOCK TABLE faturamento_mensal IN EXCLUSIVE MODE;
+                DELETE FROM faturamento_mensal;
+                INSERT INTO faturamento_mensal
+                    (ano, mes, profissional, servico_id, faturamento, atendimentos, clientes_distintos)
+                SELECT EXTRACT(YEAR FROM a.data_hora)::int, EXTRACT(MONTH FROM a.data_hora)::int,
+                       COALESCE(s.categoria, 'Não definido'), COALESCE(a.servico_id, 0),
+                       SUM(COALESCE(s.preco, 0)), COUNT(*), COUNT(DISTINCT a.cliente_id)
+                FROM agendamentos a
+                LEFT JOIN servicos s ON s.id = a.servico_id
+                WHERE a.status = 'realizado'
+                GROUP BY 1, 2, 3, 4;
+                GET DIAGNOSTICS v_linhas = ROW_COUNT;
+                RETURN v_linhas;
+            END;
+            $$ LANGUAGE plpgsql
+            ''',
+            # Um trigger por comando (transition tables não aceitam mais de um evento);
+            # só as chaves de linhas realizadas cujo status, serviço, data ou cliente
+            # mudou são recalculadas.
+            '''
+            CREATE OR REPLACE FUNCTION atualizar_faturamento_agendamentos() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'INSERT' THEN
+                    PERFORM recalcular_faturamento_mensal(k.servico_id, k.mes)
+                    FROM (SELECT DISTINCT servico_id, date_trunc('month', data_hora) AS mes
+                          FROM novas WHERE status = 'realizado') k
+                    ORDER BY k.servico_id, k.mes;
+                ELSIF TG_OP = 'DELETE' THEN
+                    PERFORM recalcular_faturamento_mensal(k.servico_id, k.mes)
+                    FROM (SELECT DISTINCT servico_id, date_trunc('month', data_hora) AS mes
+                          FROM antigas WHERE status = 'realizado') k
+                    ORDER BY k.servico_id, k.mes;
+                ELSE
+                    PERFORM recalcular_faturamento_mensal(k.servico_id, k.mes)
+                    FROM (
+                        SELECT o.servico_id, date_trunc('month', o.data_hora) AS mes
+                        FROM antigas o JOIN novas n ON n.id = o.id
+                        WHERE o.status = 'realizado'
+                          AND (n.status, n.servico_id, n.data_hora, n.cliente_id)
+                              IS DISTINCT FROM (o.status, o.servico_id, o.data_hora, o.cliente_id)
+                        UNION
+                        SELECT n.servico_id, date_trunc('month', n.data_hora)
+                        FROM antigas o JOIN novas n ON n.id = o.id
+                        WHERE n.status = 'realizado'
+                          AND (n.status, n.servico_id, n.data_hora, n.cliente_id)
+                              IS DISTINCT FROM (o.status, o.servico_id, o.data_hora, o.cliente_id)
+                    ) k
+                    ORDER BY k.servico_id, k.mes;
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+            ''',
+            "DROP TRIGGER IF EXISTS trg_faturamento_insert ON agendamentos",
+            '''
+            CREATE TRIGGER trg_faturamento_insert
+            AFTER INSERT ON agendamentos REFERENCING NEW TABLE AS novas
+            FOR EACH STATEMENT EXECUTE FUNCTION atualizar_faturamento_agendamentos()
+            ''',
+            "DROP TRIGGER IF EXISTS trg_faturamento_update ON agendamentos",
+            '''
+            CREATE TRIGGER trg_faturamento_update
+            AFTER UPDATE ON agendamentos REFERENCING OLD TABLE AS antigas NEW TABLE AS novas
+            FOR EACH STATEMENT EXECUTE FUNCTION atualizar_faturamento_agendamentos()
+            ''',
+            "DROP TRIGGER IF EXISTS trg_faturamento_delete ON agendamentos",
+            '''
+            CREATE TRIGGER trg_faturamento_delete
+            AFTER DELETE ON agendamentos REFERENCING OLD TABLE AS antigas
+            FOR EACH STATEMENT EXECUTE FUNCTION atualizar_faturamento_agendamentos()
+            ''',
+            # Mudança de preço ou categoria (profissional) afeta todos os meses do serviço
+            '''
+            CREATE OR REPLACE FUNCTION atualizar_faturamento_servicos() RETURNS trigger AS $$
+            BEGIN
+                PERFORM recalcular_faturamento_mensal(k.servico_id, k.mes)
+                FROM (
+                    SELECT DISTINCT a.servico_id, date_trunc('month', a.data_hora) AS mes
+                    FROM antigas o
+                    JOIN novas n ON n.id = o.id
+                    JOIN agendamentos a ON a.servico_id = n.id
+                    WHERE a.status = 'realizado'
+                      AND (n.preco, n.categoria) IS DISTINCT FROM (o.preco, o.categoria)
+                ) k
+                ORDER BY k.servico_id, k.mes;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+            ''',
+            "DROP TRIGGER IF EXISTS trg_faturamento_servicos ON servicos",
+            '''
+            CREATE TRIGGER trg_faturamento_servicos
+            AFTER UPDATE ON servicos REFERENCING OLD TABLE AS antigas NEW TABLE AS novas
+            FOR EACH STATEMENT EXECUTE FUNCTION atualizar_faturamento_servicos()
+            ''',
+            "SELECT reconstruir_faturamento_mensal()"
+        ]
+    ),
+    (
+        6,
+        "Índice de custos por data cobrindo tipo e valor",
+        [
+            # somar_custos_por_mes: GROUP BY mês/tipo com index-only scan
+            "CREATE INDEX IF NOT EXISTS idx_custos_data_tipo_valor ON custos (data) INCLUDE (tipo, valor)",
+            "DROP INDEX IF EXISTS idx_custos_data",
+            "ANALYZE custos"
+        ]
+    ),
+    (
+        7,
+        "Índices de busca de clientes por nome, telefone e e-mail",
+        [
+            "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+            # buscar_clientes: LIKE '%termo%' nas três colunas (BitmapOr dos índices GIN)
+            "CREATE INDEX IF NOT EXISTS idx_clientes_nome_trgm ON clientes USING gin (lower(nome) gin_trgm_ops)",
+            "CREATE INDEX IF NOT EXISTS idx_clientes_email_trgm ON clientes USING gin (lower(email) gin_trgm_ops)",
+            '''
+            CREATE INDEX IF NOT EXISTS idx_clientes_telefone_trgm
+            ON clientes USING gin (regexp_replace(telefone, '[^0-9]', '', 'g') gin_trgm_ops)
+            ''',
+            # listagem sem termo, paginada por (lower(nome), id)
+            "CREATE INDEX IF NOT EXISTS idx_clientes_nome_id ON clientes (lower(nome), id)",
+            "ANALYZE clientes"
+        ]
+    ),
+    (
+        8,
+        "Valor do serviço gravado no agendamento; faturamento sem depender do preço atual",
+        [
+            "ALTER TABLE agendamentos ADD COLUMN IF NOT EXISTS valor NUMERIC",
+            '''
+            UPDATE agendamentos a
+            SET valor = s.preco
+            FROM servicos s
+            WHERE s.id = a.servico_id AND a.valor IS NULL
+            ''',
+            # Valor e duração são copiados do serviço quando não informados (ou quando
+            # o serviço do agendamento muda); depois disso não mudam com o serviço.
+            '''
+            CREATE OR REPLACE FUNCTION preencher_servico_agendamento() RETURNS trigger AS $$
+            DECLARE
+                v_preco NUMERIC;
+                v_duracao INTEGER;
+                v_trocou BOOLEAN := TG_OP = 'UPDATE' AND NEW.servico_id IS DISTINCT FROM OLD.servico_id;
+            BEGIN
+                IF NEW.valor IS NULL OR NEW.duracao_minutos IS NULL OR v_trocou THEN
+                    SELECT preco, duracao_minutos INTO v_preco, v_duracao
+                    FROM servicos
+                    WHERE id = NEW.servico_id;
+
+                    IF NEW.valor IS NULL
+                       OR (v_trocou AND NEW.valor IS NOT DISTINCT FROM OLD.valor) THEN
+                        NEW.valor := v_preco;
+                    END IF;
+                    IF NEW.duracao_minutos IS NULL
+                       OR (v_trocou AND NEW.duracao_minutos IS NOT DISTINCT FROM OLD.duracao_minutos) THEN
+                        NEW.duracao_minutos := COALESCE(v_duracao, 60);
+                    END IF;
+                END IF;
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql
+            ''',
+            "DROP TRIGGER IF EXISTS trg_agendamentos_duracao ON agendamentos",
+            '''
+            CREATE TRIGGER trg_agendamentos_duracao
+            BEFORE INSERT OR UPDATE ON agendamentos
+            FOR EACH ROW EXECUTE FUNCTION preencher_servico_agendamento()
+            ''',
+            "DROP FUNCTION IF EXISTS preencher_duracao_agendamento()",
+            # O consolidado soma o valor gravado em cada agendamento; o serviço só
+            # fornece a categoria (profissional).
+            '''
+            CREATE OR REPLACE FUNCTION recalcular_faturamento_mensal(p_servico_id INTEGER, p_mes TIMESTAMP)
+            RETURNS void AS $$
+            DECLARE
+                v_inicio TIMESTAMP := date_trunc('month', p_mes);
+                v_ano INTEGER := EXTRACT(YEAR FROM v_inicio);
+                v_mes INTEGER := EXTRACT(MONTH FROM v_inicio);
+            BEGIN
+                PERFORM pg_advisory_xact_lock(COALESCE(p_servico_id, 0), v_ano * 12 + v_mes);
+
+                DELETE FROM faturamento_mensal
+                WHERE ano = v_ano AND mes = v_mes AND servico_id = COALESCE(p_servico_id, 0);
+
+                INSERT INTO faturamento_mensal
+                    (ano, mes, profissional, servico_id, faturamento, atendimentos, clientes_distintos)
+                SELECT v_ano, v_mes, COALESCE(s.categoria, 'Não definido'), COALESCE(p_servico_id, 0),
+                       SUM(COALESCE(a.valor, 0)), COUNT(*), COUNT(DISTINCT a.cliente_id)
+                FROM agendamentos a
+                LEFT JOIN servicos s ON s.id = a.servico_id
+                WHERE a.status = 'realizado'
+                  AND a.data_hora >= v_inicio AND a.data_hora < v_inicio + INTERVAL '1 month'
+                  AND (a.servico_id = p_servico_id OR (p_servico_id IS NULL AND a.servico_id IS NULL))
+                GROUP BY s.categoria;
+            END;
+            $$ LANGUAGE plpgsql
+            ''',
+            '''
+            CREATE OR REPLACE FUNCTION reconstruir_faturamento_mensal() RETURNS INTEGER AS $$
+            DECLARE
+                v_linhas INTEGER;
+            BEGIN
+                LOCK TABLE faturamento_mensal IN EXCLUSIVE MODE;
+                DELETE FROM faturamento_mensal;
+                INSERT INTO faturamento_mensal
+                    (ano, mes, profissional, servico_id, faturamento, atendimentos, clientes_distintos)
+                SELECT EXTRACT(YEAR FROM a.data_hora)::int, EXTRACT(MONTH FROM a.data_hora)::int,
+                       COALESCE(s.categoria, 'Não definido'), COALESCE(a.servico_id, 0),
+                       SUM(COALESCE(a.valor, 0)), COUNT(*), COUNT(DISTINCT a.cliente_id)
+                FROM agendamentos a
+                LEFT JOIN servicos s ON s.id = a.servico_id
+                WHERE a.status = 'realizado'
+                GROUP BY 1, 2, 3, 4;
+                GET DIAGNOSTICS v_linhas = ROW_COUNT;
+                RETURN v_linhas;
+            END;
+            $$ LANGUAGE plpgsql
+            ''',
+            '''
+            CREATE OR REPLACE FUNCTION atualizar_faturamento_agendamentos() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'INSERT' THEN
+                    PERFORM recalcular_faturamento_mensal(k.servico_id, k.mes)
+                    FROM (SELECT DISTINCT servico_id, date_trunc('month', data_hora) AS mes
+                          FROM novas WHERE status = 'realizado') k
+                    ORDER BY k.servico_id, k.mes;
+                ELSIF TG_OP = 'DELETE' THEN
+                    PERFORM recalcular_faturamento_mensal(k.servico_id, k.mes)
+                    FROM (SELECT DISTINCT servico_id, date_trunc('month', data_hora) AS mes
+                          FROM antigas WHERE status = 'realizado') k
+                    ORDER BY k.servico_id, k.mes;
+                ELSE
+                    PERFORM recalcular_faturamento_mensal(k.servico_id, k.mes)
+                    FROM (
+                        SELECT o.servico_id, date_trunc('month', o.data_hora) AS mes
+                        FROM antigas o JOIN novas n ON n.id = o.id
+                        WHERE o.status = 'realizado'
+                          AND (n.status, n.servico_id, n.data_hora, n.cliente_id, n.valor)
+                              IS DISTINCT FROM (o.status, o.servico_id, o.data_hora, o.cliente_id, o.valor)
+                        UNION
+                        SELECT n.servico_id, date_trunc('month', n.data_hora)
+                        FROM antigas o JOIN novas n ON n.id = o.id
+                        WHERE n.status = 'realizado'
+                          AND (n.status, n.servico_id, n.data_hora, n.cliente_id, n.valor)
+                              IS DISTINCT FROM (o.status, o.servico_id, o.data_hora, o.cliente_id, o.valor)
+                    ) k
+                    ORDER BY k.servico_id, k.mes;
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+            ''',
+            # Mudança de preço não altera atendimentos já registrados; só a
+            # categoria (profissional) move o faturamento entre linhas.
+            '''
+            CREATE OR REPLACE FUNCTION atualizar_faturamento_servicos() RETURNS trigger AS $$
+            BEGIN
+                PERFORM recalcular_faturamento_mensal(k.servico_id, k.mes)
+                FROM (
+                    SELECT DISTINCT a.servico_id, date_trunc('month', a.data_hora) AS mes
+                    FROM antigas o
+                    JOIN novas n ON n.id = o.id
+                    JOIN agendamentos a ON a.servico_id = n.id
+                    WHERE a.status = 'realizado'
+                      AND n.categoria IS DISTINCT FROM o.categoria
+                ) k
+                ORDER BY k.servico_id, k.mes;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+            ''',
+            "SELECT reconstruir_faturamento_mensal()",
+            "ANALYZE agendamentos"
+        ]
+    ),
+]
+
+
+def aplicar_migracoes(conn) -> List[int]:
+    """
+    Aplica, em ordem, as migrações ainda não registradas em schema_migrations.
+
+    Cada migração roda na sua própria transação. Um advisory lock impede que dois
+    processos migrem o mesmo banco ao mesmo tempo.
+
+    Args:
+        conn (psycopg2 connection): Conexão com o banco.
+
+    Returns:
+        List[int]: Versões aplicadas nesta execução.
+    """
+    cursor = conn.cursor()
+    cursor.execute(
+        '''
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            versao INTEGER PRIMARY KEY,
+            descricao TEXT NOT NULL,
+            aplicada_em TIMESTAMP NOT NULL DEFAULT NOW()
+        )'''
+    )
+    conn.commit()
+
+    aplicadas = []
+    for versao, descricao, comandos in MIGRACOES:
+        cursor.execute("SELECT pg_advisory_xact_lock(hashtext('schema_migrations'))")
+        cursor.execute("SELECT 1 FROM schema_migrations WHERE versao = %s", (versao,))
+        if cursor.fetchone():
+            conn.rollback()
+            continue
+        try:
+            for cmd in comandos:
+                cursor.execute(cmd)
+            cursor.execute(
+                "INSERT INTO schema_migrations (versao, descricao) VALUES (%s, %s)",
+                (versao, descricao)
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            cursor.close()
+            raise
+        aplicadas.append(versao)
+
+    cursor.close()
+    return aplicadas
+
+
+def versao_atual(conn) -> int:
+    """
+    Retorna a maior versão de migração aplicada (0 se nenhuma).
+
+    Args:
+        conn (psycopg2 connection): Conexão com o banco.
+
+    Returns:
+        int: Versão atual do esquema.
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT to_regclass('schema_migrations') IS NOT NULL")
+    if not cursor.fetchone()[0]:
+        cursor.close()
+        return 0
+    cursor.execute("SELECT COALESCE(MAX(versao), 0) FROM schema_migrations")
+    versao = cursor.fetchone()[0]
+    cursor.close()
+    return versao
@@ -0,0 +1,190 @@
+# infra/paralelo.py
+"""
+Carregamento paralelo das seções de uma página.
+
+Cada seção é uma função de serviço independente. carregar_secoes dispara
+todas em um ThreadPoolExecutor compartilhado pelo processo (cada uma pega a
+sua conexão do pool em get_connection) e devolve os resultados na ordem em que
+ficam prontos, para que a página desenhe cada seção assim que possível.
+
+As threads recebem o contexto do rerun do Streamlit (add_script_run_ctx), então
+st.cache_data e o painel de consultas funcionam como na thread da página.
+
+Uma seção que passa do seu tempo limite não bloqueia as demais: ela é
+devolvida com o último valor obtido para os mesmos argumentos (ou com
+TimeoutError, se nunca houve um) e continua rodando em segundo plano; quando
+termina, o valor fica guardado para o próximo rerun. Enquanto ela roda, novos
+reruns (de qualquer sessão) esperam a mesma execução em vez de disparar outra,
+e as consultas que ela fizer depois que o rerun que a disparou terminou não
+entram no painel de consultas (infra.instrumentacao.vincular_rerun).
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from infra import instrumentacao
+
+try:
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+except ImportError:  # pragma: no cover - versões antigas do Streamlit
+    add_script_run_ctx = get_script_run_ctx = None
+
+MAX_ULTIMOS = 64  # valores guardados para seções expiradas; os menos usados são descartados
+
+
+@dataclass
+class Secao:
+    nome: str
+    funcao: Callable
+    args: tuple = ()
+    timeout: Optional[float] = None  # segundos (padrão SECAO_TIMEOUT_SEGUNDOS)
+
+
+@dataclass
+class ResultadoSecao:
+    nome: str
+    valor: Any = None
+    erro: Optional[BaseException] = None
+    expirou: bool = False  # True: valor é o último obtido antes do tempo limite
+    duracao_ms: float = field(default=0.0)
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_ultimos: "OrderedDict[Tuple[str, tuple], Any]" = OrderedDict()
+_em_andamento: Dict[Tuple[str, tuple], Future] = {}  # execuções ainda não concluídas
+_lock = threading.Lock()  # protege _ultimos e _em_andamento
+
+
+def timeout_padrao() -> float:
+    """Tempo máximo de espera por uma seção, em segundos (SECAO_TIMEOUT_SEGUNDOS)."""
+    return float(os.getenv("SECAO_TIMEOUT_SEGUNDOS", "5"))
+
+
+def obter_executor() -> ThreadPoolExecutor:
+    """
+    Retorna o executor do processo, criando-o na primeira chamada.
+
+    O número de threads vem de PARALELO_MAX_THREADS (padrão 4); mantenha-o
+    menor ou igual ao máximo do pool de conexões.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=int(os.getenv("PARALELO_MAX_THREADS", "4")),
+                    thread_name_prefix="secao"
+                )
+    return _executor
+
+
+def _chave(secao: Secao) -> Tuple[str, tuple]:
+    return f"{secao.funcao.__module__}.{secao.funcao.__qualname__}", secao.args
+
+
+def _executar(secao: Secao, ctx, rerun: Optional[int]) -> Tuple[Any, float]:
+    thread = threading.current_thread()
+    if add_script_run_ctx is not None and ctx is not None:
+        add_script_run_ctx(thread, ctx)
+    instrumentacao.vincular_rerun(rerun)
+    inicio = time.perf_counter()
+    try:
+        valor = secao.funcao(*secao.args)
+    finally:
+        instrumentacao.vincular_rerun(None)
+        if add_script_run_ctx is not None and ctx is not None:
+            add_script_run_ctx(thread, None)
+    chave = _chave(secao)
+    with _lock:
+        _ultimos[chave] = valor
+        _ultimos.move_to_end(chave)
+        while len(_ultimos) > MAX_ULTIMOS:
+            _ultimos.popitem(last=False)
+    return valor, (time.perf_counter() - inicio) * 1000
+
+
+def _submeter(executor: ThreadPoolExecutor, secao: Secao, ctx, rerun: Optional[int]) -> Future:
+    """Dispara a seção, ou reaproveita a execução ainda em andamento com a mesma chave."""
+    chave = _chave(secao)
+    with _lock:
+        futuro = _em_andamento.get(chave)
+        if futuro is not None:
+            return futuro
+        futuro = _em_andamento[chave] = executor.submit(_executar, secao, ctx, rerun)
+
+    def _concluir(concluido: Future) -> None:
+        with _lock:
+            if _em_andamento.get(chave) is concluido:
+                del _em_andamento[chave]
+
+    futuro.add_done_callback(_concluir)
+    return futuro
+
+
+def _resultado_pronto(secao: Secao, futuro: Future) -> ResultadoSecao:
+    erro = futuro.exception()
+    if erro is not None:
+        return ResultadoSecao(secao.nome, erro=erro)
+    valor, duracao_ms = futuro.result()
+    return ResultadoSecao(secao.nome, valor=valor, duracao_ms=duracao_ms)
+
+
+def _resultado_expirado(secao: Secao, espera_ms: float) -> ResultadoSecao:
+    with _lock:
+        chave = _chave(secao)
+        if chave in _ultimos:
+            _ultimos.move_to_end(chave)
+            return ResultadoSecao(secao.nome, valor=_ultimos[chave], expirou=True, duracao_ms=espera_ms)
+    return ResultadoSecao(
+        secao.nome,
+        erro=TimeoutError(f"Seção '{secao.nome}' não respondeu a tempo"),
+        expirou=True,
+        duracao_ms=espera_ms
+    )
+
+
+def carregar_secoes(secoes: List[Secao]) -> Iterator[ResultadoSecao]:
+    """
+    Executa as seções em paralelo e devolve cada resultado assim que fica pronto.
+
+    Args:
+        secoes (List[Secao]): Seções da página.
+
+    Yields:
+        ResultadoSecao: Um resultado por seção, na ordem de conclusão. Exceções
+            da função ficam em erro; seções que passam do tempo limite vêm com
+            expirou=True e o último valor conhecido (ou TimeoutError em erro).
+    """
+    ctx = get_script_run_ctx(suppress_warning=True) if get_script_run_ctx is not None else None
+    rerun = instrumentacao.rerun_atual()
+    executor = obter_executor()
+    inicio = time.monotonic()
+    # por posição: duas seções iguais na mesma página compartilham o mesmo futuro
+    pendentes: Dict[int, Tuple[Future, Secao]] = {
+        i: (_submeter(executor, secao, ctx, rerun), secao) for i, secao in enumerate(secoes)
+    }
+    prazos = {
+        i: inicio + (secao.timeout if secao.timeout is not None else timeout_padrao())
+        for i, (_, secao) in pendentes.items()
+    }
+
+    while pendentes:
+        proximo_prazo = min(prazos[i] for i in pendentes)
+        wait(
+            {futuro for futuro, _ in pendentes.values()},
+            timeout=max(proximo_prazo - time.monotonic(), 0),
+            return_when=FIRST_COMPLETED
+        )
+        for i in [i for i, (futuro, _) in pendentes.items() if futuro.done()]:
+            futuro, secao = pendentes.pop(i)
+            yield _resultado_pronto(secao, futuro)
+
+        agora = time.monotonic()
+        for i in [i for i in pendentes if prazos[i] <= agora]:
+            yield _resultado_expirado(pendentes.pop(i)[1], (agora - inicio) * 1000)
@@ -0,0 +1,189 @@
+# infra/perfil.py
+"""
+Perfilamento opcional dos reruns das páginas.
+
+Um rerun perfilado grava um arquivo em PERFIL_DIR (padrão: perfis/) com o
+nome da página e a duração, por exemplo 20250429-153012_Clientes_843ms.prof:
+
+- com pyinstrument instalado, um relatório HTML (flamegraph navegável);
+- sem ele, ou com PERFIL_FORMATO=cprofile, as estatísticas do cProfile
+  (abrir com `python -m pstats arquivo.prof` ou snakeviz).
+
+Quando perfilar:
+- PERFIL_PAGINAS=1 liga a amostragem: cada rerun é perfilado com
+  probabilidade PERFIL_TAXA (padrão 0.01), seguro para ficar ligado;
+- ?perfil=1 na URL perfila todos os reruns da sessão enquanto o parâmetro
+  estiver presente (PERFIL_PAGINAS=0 desliga também esta opção).
+
+Só é perfilada a thread do script; o trabalho das seções carregadas em
+paralelo (infra.paralelo) aparece como espera. Reruns mais rápidos que
+PERFIL_MIN_MS não são gravados, e apenas os PERFIL_MAX_ARQUIVOS mais recentes
+são mantidos.
+"""
+
+import cProfile
+import os
+import random
+import re
+import time
+import unicodedata
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+try:
+    from pyinstrument import Profiler as ProfilerPyinstrument
+except ImportError:  # dependência opcional
+    ProfilerPyinstrument = None
+
+
+def _ligado() -> Optional[bool]:
+    valor = os.getenv("PERFIL_PAGINAS", "").lower()
+    if valor in ("1", "true", "sim"):
+        return True
+    if valor in ("0", "false", "nao", "não"):
+        return False
+    return None
+
+
+def taxa_padrao() -> float:
+    """Fração dos reruns perfilados com PERFIL_PAGINAS=1 (PERFIL_TAXA)."""
+    return float(os.getenv("PERFIL_TAXA", "0.01"))
+
+
+def diretorio() -> Path:
+    """Diretório onde os perfis são gravados (PERFIL_DIR)."""
+    return Path(os.getenv("PERFIL_DIR", "perfis"))
+
+
+def deve_perfilar(pedido: bool = False) -> bool:
+    """
+    Decide se o rerun atual será perfilado.
+
+    Args:
+        pedido (bool): True se a sessão pediu o perfil (?perfil=1).
+
+    Returns:
+        bool: True para perfilar este rerun.
+    """
+    ligado = _ligado()
+    if ligado is False:
+        return False
+    if pedido:
+        return True
+    return bool(ligado) and random.random() < taxa_padrao()
+
+
+def _formato() -> str:
+    if ProfilerPyinstrument is not None and os.getenv("PERFIL_FORMATO", "").lower() != "cprofile":
+        return "html"
+    return "prof"
+
+
+def _nome_arquivo(pagina: str) -> str:
+    nome = unicodedata.normalize("NFKD", Path(pagina).stem).encode("ascii", "ignore").decode()
+    nome = re.sub(r"^\d+_", "", nome).strip("_")
+    return re.sub(r"[^A-Za-z0-9]+", "-", nome).strip("-") or "pagina"
+
+
+class PerfilRerun:
+    """
+    Perfil de um único rerun, iniciado no começo da página e gravado no fim.
+    """
+
+    def __init__(self, pagina: str):
+        self.pagina = pagina
+        self.formato = _formato()
+        self._profiler = ProfilerPyinstrument() if self.formato == "html" else cProfile.Profile()
+        self._inicio = 0.0
+
+    def iniciar(self) -> None:
+        self._inicio = time.perf_counter()
+        if self.formato == "html":
+            self._profiler.start()
+        else:
+            self._profiler.enable()
+
+    def parar(self) -> float:
+        """Para o perfilador e retorna a duração do rerun em ms."""
+        if self.formato == "html":
+            if self._profiler.is_running:
+                self._profiler.stop()
+        else:
+            self._profiler.disable()
+        return (time.perf_counter() - self._inicio) * 1000
+
+    def gravar(self) -> Optional[Path]:
+        """
+        Para o perfilador e grava o arquivo do perfil.
+
+        Returns:
+            Optional[Path]: Caminho do arquivo, ou None se o rerun foi mais
+                rápido que PERFIL_MIN_MS.
+        """
+        duracao_ms = self.parar()
+        if duracao_ms < float(os.getenv("PERFIL_MIN_MS", "0")):
+            return None
+
+        pasta = diretorio()
+        pasta.mkdir(parents=True, exist_ok=True)
+        caminho = pasta / (
+            f"{datetime.now():%Y%m%d-%H%M%S-%f}_{_nome_arquivo(self.pagina)}_{duracao_ms:.0f}ms.{self.formato}"
+        )
+        if self.formato == "html":
+            caminho.write_text(self._profiler.output_html(), encoding="utf-8")
+        else:
+            self._profiler.dump_stats(str(caminho))
+        limpar_antigos()
+        return caminho
+
+
+def iniciar(pagina: str, pedido: bool = False) -> Optional[PerfilRerun]:
+    """
+    Inicia o perfil do rerun, se este rerun for sorteado ou pedido.
+
+    Args:
+        pagina (str): Caminho ou nome do script da página.
+        pedido (bool): True se a sessão pediu o perfil (?perfil=1).
+
+    Returns:
+        Optional[PerfilRerun]: Perfil em andamento, ou None.
+    """
+    if not deve_perfilar(pedido):
+        return None
+    perfil = PerfilRerun(pagina)
+    try:
+        perfil.iniciar()
+    except (RuntimeError, ValueError):
+        # outro perfilador já ativo nesta thread
+        return None
+    return perfil
+
+
+def limpar_antigos(maximo: Optional[int] = None) -> int:
+    """
+    Apaga os perfis mais antigos além do limite.
+
+    Args:
+        maximo (Optional[int]): Quantidade mantida (padrão PERFIL_MAX_ARQUIVOS, 200).
+
+    Returns:
+        int: Quantidade de arquivos apagados.
+    """
+    maximo = maximo if maximo is not None else int(os.getenv("PERFIL_MAX_ARQUIVOS", "200"))
+    pasta = diretorio()
+    if not pasta.is_dir():
+        return 0
+    arquivos = sorted(
+        (p for p in pasta.iterdir() if p.suffix in (".prof", ".html")),
+        key=lambda p: p.name,
+        reverse=True
+    )
+    apagados = 0
+    for arquivo in arquivos[maximo:]:
+        try:
+            arquivo.unlink()
+            apagados += 1
+        except FileNotFoundError:  # apagado por outra sessão
+            pass
+    return apagados
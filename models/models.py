@@ -113,6 +113,8 @@ class Agendamento:
     metodo_pagamento: Optional[str] = None
     cliente_confirmado: bool = False
     observacoes: Optional[str] = None
+    valor: Optional[float] = None  # preço do serviço na data do agendamento
+    duracao_minutos: Optional[int] = None
 
 @dataclass
 class Custo:
@@ -7,66 +7,79 @@ Página de Gerenciamento de Agendamentos para o Studio.
 
 import streamlit as st
 import pandas as pd
-from datetime import datetime, timedelta
+import plotly.express as px
+from datetime import datetime, timedelta, time
 
-from services import agendamento_service
-from repositories.cliente_repo import listar_clientes
-from repositories.servico_repo import listar_servicos
+from services import agendamento_service, disponibilidade_service
+from services.cliente_service import listar_clientes
+from services.servico_service import obter_servicos
 from utils.formatters import (
     formatar_data_hora_pt,
     formatar_moeda_euro,
     status_agendamento,
 )
+from utils.painel_dev import encerrar_pagina, iniciar_pagina, mostrar_painel_consultas
 
 # -------------------------------
 # Dados principais
 # -------------------------------
 def carregar_dados():
     clientes = listar_clientes()
-    servicos = listar_servicos()
+    servicos = obter_servicos()
     return clientes, servicos
 
 def dicionarios_auxiliares(clientes, servicos):
     return {
         'cliente_nomes': {c.id: c.nome for c in clientes},
         'servico_nomes': {s.id: s.nome for s in servicos},
-        'servico_precos': {s.id: s.preco for s in servicos},
         'servico_duracoes': {s.id: s.duracao_minutos for s in servicos},
     }
 
 # -------------------------------
 # Estatísticas
 # -------------------------------
-def mostrar_estatisticas(agendamentos):
+def mostrar_estatisticas(estatisticas):
     st.markdown("### 📊 Estatísticas Rápidas")
-    total = len(agendamentos)
-    pendentes = sum(1 for a in agendamentos if a.status == "pendente")
-    realizados = sum(1 for a in agendamentos if a.status == "realizado")
-    cancelados = sum(1 for a in agendamentos if a.status == "cancelado")
 
     col1, col2, col3, col4 = st.columns(4)
-    col1.metric("Total", total)
-    col2.metric("Pendentes", pendentes)
-    col3.metric("Realizados", realizados)
-    col4.metric("Cancelados", cancelados)
+    col1.metric("Total", estatisticas["total"])
+    col2.metric("Pendentes", estatisticas["pendente"])
+    col3.metric("Realizados", estatisticas["realizado"])
+    col4.metric("Cancelados", estatisticas["cancelado"])
 
 # -------------------------------
 # Listagem
 # -------------------------------
-def mostrar_lista_agendamentos(agendamentos, nomes):
+TAMANHO_PAGINA = 50
+
+def periodo_do_filtro(filtro):
+    hoje = datetime.now().date()
+    dias = {"Hoje": 0, "7 dias": 7, "30 dias": 30}.get(filtro)
+    if dias is None:
+        return None, None
+    return datetime.combine(hoje, time.min), datetime.combine(hoje + timedelta(days=dias), time.max)
+
+def mostrar_lista_agendamentos(nomes):
     st.subheader("📋 Lista de Agendamentos")
 
     filtro = st.selectbox("Filtrar por período", ["Hoje", "7 dias", "30 dias", "Todos"])
-    hoje = datetime.now().date()
 
-    if filtro == "Hoje":
-        agendamentos = [a for a in agendamentos if a.data_hora.date() == hoje]
-    elif filtro == "7 dias":
-        fim = hoje + timedelta(days=7)
-        agendamentos = [a for a in agendamentos if hoje <= a.data_hora.date() <= fim]
-    elif filtro == "30 dias":
-        fim = hoje + timedelta(days=30)
-        agendamentos = [a for a in agendamentos if hoje <= a.data_hora.date() <= fim]
+    # Pilha com o cursor (data_hora, id) de início de cada página visitada
+    if st.session_state.get("lista_filtro") != filtro:
+        st.session_state.lista_filtro = filtro
+        st.session_state.lista_cursores = [None]
+    cursores = st.session_state.lista_cursores
+
+    data_inicio, data_fim = periodo_do_filtro(filtro)
+    agendamentos = agendamento_service.obter_agendamentos_filtrados(
+        data_inicio=data_inicio,
+        data_fim=data_fim,
+        limite=TAMANHO_PAGINA + 1,
+        cursor_pagina=cursores[-1],
+        crescente=filtro != "Todos"
+    )
+    tem_proxima = len(agendamentos) > TAMANHO_PAGINA
+    agendamentos = agendamentos[:TAMANHO_PAGINA]
 
     if not agendamentos:
         st.info("Nenhum agendamento encontrado para o filtro selecionado.")
@@ -77,12 +90,23 @@ def mostrar_lista_agendamentos(agendamentos, nomes):
         "Data e Hora": formatar_data_hora_pt(a.data_hora),
         "Cliente": nomes['cliente_nomes'].get(a.cliente_id, f"Cliente {a.cliente_id}"),
         "Serviço": nomes['servico_nomes'].get(a.servico_id, f"Serviço {a.servico_id}"),
-        "Valor": formatar_moeda_euro(nomes['servico_precos'].get(a.servico_id, 0)),
+        "Valor": formatar_moeda_euro(a.valor or 0),
         "Status": a.status.capitalize(),
         "Observações": a.observacoes or "-"
-    } for a in agendamentos]).sort_values(by="Data e Hora").set_index("ID")
+    } for a in agendamentos]).set_index("ID")
 
     st.dataframe(df, use_container_width=True)
+
+    col_ant, col_pag, col_prox = st.columns([1, 2, 1])
+    if col_ant.button("⬅️ Anterior", disabled=len(cursores) == 1, key="pagina_anterior"):
+        cursores.pop()
+        st.rerun()
+    col_pag.caption(f"Página {len(cursores)}")
+    if col_prox.button("Próxima ➡️", disabled=not tem_proxima, key="pagina_proxima"):
+        ultimo = agendamentos[-1]
+        cursores.append((ultimo.data_hora, ultimo.id))
+        st.rerun()
+
     mostrar_opcoes_status(agendamentos)
 
 # -------------------------------
@@ -114,9 +138,22 @@ def mostrar_formulario(clientes, servicos, nomes):
         servico_selecionado = st.selectbox("Serviço", servico_options)
         servico_id = None if servico_selecionado == "Selecione um serviço..." else int(servico_selecionado.split(":")[0])
 
-        # Data, hora, status, observações
+        # Data, horário, status, observações
         data = st.date_input("Data", value=st.session_state.get("data", datetime.now()))
-        hora = st.time_input("Hora", value=st.session_state.get("hora", datetime.now().time()))
+
+        horarios_livres = []
+        if servico_id:
+            inicio_busca = max(datetime.combine(data, time.min), datetime.now().replace(second=0, microsecond=0))
+            horarios_livres = agendamento_service.buscar_horarios_disponiveis(
+                servico_id, inicio_busca, quantidade=8, agendamento_id=agendamento_id
+            )
+        horario_livre = st.selectbox(
+            "Horários disponíveis",
+            [None] + horarios_livres,
+            format_func=lambda h: "Informar manualmente" if h is None else formatar_data_hora_pt(h)
+        )
+        if horario_livre is None:
+            hora = st.time_input("Hora", value=st.session_state.get("hora", datetime.now().time()))
         status = st.selectbox("Status", status_agendamento())
         observacoes = st.text_area("Observações", value=st.session_state.get("observacoes", ""))
 
@@ -136,7 +173,7 @@ def mostrar_formulario(clientes, servicos, nomes):
                     st.error("Selecione um serviço!")
                     return
 
-                data_hora = datetime.combine(data, hora)
+                data_hora = horario_livre or datetime.combine(data, hora)
                 modo = "editar" if agendamento_id else "criar"
 
                 sucesso, mensagem, sugestao = agendamento_service.salvar_agendamento(
@@ -156,7 +193,7 @@ def mostrar_formulario(clientes, servicos, nomes):
                 else:
                     st.error(mensagem)
                     if sugestao:
-                        st.info(f"Sugestão de horário: {sugestao.strftime('%H:%M')}")
+                        st.info(f"Sugestão de horário: {formatar_data_hora_pt(sugestao)}")
 
 # -------------------------------
 # Limpeza de estado do formulário
@@ -205,37 +242,77 @@ def mostrar_timeline_dia():
     data_agenda = st.date_input("Selecione uma data", value=datetime.now().date())
 
     agendamentos_do_dia = agendamento_service.obter_agendamentos_filtrados(
-        data_inicio=data_agenda,
-        data_fim=data_agenda
+        data_inicio=datetime.combine(data_agenda, time.min),
+        data_fim=datetime.combine(data_agenda, time.max),
+        crescente=True
     )
 
     if not agendamentos_do_dia:
         st.info("Nenhum agendamento para esse dia.")
         return
 
-    agendamentos_ordenados = sorted(agendamentos_do_dia, key=lambda a: a.data_hora)
-    for ag in agendamentos_ordenados:
+    for ag in agendamentos_do_dia:
         st.write(f"- {formatar_data_hora_pt(ag.data_hora)} | {ag.status.capitalize()} | Cliente {ag.cliente_id}")
 
 # -------------------------------
-# Main
+# Disponibilidade da semana
 # -------------------------------
-def main():
-    st.set_page_config(page_title="Agendamentos", page_icon="🗕️", layout="wide")
-    st.title("📅 Gerenciamento de Agendamentos")
+def mostrar_disponibilidade_semana():
+    st.subheader("🟩 Disponibilidade da Semana")
+    inicio = st.date_input("A partir de", value=datetime.now().date(), key="disp_inicio")
 
-    clientes, servicos = carregar_dados()
-    nomes = dicionarios_auxiliares(clientes, servicos)
+    servicos, slots, ocupacao = disponibilidade_service.calcular_matriz_ocupacao(
+        datetime.combine(inicio, time.min)
+    )
+    if not servicos or not slots:
+        st.info("Nenhum serviço ou horário de funcionamento no período.")
+        return
 
-    mostrar_formulario(clientes, servicos, nomes)
-    agendamentos = agendamento_service.obter_agendamentos_filtrados()
-    mostrar_estatisticas(agendamentos)
+    dias_semana = ["Seg", "Ter", "Qua", "Qui", "Sex", "Sáb", "Dom"]
+    fig = px.imshow(
+        ocupacao.astype(int),
+        x=[f"{dias_semana[h.weekday()]} {h.strftime('%d/%m %H:%M')}" for h in slots],
+        y=[f"{s.nome} ({s.categoria})" for s in servicos],
+        color_continuous_scale=[[0, "#e8f5e9"], [1, "#d63384"]],
+        zmin=0,
+        zmax=1,
+        aspect="auto"
+    )
+    fig.update_coloraxes(showscale=False)
+    fig.update_layout(height=max(300, 28 * len(servicos)), xaxis_title=None, yaxis_title=None)
+    st.caption("Verde: livre · Rosa: ocupado")
+    st.plotly_chart(fig, use_container_width=True)
 
-    view = st.radio("Visualização:", ["Lista de Agendamentos", "Agenda por Data"], horizontal=True)
-    if view == "Lista de Agendamentos":
-        mostrar_lista_agendamentos(agendamentos, nomes)
-    elif view == "Agenda por Data":
-        mostrar_timeline_dia()
+# -------------------------------
+# Main
+# -------------------------------
+def main():
+    st.set_page_config(page_title="Agendamentos", page_icon="🗕️", layout="wide")
+    iniciar_pagina()
+    try:
+        st.title("📅 Gerenciamento de Agendamentos")
+
+        clientes, servicos = carregar_dados()
+        nomes = dicionarios_auxiliares(clientes, servicos)
+
+        mostrar_formulario(clientes, servicos, nomes)
+        mostrar_estatisticas(agendamento_service.obter_estatisticas_status())
+
+        view = st.radio(
+            "Visualização:",
+            ["Lista de Agendamentos", "Agenda por Data", "Disponibilidade da Semana"],
+            horizontal=True
+        )
+        if view == "Lista de Agendamentos":
+            mostrar_lista_agendamentos(nomes)
+        elif view == "Agenda por Data":
+            mostrar_timeline_dia()
+        elif view == "Disponibilidade da Semana":
+            mostrar_disponibilidade_semana()
+
+        mostrar_painel_consultas()
+    finally:
+        encerrar_pagina()
 
 if __name__ == "__main__":
     main()
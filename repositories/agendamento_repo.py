@@ -6,13 +6,26 @@ Data: 2025-04-29
 
 Repositório responsável por operações relacionadas a agendamentos.
 """
+from psycopg2 import errors
+from psycopg2.extras import execute_values
+
 from infra.database import get_connection
+from infra.cache import invalidar
 from models.models import Agendamento
+from repositories import servico_repo
 from repositories.cliente_repo import atualizar_ultima_visita
-from typing import Optional, List
+from typing import Optional, List, Tuple, Dict
 from datetime import datetime
 from datetime import datetime, timedelta
 
+
+class ConflitoHorario(Exception):
+    """
+    O horário se sobrepõe a outro agendamento não cancelado do mesmo serviço
+    (restrição agendamentos_sem_sobreposicao).
+    """
+
+
 def adicionar_agendamento(
     cliente_id: int,
     servico_id: int,
@@ -28,23 +41,84 @@ def adicionar_agendamento(
 
     Returns:
         int: ID do agendamento criado.
+
+    Raises:
+        ConflitoHorario: Se o horário se sobrepuser a outro agendamento do serviço.
     """
     conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute(
-        """
-        INSERT INTO agendamentos (cliente_id, servico_id, data_hora, status, pago, metodo_pagamento, cliente_confirmado, observacoes)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        RETURNING id
-        """,
-        (cliente_id, servico_id, data_hora, status, pago, metodo_pagamento, cliente_confirmado, observacoes)
-    )
+    try:
+        cursor.execute(
+            """
+            INSERT INTO agendamentos (cliente_id, servico_id, data_hora, status, pago, metodo_pagamento, cliente_confirmado, observacoes)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            RETURNING id
+            """,
+            (cliente_id, servico_id, data_hora, status, pago, metodo_pagamento, cliente_confirmado, observacoes)
+        )
+    except errors.ExclusionViolation as e:
+        conn.rollback()
+        cursor.close()
+        conn.close()
+        raise ConflitoHorario(str(e)) from e
     agendamento_id = cursor.fetchone()[0]
     conn.commit()
+    invalidar("agendamentos")
     cursor.close()
     conn.close()
     return agendamento_id
 
+def adicionar_agendamentos_em_lote(agendamentos: List[Agendamento], tamanho_pagina: int = 1000) -> List[int]:
+    """
+    Insere vários agendamentos em uma única transação com execute_values.
+
+    O campo id dos objetos é ignorado; valor e duracao_minutos vazios são
+    copiados do serviço pelo banco. Se algum horário violar a restrição de
+    sobreposição, nada é gravado.
+
+    Args:
+        agendamentos (List[Agendamento]): Agendamentos a inserir.
+        tamanho_pagina (int): Linhas por comando INSERT.
+
+    Returns:
+        List[int]: IDs criados, na ordem da lista recebida.
+
+    Raises:
+        ConflitoHorario: Se algum horário se sobrepuser a outro agendamento do serviço.
+    """
+    if not agendamentos:
+        return []
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        ids = execute_values(
+            cursor,
+            """
+            INSERT INTO agendamentos (cliente_id, servico_id, data_hora, status, pago, metodo_pagamento,
+                                      cliente_confirmado, observacoes, valor, duracao_minutos)
+            VALUES %s
+            RETURNING id
+            """,
+            [
+                (a.cliente_id, a.servico_id, a.data_hora, a.status, a.pago,
+                 a.metodo_pagamento, a.cliente_confirmado, a.observacoes,
+                 a.valor, a.duracao_minutos)
+                for a in agendamentos
+            ],
+            page_size=tamanho_pagina,
+            fetch=True
+        )
+    except errors.ExclusionViolation as e:
+        conn.rollback()
+        cursor.close()
+        conn.close()
+        raise ConflitoHorario(str(e)) from e
+    conn.commit()
+    invalidar("agendamentos")
+    cursor.close()
+    conn.close()
+    return [r[0] for r in ids]
+
 def atualizar_agendamento(
     id: int,
     cliente_id: int,
@@ -61,21 +135,31 @@ def atualizar_agendamento(
 
     Returns:
         bool: True se atualizado, False caso contrário.
+
+    Raises:
+        ConflitoHorario: Se o novo horário se sobrepuser a outro agendamento do serviço.
     """
     conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute(
-        """
-        UPDATE agendamentos
-        SET cliente_id=%s, servico_id=%s, data_hora=%s, status=%s,
-            pago=%s, metodo_pagamento=%s, cliente_confirmado=%s, observacoes=%s
-        WHERE id=%s
-        """,
-        (cliente_id, servico_id, data_hora, status, pago, metodo_pagamento, cliente_confirmado, observacoes, id)
-    )
+    try:
+        cursor.execute(
+            """
+            UPDATE agendamentos
+            SET cliente_id=%s, servico_id=%s, data_hora=%s, status=%s,
+                pago=%s, metodo_pagamento=%s, cliente_confirmado=%s, observacoes=%s
+            WHERE id=%s
+            """,
+            (cliente_id, servico_id, data_hora, status, pago, metodo_pagamento, cliente_confirmado, observacoes, id)
+        )
+    except errors.ExclusionViolation as e:
+        conn.rollback()
+        cursor.close()
+        conn.close()
+        raise ConflitoHorario(str(e)) from e
     if status == "realizado":
         atualizar_ultima_visita(cliente_id, data_hora, conn)
     conn.commit()
+    invalidar("agendamentos", "clientes")
     sucesso = cursor.rowcount > 0
     cursor.close()
     conn.close()
@@ -92,6 +176,7 @@ def confirmar_cliente_chegou(id: int, confirmado: bool = True) -> bool:
     cursor = conn.cursor()
     cursor.execute("UPDATE agendamentos SET cliente_confirmado=%s WHERE id=%s", (confirmado, id))
     conn.commit()
+    invalidar("agendamentos")
     sucesso = cursor.rowcount > 0
     cursor.close()
     conn.close()
@@ -111,6 +196,7 @@ def registrar_pagamento(id: int, pago: bool = True, metodo_pagamento: Optional[s
         (pago, metodo_pagamento, id)
     )
     conn.commit()
+    invalidar("agendamentos")
     sucesso = cursor.rowcount > 0
     cursor.close()
     conn.close()
@@ -127,28 +213,29 @@ def excluir_agendamento(id: int) -> bool:
     cursor = conn.cursor()
     cursor.execute("DELETE FROM agendamentos WHERE id=%s", (id,))
     conn.commit()
+    invalidar("agendamentos")
     sucesso = cursor.rowcount > 0
     cursor.close()
     conn.close()
     return sucesso
 
-def listar_agendamentos(
+def _consulta_agendamentos(
     filtro_status: Optional[str] = None,
     data_inicio: Optional[datetime] = None,
-    data_fim: Optional[datetime] = None
-) -> List[Agendamento]:
+    data_fim: Optional[datetime] = None,
+    cursor_pagina: Optional[Tuple[datetime, int]] = None,
+    crescente: bool = False
+) -> Tuple[str, list]:
     """
-    Lista agendamentos com filtros opcionais de status e período.
+    Monta o SELECT de agendamentos com os filtros informados.
 
     Returns:
-        List[Agendamento]: Lista de agendamentos.
+        Tuple[str, list]: Consulta e parâmetros.
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-
     query = """
     SELECT id, cliente_id, servico_id, data_hora, status,
-           pago, metodo_pagamento, cliente_confirmado, observacoes
+           pago, metodo_pagamento, cliente_confirmado, observacoes,
+           valor, duracao_minutos
     FROM agendamentos
     """
     conditions = []
@@ -162,25 +249,100 @@ def listar_agendamentos(
     if data_fim:
         conditions.append("data_hora <= %s")
         params.append(data_fim)
+    if cursor_pagina:
+        conditions.append("(data_hora, id) > (%s, %s)" if crescente else "(data_hora, id) < (%s, %s)")
+        params.extend(cursor_pagina)
 
     if conditions:
         query += " WHERE " + " AND ".join(conditions)
 
-    query += " ORDER BY data_hora DESC"
+    query += " ORDER BY data_hora, id" if crescente else " ORDER BY data_hora DESC, id DESC"
+    return query, params
+
+def _agendamento_da_linha(r: tuple) -> Agendamento:
+    return Agendamento(
+        id=r[0], cliente_id=r[1], servico_id=r[2], data_hora=r[3],
+        status=r[4], pago=r[5], metodo_pagamento=r[6],
+        cliente_confirmado=r[7], observacoes=r[8],
+        valor=r[9], duracao_minutos=r[10]
+    )
+
+def listar_agendamentos(
+    filtro_status: Optional[str] = None,
+    data_inicio: Optional[datetime] = None,
+    data_fim: Optional[datetime] = None,
+    limite: Optional[int] = None,
+    cursor_pagina: Optional[Tuple[datetime, int]] = None,
+    crescente: bool = False
+) -> List[Agendamento]:
+    """
+    Lista agendamentos com filtros opcionais de status e período.
+
+    Suporta paginação por cursor (keyset): passe em cursor_pagina o par
+    (data_hora, id) do último agendamento da página anterior.
+
+    Args:
+        filtro_status (Optional[str]): Status do agendamento.
+        data_inicio (Optional[datetime]): Início do período (inclusivo).
+        data_fim (Optional[datetime]): Fim do período (inclusivo).
+        limite (Optional[int]): Quantidade máxima de agendamentos.
+        cursor_pagina (Optional[Tuple[datetime, int]]): (data_hora, id) do último item já exibido.
+        crescente (bool): Ordena do mais antigo para o mais recente (padrão: mais recente primeiro).
+
+    Returns:
+        List[Agendamento]: Lista de agendamentos.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    query, params = _consulta_agendamentos(filtro_status, data_inicio, data_fim, cursor_pagina, crescente)
+    if limite:
+        query += " LIMIT %s"
+        params.append(limite)
 
     cursor.execute(query, tuple(params))
     rows = cursor.fetchall()
-    agendamentos = [
-        Agendamento(
-            id=r[0], cliente_id=r[1], servico_id=r[2], data_hora=r[3],
-            status=r[4], pago=r[5], metodo_pagamento=r[6],
-            cliente_confirmado=r[7], observacoes=r[8]
-        ) for r in rows
-    ]
+    agendamentos = [_agendamento_da_linha(r) for r in rows]
     cursor.close()
     conn.close()
     return agendamentos
 
+def contar_agendamentos_por_status(
+    data_inicio: Optional[datetime] = None,
+    data_fim: Optional[datetime] = None
+) -> Dict[str, int]:
+    """
+    Conta os agendamentos de cada status com um único GROUP BY.
+
+    Args:
+        data_inicio (Optional[datetime]): Início do período (inclusivo).
+        data_fim (Optional[datetime]): Fim do período (inclusivo).
+
+    Returns:
+        Dict[str, int]: Quantidade por status.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    query = "SELECT status, COUNT(*) FROM agendamentos"
+    conditions = []
+    params = []
+    if data_inicio:
+        conditions.append("data_hora >= %s")
+        params.append(data_inicio)
+    if data_fim:
+        conditions.append("data_hora <= %s")
+        params.append(data_fim)
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " GROUP BY status"
+
+    cursor.execute(query, tuple(params))
+    contagens = {status: total for status, total in cursor.fetchall()}
+    cursor.close()
+    conn.close()
+    return contagens
+
 def buscar_agendamento(id: int) -> Optional[Agendamento]:
     """
     Retorna um agendamento pelo ID.
@@ -193,7 +355,8 @@ def buscar_agendamento(id: int) -> Optional[Agendamento]:
     cursor.execute(
         """
         SELECT id, cliente_id, servico_id, data_hora, status,
-               pago, metodo_pagamento, cliente_confirmado, observacoes
+               pago, metodo_pagamento, cliente_confirmado, observacoes,
+               valor, duracao_minutos
         FROM agendamentos
         WHERE id = %s
         """,
@@ -206,11 +369,7 @@ def buscar_agendamento(id: int) -> Optional[Agendamento]:
     if not row:
         return None
 
-    return Agendamento(
-        id=row[0], cliente_id=row[1], servico_id=row[2], data_hora=row[3],
-        status=row[4], pago=row[5], metodo_pagamento=row[6],
-        cliente_confirmado=row[7], observacoes=row[8]
-    )
+    return _agendamento_da_linha(row)
 
 def obter_proximos_agendamentos(dias=7):
     """Retorna os próximos agendamentos dentro do período especificado"""
@@ -268,7 +427,8 @@ def listar_agendamentos_por_servico(servico_id: int) -> List[Agendamento]:
     cursor = conn.cursor()
     cursor.execute("""
         SELECT id, cliente_id, servico_id, data_hora, status,
-               pago, metodo_pagamento, cliente_confirmado, observacoes
+               pago, metodo_pagamento, cliente_confirmado, observacoes,
+               valor, duracao_minutos
         FROM agendamentos
         WHERE servico_id = %s
         ORDER BY data_hora
@@ -277,29 +437,83 @@ def listar_agendamentos_por_servico(servico_id: int) -> List[Agendamento]:
     cursor.close()
     conn.close()
 
-    return [
-        Agendamento(
-            id=r[0], cliente_id=r[1], servico_id=r[2], data_hora=r[3],
-            status=r[4], pago=r[5], metodo_pagamento=r[6],
-            cliente_confirmado=r[7], observacoes=r[8]
-        ) for r in rows
-    ]
+    return [_agendamento_da_linha(r) for r in rows]
 
-def obter_duracao_servico(servico_id: int) -> int:
+def listar_intervalos_ocupados(
+    servico_id: int,
+    inicio: datetime,
+    fim: datetime
+) -> List[Tuple[int, datetime, datetime]]:
     """
-    Retorna a duração, em minutos, de um serviço específico.
+    Retorna os agendamentos não cancelados de um serviço que ocupam parte do período.
+
+    Usa a coluna periodo (início + duração do próprio agendamento) e o índice GiST da
+    restrição agendamentos_sem_sobreposicao, lendo apenas a janela pedida.
 
     Args:
-        servico_id (int): ID do serviço.
+        servico_id (int): ID do serviço (profissional).
+        inicio (datetime): Início do período.
+        fim (datetime): Fim do período (exclusivo).
 
     Returns:
-        int: Duração do serviço em minutos.
+        List[Tuple[int, datetime, datetime]]: (id, início, fim) ordenados pelo início.
     """
     conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT duracao_minutos FROM servicos WHERE id = %s", (servico_id,))
-    row = cursor.fetchone()
+    cursor.execute(
+        """
+        SELECT id, lower(periodo), upper(periodo)
+        FROM agendamentos
+        WHERE servico_id = %s
+          AND status <> 'cancelado'
+          AND periodo && tsrange(%s, %s)
+        ORDER BY data_hora
+        """,
+        (servico_id, inicio, fim)
+    )
+    rows = cursor.fetchall()
+    cursor.close()
+    conn.close()
+    return [(r[0], r[1], r[2]) for r in rows]
+
+def listar_intervalos_periodo(inicio: datetime, fim: datetime) -> List[Tuple[int, datetime, datetime]]:
+    """
+    Retorna os agendamentos não cancelados de todos os serviços que ocupam parte do período.
+
+    Args:
+        inicio (datetime): Início do período.
+        fim (datetime): Fim do período (exclusivo).
+
+    Returns:
+        List[Tuple[int, datetime, datetime]]: (servico_id, início, fim) de cada agendamento.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        SELECT servico_id, lower(periodo), upper(periodo)
+        FROM agendamentos
+        WHERE status <> 'cancelado'
+          AND periodo && tsrange(%s, %s)
+        """,
+        (inicio, fim)
+    )
+    rows = cursor.fetchall()
     cursor.close()
     conn.close()
+    return [(r[0], r[1], r[2]) for r in rows]
+
+def obter_duracao_servico(servico_id: int) -> int:
+    """
+    Retorna a duração, em minutos, de um serviço específico.
+
+    Usa o mapa de serviços em memória de servico_repo, sem consultar o banco.
+
+    Args:
+        servico_id (int): ID do serviço.
 
-    return row[0] if row and row[0] else 60  # 60 minutos como fallback
+    Returns:
+        int: Duração do serviço em minutos.
+    """
+    servico = servico_repo.buscar_servico(servico_id)
+    return servico.duracao_minutos if servico and servico.duracao_minutos else 60  # 60 minutos como fallback
@@ -2,10 +2,14 @@
 """
 Repositório responsável por operações relacionadas a clientes.
 """
+from psycopg2.extras import execute_values
+
 from infra.database import get_connection
+from infra.cache import invalidar
 from models.models import Cliente
-from datetime import datetime
-from typing import Optional
+import re
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
 
 def adicionar_cliente(nome: str, telefone: str, email: str, observacoes: Optional[str] = None) -> int:
     """
@@ -33,10 +37,61 @@ def adicionar_cliente(nome: str, telefone: str, email: str, observacoes: Optiona
     )
     cliente_id = cursor.fetchone()[0]
     conn.commit()
+    invalidar("clientes")
     cursor.close()
     conn.close()
     return cliente_id
 
+def adicionar_clientes_em_lote(clientes: list[Cliente], tamanho_pagina: int = 1000) -> list[int]:
+    """
+    Insere vários clientes em uma única transação com execute_values.
+
+    O campo id dos objetos é ignorado; data_cadastro vazia recebe a data atual.
+
+    Args:
+        clientes (list[Cliente]): Clientes a inserir.
+        tamanho_pagina (int): Linhas por comando INSERT.
+
+    Returns:
+        list[int]: IDs criados, na ordem da lista recebida.
+    """
+    if not clientes:
+        return []
+    conn = get_connection()
+    cursor = conn.cursor()
+    agora = datetime.now()
+    ids = execute_values(
+        cursor,
+        """
+        INSERT INTO clientes (nome, telefone, email, data_cadastro, ultima_visita, observacoes)
+        VALUES %s
+        RETURNING id
+        """,
+        [
+            (c.nome, c.telefone, c.email, c.data_cadastro or agora, c.ultima_visita, c.observacoes)
+            for c in clientes
+        ],
+        page_size=tamanho_pagina,
+        fetch=True
+    )
+    conn.commit()
+    invalidar("clientes")
+    cursor.close()
+    conn.close()
+    return [r[0] for r in ids]
+
+_CONSULTA_CLIENTES = """
+    SELECT id, nome, telefone, email, data_cadastro, ultima_visita, observacoes
+    FROM clientes
+    ORDER BY nome
+    """
+
+def _cliente_da_linha(r: tuple) -> Cliente:
+    return Cliente(
+        id=r[0], nome=r[1], telefone=r[2], email=r[3],
+        data_cadastro=r[4], ultima_visita=r[5], observacoes=r[6]
+    )
+
 def listar_clientes() -> list[Cliente]:
     """
     Retorna todos os clientes cadastrados no banco.
@@ -46,20 +101,9 @@ def listar_clientes() -> list[Cliente]:
     """
     conn = get_connection()
     cursor = conn.cursor()
-    cursor.execute(
-        """
-        SELECT id, nome, telefone, email, data_cadastro, ultima_visita, observacoes
-        FROM clientes
-        ORDER BY nome
-        """
-    )
+    cursor.execute(_CONSULTA_CLIENTES)
     rows = cursor.fetchall()
-    clientes = [
-        Cliente(
-            id=r[0], nome=r[1], telefone=r[2], email=r[3],
-            data_cadastro=r[4], ultima_visita=r[5], observacoes=r[6]
-        ) for r in rows
-    ]
+    clientes = [_cliente_da_linha(r) for r in rows]
     cursor.close()
     conn.close()
     return clientes
@@ -90,6 +134,7 @@ def atualizar_ultima_visita(cliente_id: int, data_hora: datetime, conn=None) ->
 
     if close_conn:
         conn.commit()
+        invalidar("clientes")
         cursor.close()
         conn.close()
         
@@ -121,6 +166,7 @@ def atualizar_cliente(cliente_id: int, nome: str, telefone: str, email: str, obs
         (nome, telefone, email, observacoes, cliente_id)
     )
     conn.commit()
+    invalidar("clientes")
     sucesso = cursor.rowcount > 0
     cursor.close()
     conn.close()
@@ -149,11 +195,143 @@ def excluir_cliente(cliente_id: int) -> tuple[bool, str]:
 
     cursor.execute("DELETE FROM clientes WHERE id = %s", (cliente_id,))
     conn.commit()
+    invalidar("clientes")
     sucesso = cursor.rowcount > 0
     cursor.close()
     conn.close()
     return sucesso, "Cliente excluído com sucesso"
 
+def _padrao_like(texto: str) -> str:
+    """Escapa os curingas do LIKE em um texto digitado pelo usuário."""
+    return texto.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def _condicao_status(status: Optional[str], dias_atividade: int) -> Tuple[str, list]:
+    """
+    Condição SQL de clientes ativos/inativos (última visita há até dias_atividade dias).
+
+    Returns:
+        Tuple[str, list]: Condição (ou "") e parâmetros.
+    """
+    # (agora - ultima_visita).days <= dias  <=>  ultima_visita > agora - (dias + 1)
+    limite = datetime.now() - timedelta(days=dias_atividade + 1)
+    if status == "ativos":
+        return "ultima_visita > %s", [limite]
+    if status == "inativos":
+        return "(ultima_visita IS NULL OR ultima_visita <= %s)", [limite]
+    return "", []
+
+def buscar_clientes(
+    termo: str = "",
+    limite: int = 50,
+    cursor_pagina: Optional[tuple] = None,
+    status: Optional[str] = None,
+    dias_atividade: int = 90
+) -> Tuple[list[Cliente], Optional[tuple]]:
+    """
+    Busca clientes por parte do nome, do e-mail ou do telefone (só dígitos), com paginação.
+
+    Os resultados são ordenados por relevância: nome que começa com o termo,
+    nome com uma palavra que começa com o termo, nome que contém o termo e, por
+    fim, correspondências apenas no e-mail ou telefone; dentro de cada grupo,
+    por nome. As buscas usam os índices de trigramas (pg_trgm) da migração 7.
+
+    Args:
+        termo (str): Texto buscado (vazio lista todos os clientes).
+        limite (int): Quantidade de clientes por página.
+        cursor_pagina (Optional[tuple]): Cursor devolvido pela página anterior.
+        status (Optional[str]): "ativos", "inativos" ou None para todos.
+        dias_atividade (int): Dias desde a última visita para considerar o cliente ativo.
+
+    Returns:
+        Tuple[list[Cliente], Optional[tuple]]: Clientes da página e cursor da
+            próxima página (None se não houver mais resultados).
+    """
+    termo = termo.strip().lower()
+    conditions = []
+    params = []
+
+    if termo:
+        contem = f"%{_padrao_like(termo)}%"
+        digitos = re.sub(r"\D", "", termo)
+        busca = ["lower(nome) LIKE %s", "lower(email) LIKE %s"]
+        params.extend([contem, contem])
+        if len(digitos) >= 3:
+            busca.append("regexp_replace(telefone, '[^0-9]', '', 'g') LIKE %s")
+            params.append(f"%{digitos}%")
+        conditions.append("(" + " OR ".join(busca) + ")")
+        relevancia = """
+            CASE WHEN lower(nome) LIKE %s THEN 0
+                 WHEN lower(nome) LIKE %s THEN 1
+                 WHEN lower(nome) LIKE %s THEN 2
+                 ELSE 3 END"""
+        params_relevancia = [f"{_padrao_like(termo)}%", f"% {_padrao_like(termo)}%", contem]
+
+    condicao, params_status = _condicao_status(status, dias_atividade)
+    if condicao:
+        conditions.append(condicao)
+        params.extend(params_status)
+
+    if not termo:
+        # sem termo: percorre o índice (lower(nome), id) direto
+        if cursor_pagina:
+            conditions.append("(lower(nome), id) > (%s, %s)")
+            params.extend(cursor_pagina[1:])
+        query = f"""
+        SELECT id, nome, telefone, email, data_cadastro, ultima_visita, observacoes,
+               0 AS relevancia, lower(nome) AS nome_ordem
+        FROM clientes
+        {"WHERE " + " AND ".join(conditions) if conditions else ""}
+        ORDER BY lower(nome), id
+        LIMIT %s
+        """
+    else:
+        query = f"""
+        SELECT * FROM (
+            SELECT id, nome, telefone, email, data_cadastro, ultima_visita, observacoes,
+                   {relevancia} AS relevancia, lower(nome) AS nome_ordem
+            FROM clientes
+            WHERE {" AND ".join(conditions)}
+        ) c
+        {"WHERE (relevancia, nome_ordem, id) > (%s, %s, %s)" if cursor_pagina else ""}
+        ORDER BY relevancia, nome_ordem, id
+        LIMIT %s
+        """
+        params = params_relevancia + params + list(cursor_pagina or ())
+    params.append(limite + 1)
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(query, tuple(params))
+    rows = cursor.fetchall()
+    cursor.close()
+    conn.close()
+
+    proximo = None
+    if len(rows) > limite:
+        rows = rows[:limite]
+        ultimo = rows[-1]
+        proximo = (ultimo[7], ultimo[8], ultimo[0])
+    return [_cliente_da_linha(r) for r in rows], proximo
+
+def contar_clientes(dias_atividade: int = 90) -> Tuple[int, int]:
+    """
+    Conta o total de clientes e os ativos em uma única consulta.
+
+    Args:
+        dias_atividade (int): Dias desde a última visita para considerar o cliente ativo.
+
+    Returns:
+        Tuple[int, int]: Total de clientes e clientes ativos.
+    """
+    condicao, params = _condicao_status("ativos", dias_atividade)
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT COUNT(*), COUNT(*) FILTER (WHERE {condicao}) FROM clientes", tuple(params))
+    total, ativos = cursor.fetchone()
+    cursor.close()
+    conn.close()
+    return total, ativos
+
 def buscar_cliente(cliente_id: int) -> Optional[Cliente]:
     """
     Busca um cliente pelo seu ID.
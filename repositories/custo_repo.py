@@ -2,10 +2,14 @@
 """
 Repositório responsável por operações relacionadas a custos.
 """
+from psycopg2.extras import execute_values
+
 from infra.database import get_connection
+from infra.cache import invalidar
 from models.models import Custo
-from typing import Optional, List
+from typing import Optional, List, Dict, Tuple
 from datetime import datetime
+from decimal import Decimal
 
 def adicionar_custo(
     descricao: str,
@@ -33,10 +37,45 @@ def adicionar_custo(
     )
     custo_id = cursor.fetchone()[0]
     conn.commit()
+    invalidar("custos")
     cursor.close()
     conn.close()
     return custo_id
 
+def adicionar_custos_em_lote(custos: List[Custo], tamanho_pagina: int = 1000) -> List[int]:
+    """
+    Insere vários custos em uma única transação com execute_values.
+
+    O campo id dos objetos é ignorado.
+
+    Args:
+        custos (List[Custo]): Custos a inserir.
+        tamanho_pagina (int): Linhas por comando INSERT.
+
+    Returns:
+        List[int]: IDs criados, na ordem da lista recebida.
+    """
+    if not custos:
+        return []
+    conn = get_connection()
+    cursor = conn.cursor()
+    ids = execute_values(
+        cursor,
+        """
+        INSERT INTO custos (descricao, valor, tipo, data, categoria, recorrente)
+        VALUES %s
+        RETURNING id
+        """,
+        [(c.descricao, c.valor, c.tipo, c.data, c.categoria, c.recorrente) for c in custos],
+        page_size=tamanho_pagina,
+        fetch=True
+    )
+    conn.commit()
+    invalidar("custos")
+    cursor.close()
+    conn.close()
+    return [r[0] for r in ids]
+
 def atualizar_custo(
     id: int,
     descricao: str,
@@ -63,6 +102,7 @@ def atualizar_custo(
         (descricao, valor, tipo, data, categoria, recorrente, id)
     )
     conn.commit()
+    invalidar("custos")
     atualizado = cursor.rowcount > 0
     cursor.close()
     conn.close()
@@ -79,24 +119,23 @@ def excluir_custo(id: int) -> bool:
     cursor = conn.cursor()
     cursor.execute("DELETE FROM custos WHERE id=%s", (id,))
     conn.commit()
+    invalidar("custos")
     sucesso = cursor.rowcount > 0
     cursor.close()
     conn.close()
     return sucesso
 
-def listar_custos(
+def _consulta_custos(
     mes: Optional[int] = None,
     ano: Optional[int] = None,
     tipo: Optional[str] = None
-) -> List[Custo]:
+) -> Tuple[str, list]:
     """
-    Lista custos com filtros opcionais de mês, ano e tipo.
+    Monta o SELECT de custos com os filtros informados.
 
     Returns:
-        List[Custo]: Lista de custos.
+        Tuple[str, list]: Consulta e parâmetros.
     """
-    conn = get_connection()
-    cursor = conn.cursor()
     query = "SELECT id, descricao, valor, tipo, data, categoria, recorrente FROM custos"
     params = []
     conditions = []
@@ -124,18 +163,65 @@ def listar_custos(
         query += " WHERE " + " AND ".join(conditions)
 
     query += " ORDER BY data DESC"
+    return query, params
+
+def _custo_da_linha(r: tuple) -> Custo:
+    return Custo(
+        id=r[0], descricao=r[1], valor=r[2], tipo=r[3],
+        data=r[4], categoria=r[5], recorrente=r[6]
+    )
+
+def listar_custos(
+    mes: Optional[int] = None,
+    ano: Optional[int] = None,
+    tipo: Optional[str] = None
+) -> List[Custo]:
+    """
+    Lista custos com filtros opcionais de mês, ano e tipo.
+
+    Returns:
+        List[Custo]: Lista de custos.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    query, params = _consulta_custos(mes, ano, tipo)
     cursor.execute(query, tuple(params))
     rows = cursor.fetchall()
-    custos = [
-        Custo(
-            id=r[0], descricao=r[1], valor=r[2], tipo=r[3],
-            data=r[4], categoria=r[5], recorrente=r[6]
-        ) for r in rows
-    ]
+    custos = [_custo_da_linha(r) for r in rows]
     cursor.close()
     conn.close()
     return custos
 
+def somar_custos_por_mes(data_inicio: datetime, data_fim: datetime) -> Dict[Tuple[int, int], Dict[str, Decimal]]:
+    """
+    Soma os custos de cada mês do intervalo, separados por tipo, em uma única consulta.
+
+    Args:
+        data_inicio (datetime): Início do intervalo (inclusivo).
+        data_fim (datetime): Fim do intervalo (exclusivo).
+
+    Returns:
+        Dict[Tuple[int, int], Dict[str, Decimal]]: (ano, mês) -> {tipo: soma}.
+            Meses sem custos não aparecem.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        SELECT EXTRACT(YEAR FROM data)::int, EXTRACT(MONTH FROM data)::int, tipo, SUM(valor)
+        FROM custos
+        WHERE data >= %s AND data < %s
+        GROUP BY 1, 2, 3
+        """,
+        (data_inicio, data_fim)
+    )
+    somas: Dict[Tuple[int, int], Dict[str, Decimal]] = {}
+    for ano, mes, tipo, total in cursor.fetchall():
+        somas.setdefault((ano, mes), {})[tipo] = total
+    cursor.close()
+    conn.close()
+    return somas
+
 def buscar_custo(id: int) -> Optional[Custo]:
     """
     Busca um custo pelo ID.
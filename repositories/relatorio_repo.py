@@ -0,0 +1,220 @@
+# repositories/relatorio_repo.py
+"""
+Repositório com as consultas do relatório de produção e faturamento.
+
+Os filtros de período e profissional são aplicados no banco, então o volume
+lido acompanha o mês selecionado e não todo o histórico. Totais mensais,
+períodos e profissionais vêm da tabela consolidada faturamento_mensal, mantida
+por triggers no banco (ver migração 5).
+"""
+from psycopg2 import extensions
+
+from infra.database import get_connection, iterar_consulta
+from infra.cache import invalidar
+from typing import BinaryIO, Optional, List, Tuple, Iterator
+from datetime import datetime
+from decimal import Decimal
+
+COLUNAS_ATENDIMENTOS = [
+    "Cliente", "Serviço", "Profissional", "Data e Hora", "Valor (R$)", "Ano", "Mês", "Dia"
+]
+
+def _intervalo_periodo(ano: Optional[int], mes: Optional[int]) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """
+    Converte ano/mês em um intervalo [inicio, fim) de datas.
+
+    Args:
+        ano (Optional[int]): Ano do período.
+        mes (Optional[int]): Mês do período (considerado apenas com o ano).
+
+    Returns:
+        Tuple[Optional[datetime], Optional[datetime]]: Início e fim (exclusivo).
+    """
+    if ano is None:
+        return None, None
+    if mes is None:
+        return datetime(ano, 1, 1), datetime(ano + 1, 1, 1)
+    if mes == 12:
+        return datetime(ano, 12, 1), datetime(ano + 1, 1, 1)
+    return datetime(ano, mes, 1), datetime(ano, mes + 1, 1)
+
+def _consulta_atendimentos_realizados(
+    ano: Optional[int] = None,
+    mes: Optional[int] = None,
+    profissional: Optional[str] = None
+) -> Tuple[str, list]:
+    """
+    Monta o SELECT dos atendimentos realizados com os filtros informados.
+
+    Returns:
+        Tuple[str, list]: Consulta e parâmetros.
+    """
+    query = """
+    SELECT COALESCE(c.nome, 'Cliente não encontrado') AS "Cliente",
+           COALESCE(s.nome, 'Serviço não encontrado') AS "Serviço",
+           COALESCE(s.categoria, 'Não definido') AS "Profissional",
+           a.data_hora AS "Data e Hora",
+           COALESCE(a.valor, 0) AS "Valor (R$)",
+           EXTRACT(YEAR FROM a.data_hora)::int AS "Ano",
+           EXTRACT(MONTH FROM a.data_hora)::int AS "Mês",
+           EXTRACT(DAY FROM a.data_hora)::int AS "Dia"
+    FROM agendamentos a
+    LEFT JOIN servicos s ON s.id = a.servico_id
+    LEFT JOIN clientes c ON c.id = a.cliente_id
+    WHERE a.status = 'realizado'
+    """
+    params = []
+    inicio, fim = _intervalo_periodo(ano, mes)
+    if inicio:
+        query += " AND a.data_hora >= %s AND a.data_hora < %s"
+        params.extend([inicio, fim])
+    if profissional:
+        query += " AND COALESCE(s.categoria, 'Não definido') = %s"
+        params.append(profissional)
+    query += " ORDER BY a.data_hora DESC, a.id DESC"
+    return query, params
+
+def iterar_atendimentos_realizados(
+    ano: Optional[int] = None,
+    mes: Optional[int] = None,
+    profissional: Optional[str] = None,
+    tamanho_lote: Optional[int] = None
+) -> Iterator[List[tuple]]:
+    """
+    Percorre os atendimentos realizados em lotes, com cursor no servidor.
+
+    Args:
+        ano (Optional[int]): Ano dos atendimentos (None para todo o histórico).
+        mes (Optional[int]): Mês dos atendimentos.
+        profissional (Optional[str]): Categoria do serviço (profissional).
+        tamanho_lote (Optional[int]): Linhas por lote (padrão DB_FETCH_SIZE).
+
+    Yields:
+        List[tuple]: Lote de linhas na ordem de COLUNAS_ATENDIMENTOS.
+    """
+    query, params = _consulta_atendimentos_realizados(ano, mes, profissional)
+    yield from iterar_consulta(query, tuple(params), tamanho_lote)
+
+def copiar_atendimentos_csv(
+    destino: BinaryIO,
+    ano: Optional[int] = None,
+    mes: Optional[int] = None,
+    profissional: Optional[str] = None
+) -> int:
+    """
+    Escreve os atendimentos realizados em CSV (separador ;) com COPY ... TO STDOUT.
+
+    O PostgreSQL gera o CSV e o psycopg2 repassa os blocos direto para o
+    arquivo de destino, sem montar as linhas em Python.
+
+    Args:
+        destino (BinaryIO): Arquivo aberto para escrita binária.
+        ano (Optional[int]): Ano dos atendimentos (None para todo o histórico).
+        mes (Optional[int]): Mês dos atendimentos.
+        profissional (Optional[str]): Categoria do serviço (profissional).
+
+    Returns:
+        int: Quantidade de linhas exportadas.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    query, params = _consulta_atendimentos_realizados(ano, mes, profissional)
+    # COPY não aceita parâmetros: a consulta é interpolada pelo próprio psycopg2
+    consulta = cursor.mogrify(query, tuple(params)).decode(extensions.encodings[conn.encoding])
+    cursor.copy_expert(
+        f"COPY ({consulta}) TO STDOUT WITH (FORMAT csv, HEADER, DELIMITER ';', ENCODING 'UTF8')",
+        destino
+    )
+    linhas = cursor.rowcount
+    conn.rollback()
+    cursor.close()
+    conn.close()
+    return linhas
+
+def listar_periodos_realizados() -> List[Tuple[int, int]]:
+    """
+    Lista os pares (ano, mês) que possuem atendimentos realizados.
+
+    Returns:
+        List[Tuple[int, int]]: Períodos do mais recente para o mais antigo.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        SELECT DISTINCT ano, mes
+        FROM faturamento_mensal
+        ORDER BY ano DESC, mes
+        """
+    )
+    periodos = [(r[0], r[1]) for r in cursor.fetchall()]
+    cursor.close()
+    conn.close()
+    return periodos
+
+def listar_profissionais_realizados() -> List[str]:
+    """
+    Lista os profissionais (categorias de serviço) com atendimentos realizados.
+
+    Returns:
+        List[str]: Profissionais em ordem alfabética.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        SELECT DISTINCT profissional
+        FROM faturamento_mensal
+        ORDER BY profissional
+        """
+    )
+    profissionais = [r[0] for r in cursor.fetchall()]
+    cursor.close()
+    conn.close()
+    return profissionais
+
+def obter_faturamento_mensal(ano: int, mes: int, profissional: Optional[str] = None) -> Tuple[Decimal, int]:
+    """
+    Soma faturamento e atendimentos do mês na tabela consolidada faturamento_mensal.
+
+    Args:
+        ano (int): Ano do período.
+        mes (int): Mês do período.
+        profissional (Optional[str]): Restringe a um profissional.
+
+    Returns:
+        Tuple[Decimal, int]: Faturamento e quantidade de atendimentos.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    query = """
+    SELECT COALESCE(SUM(faturamento), 0), COALESCE(SUM(atendimentos), 0)
+    FROM faturamento_mensal
+    WHERE ano = %s AND mes = %s
+    """
+    params = [ano, mes]
+    if profissional:
+        query += " AND profissional = %s"
+        params.append(profissional)
+    cursor.execute(query, tuple(params))
+    faturamento, atendimentos = cursor.fetchone()
+    cursor.close()
+    conn.close()
+    return faturamento, int(atendimentos)
+
+def reconstruir_faturamento_mensal() -> int:
+    """
+    Recalcula toda a tabela faturamento_mensal a partir dos agendamentos.
+
+    Returns:
+        int: Quantidade de linhas geradas.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT reconstruir_faturamento_mensal()")
+    linhas = cursor.fetchone()[0]
+    conn.commit()
+    invalidar("faturamento_mensal")
+    cursor.close()
+    conn.close()
+    return linhas
@@ -2,9 +2,20 @@
 """
 Repositório responsável por operações relacionadas a serviços.
 """
+import threading
+import time
+
 from infra.database import get_connection
+from infra.cache import invalidar, ttl_padrao, versoes
 from models.models import Servico
-from typing import Optional
+from typing import Optional, Dict
+
+# Mapa de identidade dos serviços (id -> Servico), compartilhado pelo processo.
+# Serviços mudam raramente e são lidos em toda página e agendamento.
+_servicos: Optional[Dict[int, Servico]] = None
+_servicos_carregados_em = 0.0
+_servicos_versao = None
+_servicos_lock = threading.Lock()
 
 def adicionar_servico(nome: str, categoria: str, preco: float, duracao_minutos: int, descricao: Optional[str] = None) -> int:
     """
@@ -32,6 +43,7 @@ def adicionar_servico(nome: str, categoria: str, preco: float, duracao_minutos:
     )
     servico_id = cursor.fetchone()[0]
     conn.commit()
+    _invalidar_servicos()
     cursor.close()
     conn.close()
     return servico_id
@@ -62,6 +74,7 @@ def atualizar_servico(id: int, nome: str, categoria: str, preco: float, duracao_
         (nome, categoria, preco, duracao_minutos, descricao, id)
     )
     conn.commit()
+    _invalidar_servicos()
     atualizado = cursor.rowcount > 0
     cursor.close()
     conn.close()
@@ -88,17 +101,18 @@ def excluir_servico(servico_id: int) -> tuple[bool, str]:
 
     cursor.execute("DELETE FROM servicos WHERE id = %s", (servico_id,))
     conn.commit()
+    _invalidar_servicos()
     sucesso = cursor.rowcount > 0
     cursor.close()
     conn.close()
     return sucesso, "Serviço excluído com sucesso"
 
-def listar_servicos() -> list[Servico]:
+def _carregar_servicos() -> Dict[int, Servico]:
     """
-    Retorna todos os serviços cadastrados.
+    Lê todos os serviços do banco, ordenados por categoria e nome.
 
     Returns:
-        list[Servico]: Lista de serviços.
+        Dict[int, Servico]: Serviços por ID, na ordem da consulta.
     """
     conn = get_connection()
     cursor = conn.cursor()
@@ -110,16 +124,59 @@ def listar_servicos() -> list[Servico]:
         """
     )
     rows = cursor.fetchall()
-    servicos = [
-        Servico(
+    servicos = {
+        r[0]: Servico(
             id=r[0], nome=r[1], categoria=r[2], preco=r[3],
             duracao_minutos=r[4], descricao=r[5]
         ) for r in rows
-    ]
+    }
     cursor.close()
     conn.close()
     return servicos
 
+def _mapa_servicos() -> Dict[int, Servico]:
+    """
+    Retorna o mapa de serviços em memória, carregando-o do banco se necessário.
+
+    A carga acontece com o lock adquirido; como _invalidar_servicos também
+    adquire o lock (depois do commit), uma carga concorrente com uma escrita
+    nunca sobrevive à invalidação. O mapa é recarregado quando a versão de
+    "servicos" em infra.cache muda (invalidar("servicos") feito fora deste
+    módulo, como após uma carga em massa) e expira após CACHE_TTL_SEGUNDOS,
+    para refletir alterações feitas por outros processos.
+
+    Returns:
+        Dict[int, Servico]: Serviços por ID.
+    """
+    global _servicos, _servicos_carregados_em, _servicos_versao
+    with _servicos_lock:
+        versao = versoes("servicos")
+        if (
+            _servicos is None
+            or versao != _servicos_versao
+            or time.monotonic() - _servicos_carregados_em > ttl_padrao()
+        ):
+            _servicos = _carregar_servicos()
+            _servicos_carregados_em = time.monotonic()
+            _servicos_versao = versao
+        return _servicos
+
+def _invalidar_servicos() -> None:
+    """Descarta o mapa de serviços em memória e a versão da tabela no cache."""
+    global _servicos
+    with _servicos_lock:
+        _servicos = None
+    invalidar("servicos")
+
+def listar_servicos() -> list[Servico]:
+    """
+    Retorna todos os serviços cadastrados.
+
+    Returns:
+        list[Servico]: Lista de serviços.
+    """
+    return list(_mapa_servicos().values())
+
 def buscar_servico(servico_id: int) -> Optional[Servico]:
     """
     Retorna um serviço pelo ID.
@@ -130,22 +187,4 @@ def buscar_servico(servico_id: int) -> Optional[Servico]:
     Returns:
         Optional[Servico]: Serviço encontrado ou None.
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute(
-        """
-        SELECT id, nome, categoria, preco, duracao_minutos, descricao
-        FROM servicos
-        WHERE id = %s
-        """,
-        (servico_id,)
-    )
-    row = cursor.fetchone()
-    cursor.close()
-    conn.close()
-    if not row:
-        return None
-    return Servico(
-        id=row[0], nome=row[1], categoria=row[2], preco=row[3],
-        duracao_minutos=row[4], descricao=row[5]
-    )
+    return _mapa_servicos().get(servico_id)
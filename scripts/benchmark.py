@@ -0,0 +1,331 @@
+# scripts/benchmark.py
+"""
+Benchmark dos caminhos críticos de repositórios e serviços.
+
+Para cada tamanho pedido, o banco local é recarregado com scripts.seed (mesma
+semente, dados comparáveis entre execuções) e cada caso é medido algumas vezes
+depois de um aquecimento. As funções com cache_por_tabelas são chamadas pela
+função original (__wrapped__), para medir o banco e não o cache.
+
+O resultado é gravado em JSON. Com --comparar, cada caso é confrontado com o
+de um JSON de referência: a mediana que piorar mais que a tolerância relativa
+(e mais que o mínimo absoluto em ms) é apontada como regressão, e o comando
+termina com código 1.
+
+Uso:
+    studio-benchmark --tamanhos pequeno,medio --saida benchmark.json
+    studio-benchmark --tamanhos medio --comparar benchmark.json
+    studio-benchmark --entrada atual.json --comparar benchmark.json
+
+Por segurança (a carga apaga os dados) só roda com APP_ENV=local_docker, a
+menos que --forcar seja usado.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+
+from infra import instrumentacao
+from infra.cache import invalidar
+from infra.database import get_connection, mostrar_conexao_atual
+from repositories import agendamento_repo
+from scripts.seed import PRESETS, popular
+from services import agendamento_service, cliente_service, custo_service, dashboard, dashboard_report_service
+
+TABELAS = ("servicos", "clientes", "agendamentos", "custos", "faturamento_mensal")
+
+
+@dataclass
+class Caso:
+    nome: str
+    funcao: Callable[[], object]
+    preparar: Optional[Callable[[], None]] = None  # executado antes de cada medição, fora do tempo
+
+
+def _contar(valor) -> Optional[int]:
+    if isinstance(valor, tuple):  # (lista, próximo cursor) das buscas paginadas
+        valor = valor[0]
+    try:
+        return len(valor)
+    except TypeError:
+        return None
+
+
+def _contexto() -> dict:
+    """
+    Lê do banco os parâmetros usados pelos casos: o serviço com mais
+    agendamentos, o mês mais recente com atendimentos realizados e o início do
+    próximo dia útil.
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT a.servico_id, s.duracao_minutos
+        FROM agendamentos a
+        JOIN servicos s ON s.id = a.servico_id
+        GROUP BY a.servico_id, s.duracao_minutos
+        ORDER BY COUNT(*) DESC, a.servico_id
+        LIMIT 1
+    """)
+    servico = cursor.fetchone()
+    cursor.execute("SELECT MAX(data_hora) FROM agendamentos WHERE status = 'realizado'")
+    ultimo_realizado = cursor.fetchone()[0] or datetime.now()
+    cursor.close()
+    conn.close()
+
+    dia = datetime.now().date() + timedelta(days=1)
+    while dia.weekday() in agendamento_service.DIAS_FECHADOS:
+        dia += timedelta(days=1)
+    return {
+        "servico_id": servico[0] if servico else None,
+        "duracao": servico[1] if servico else 60,
+        "ano": ultimo_realizado.year,
+        "mes": ultimo_realizado.month,
+        "horario": datetime.combine(dia, agendamento_service.HORA_ABERTURA) + timedelta(hours=2),
+    }
+
+
+def montar_casos(ctx: dict) -> List[Caso]:
+    """
+    Monta os casos medidos, na ordem em que aparecem no resultado.
+
+    Args:
+        ctx (dict): Parâmetros lidos do banco por _contexto.
+
+    Returns:
+        List[Caso]: Casos do benchmark.
+    """
+    agora = datetime.now()
+    custos = custo_service.obter_custos.__wrapped__
+    casos = [
+        Caso("listar_agendamentos", lambda: agendamento_repo.listar_agendamentos(limite=50)),
+        Caso("listar_agendamentos_pendentes_30d", lambda: agendamento_repo.listar_agendamentos(
+            "pendente", agora - timedelta(days=30), agora + timedelta(days=30), limite=50
+        )),
+        Caso("resumo_studio", dashboard.resumo_studio.__wrapped__),
+        Caso("gerar_dataframe_base_mes", lambda: dashboard_report_service.gerar_dataframe_base.__wrapped__(
+            ctx["ano"], ctx["mes"]
+        )),
+        Caso("gerar_dataframe_base_ano", lambda: dashboard_report_service.gerar_dataframe_base.__wrapped__(
+            ctx["ano"]
+        )),
+        Caso("obter_custos_e_filtrar", lambda: custo_service.filtrar_custos(custos(), ctx["ano"], ctx["mes"], "fixo")),
+        Caso("obter_proximos_agendamentos", lambda: agendamento_service.obter_proximos_agendamentos.__wrapped__(7)),
+        Caso("listar_clientes", cliente_service.listar_clientes.__wrapped__),
+        Caso("buscar_clientes", lambda: cliente_service.buscar_clientes.__wrapped__("ana", 50, None, None)),
+    ]
+    if ctx["servico_id"] is not None:
+        casos[6:6] = [
+            Caso("verificar_sobreposicao", lambda: agendamento_service.verificar_sobreposicao(
+                ctx["servico_id"], ctx["horario"], ctx["duracao"]
+            )),
+            Caso(
+                "sugerir_proximo_horario",
+                lambda: agendamento_service.sugerir_proximo_horario(
+                    ctx["servico_id"], ctx["horario"], ctx["duracao"]
+                ),
+                preparar=agendamento_service.buscar_horarios_disponiveis.limpar,
+            ),
+        ]
+    return casos
+
+
+def medir(caso: Caso, repeticoes: int, aquecimento: int) -> dict:
+    """
+    Mede um caso e resume as amostras.
+
+    Args:
+        caso (Caso): Caso a medir.
+        repeticoes (int): Quantidade de medições.
+        aquecimento (int): Execuções descartadas antes das medições.
+
+    Returns:
+        dict: mediana_ms, min_ms, max_ms, amostras_ms e linhas; com a
+            instrumentação ligada, também consultas e banco_ms (por execução).
+    """
+    for _ in range(aquecimento):
+        if caso.preparar:
+            caso.preparar()
+        caso.funcao()
+
+    amostras, consultas, banco_ms = [], [], []
+    valor = None
+    for _ in range(repeticoes):
+        if caso.preparar:
+            caso.preparar()
+        instrumentacao.iniciar_rerun()
+        inicio = time.perf_counter()
+        valor = caso.funcao()
+        amostras.append((time.perf_counter() - inicio) * 1000)
+        resumo = instrumentacao.resumo_rerun()
+        consultas.append(resumo["total_consultas"])
+        banco_ms.append(resumo["tempo_total_ms"])
+
+    resultado = {
+        "mediana_ms": round(statistics.median(amostras), 3),
+        "min_ms": round(min(amostras), 3),
+        "max_ms": round(max(amostras), 3),
+        "amostras_ms": [round(a, 3) for a in amostras],
+        "linhas": _contar(valor),
+    }
+    if instrumentacao.ativa():
+        resultado["consultas"] = consultas[-1]
+        resultado["banco_ms"] = round(statistics.median(banco_ms), 3)
+    return resultado
+
+
+def _versao_postgres() -> str:
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("SHOW server_version")
+    versao = cursor.fetchone()[0]
+    cursor.close()
+    conn.close()
+    return versao
+
+
+def executar(
+    tamanhos: List[str],
+    repeticoes: int = 5,
+    aquecimento: int = 1,
+    semente: int = 42,
+    carregar: bool = True
+) -> dict:
+    """
+    Carrega o banco em cada tamanho e mede todos os casos.
+
+    Args:
+        tamanhos (List[str]): Presets de scripts.seed (ignorados sem carga).
+        repeticoes (int): Medições por caso.
+        aquecimento (int): Execuções descartadas por caso.
+        semente (int): Semente da carga.
+        carregar (bool): False mede os dados já existentes, sob o nome "atual".
+
+    Returns:
+        dict: Resultado no formato gravado em JSON.
+    """
+    resultado = {
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "semente": semente,
+        "repeticoes": repeticoes,
+        "ambiente": {"python": platform.python_version(), "postgres": _versao_postgres()},
+        "resultados": {},
+    }
+    for tamanho in (tamanhos if carregar else ["atual"]):
+        item: dict = {}
+        if carregar:
+            print(f"\n🌱 Carregando {tamanho} ({PRESETS[tamanho]})...")
+            item["escala"] = asdict(PRESETS[tamanho])
+            item["carga_segundos"] = round(sum(popular(PRESETS[tamanho], semente, limpar=True)["segundos"].values()), 1)
+        invalidar(*TABELAS)
+
+        print(f"⏱️  Medindo ({tamanho})...")
+        item["casos"] = {}
+        for caso in montar_casos(_contexto()):
+            item["casos"][caso.nome] = medir(caso, repeticoes, aquecimento)
+            print(f"   {caso.nome:<36} {item['casos'][caso.nome]['mediana_ms']:>10.1f} ms")
+        resultado["resultados"][tamanho] = item
+    return resultado
+
+
+def comparar(atual: dict, referencia: dict, tolerancia: float = 0.2, minimo_ms: float = 2.0) -> List[dict]:
+    """
+    Compara as medianas de dois resultados, caso a caso.
+
+    Args:
+        atual (dict): Resultado novo.
+        referencia (dict): Resultado de referência (baseline).
+        tolerancia (float): Piora relativa aceita (0.2 = 20%).
+        minimo_ms (float): Piora absoluta abaixo da qual nada é apontado.
+
+    Returns:
+        List[dict]: Uma linha por caso presente nos dois resultados, com
+            tamanho, caso, referencia_ms, atual_ms, variacao e regressao.
+    """
+    linhas = []
+    for tamanho, item in atual["resultados"].items():
+        base = referencia["resultados"].get(tamanho, {}).get("casos", {})
+        for nome, medida in item["casos"].items():
+            if nome not in base:
+                continue
+            antes, depois = base[nome]["mediana_ms"], medida["mediana_ms"]
+            linhas.append({
+                "tamanho": tamanho,
+                "caso": nome,
+                "referencia_ms": antes,
+                "atual_ms": depois,
+                "variacao": (depois - antes) / antes if antes else 0.0,
+                "regressao": depois > antes * (1 + tolerancia) and depois - antes > minimo_ms,
+            })
+    return linhas
+
+
+def _mostrar_comparacao(linhas: List[dict]) -> None:
+    print(f"\n{'tamanho':<10} {'caso':<36} {'referência':>12} {'atual':>12} {'variação':>9}")
+    for linha in linhas:
+        marca = "  ❌ regressão" if linha["regressao"] else ""
+        print(
+            f"{linha['tamanho']:<10} {linha['caso']:<36} {linha['referencia_ms']:>9.1f} ms "
+            f"{linha['atual_ms']:>9.1f} ms {linha['variacao']:>+8.0%}{marca}"
+        )
+
+
+def _ler_json(caminho: str) -> dict:
+    with open(caminho, encoding="utf-8") as arquivo:
+        return json.load(arquivo)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Interpreta os argumentos da linha de comando, mede e/ou compara."""
+    parser = argparse.ArgumentParser(prog="studio-benchmark", description="Mede os caminhos críticos do app.")
+    parser.add_argument("--tamanhos", default="pequeno,medio", help="presets separados por vírgula (padrão: pequeno,medio)")
+    parser.add_argument("--repeticoes", type=int, default=5, help="medições por caso (padrão: 5)")
+    parser.add_argument("--aquecimento", type=int, default=1, help="execuções descartadas por caso (padrão: 1)")
+    parser.add_argument("--semente", type=int, default=42, help="semente da carga (padrão: 42)")
+    parser.add_argument("--sem-carga", action="store_true", help="mede os dados atuais, sem recarregar o banco")
+    parser.add_argument("--saida", help="arquivo JSON onde gravar o resultado")
+    parser.add_argument("--entrada", help="resultado JSON já gravado (compara sem medir)")
+    parser.add_argument("--comparar", help="resultado JSON de referência")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="piora relativa aceita (padrão: 0.2)")
+    parser.add_argument("--minimo-ms", type=float, default=2.0, help="piora absoluta ignorada, em ms (padrão: 2)")
+    parser.add_argument("--forcar", action="store_true", help="permite recarregar fora de APP_ENV=local_docker")
+    args = parser.parse_args(argv)
+
+    if args.entrada:
+        if not args.comparar:
+            parser.error("--entrada exige --comparar")
+        atual = _ler_json(args.entrada)
+    else:
+        tamanhos = [t.strip() for t in args.tamanhos.split(",") if t.strip()]
+        desconhecidos = [t for t in tamanhos if t not in PRESETS]
+        if desconhecidos:
+            parser.error(f"tamanhos desconhecidos: {', '.join(desconhecidos)} (opções: {', '.join(PRESETS)})")
+        if not args.sem_carga and os.getenv("APP_ENV") != "local_docker" and not args.forcar:
+            parser.exit(1, "❌ Recusado: APP_ENV não é local_docker. Use --forcar ou --sem-carga.\n")
+
+        mostrar_conexao_atual()
+        atual = executar(tamanhos, args.repeticoes, args.aquecimento, args.semente, not args.sem_carga)
+        if args.saida:
+            with open(args.saida, "w", encoding="utf-8") as arquivo:
+                json.dump(atual, arquivo, ensure_ascii=False, indent=2)
+            print(f"\n💾 Resultado gravado em {args.saida}")
+
+    if args.comparar:
+        linhas = comparar(atual, _ler_json(args.comparar), args.tolerancia, args.minimo_ms)
+        _mostrar_comparacao(linhas)
+        regressoes = sum(linha["regressao"] for linha in linhas)
+        if regressoes:
+            print(f"\n❌ {regressoes} regressão(ões) acima de {args.tolerancia:.0%}.")
+            sys.exit(1)
+        print("\n✅ Nenhuma regressão.")
+
+
+if __name__ == "__main__":
+    main()
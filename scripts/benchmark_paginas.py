@@ -0,0 +1,373 @@
+# scripts/benchmark_paginas.py
+"""
+Benchmark de reruns completos das páginas, sem navegador.
+
+Cada cenário abre uma página com streamlit.testing (AppTest) e simula as
+interações mais comuns (filtros, seleção de cliente para edição, troca de
+visualização dos agendamentos). Cada passo é um rerun completo do script, e
+para cada um são medidos:
+
+- tempo total do rerun (wall time);
+- consultas e tempo no banco (via infra.instrumentacao, ligada durante a execução);
+- pico de memória alocada pelo Python durante o rerun (tracemalloc).
+
+O tracemalloc deixa o Python mais lento; use --sem-memoria para medir apenas
+tempos. Com --sessoes N, N sessões simuladas (uma por processo) executam cada cenário
+ao mesmo tempo, para observar a disputa pelo banco.
+
+Uso:
+    studio-benchmark-paginas --carregar medio
+    studio-benchmark-paginas --cenarios clientes,agendamentos --repeticoes 5
+    studio-benchmark-paginas --sessoes 8 --sem-memoria --saida paginas.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, Optional
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from infra import instrumentacao
+from infra.database import fechar_pool, mostrar_conexao_atual
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+
+@dataclass
+class Passo:
+    descricao: str
+    acao: Optional[Callable[[AppTest], bool]] = None  # False: widget ausente, passo ignorado
+
+
+@dataclass
+class Cenario:
+    nome: str
+    pagina: str  # caminho relativo à raiz do projeto
+    passos: List[Passo] = field(default_factory=list)
+
+
+def _widgets(at: AppTest, tipo: str, area: str):
+    raiz = at.sidebar if area == "sidebar" else at.main
+    return getattr(raiz, tipo)
+
+
+def _escolher(rotulo: str, valor=None, indice: Optional[int] = None, tipo: str = "selectbox", area: str = "main"):
+    """
+    Cria a ação que escolhe uma opção do widget com o rótulo dado, pelo valor
+    ou pela posição na lista de opções.
+    """
+    def acao(at: AppTest) -> bool:
+        for widget in _widgets(at, tipo, area):
+            if widget.label == rotulo:
+                if valor is not None:
+                    widget.set_value(valor)
+                    return True
+                if indice is not None and indice < len(widget.options):
+                    widget.set_value(widget.options[indice])
+                    return True
+        return False
+    return acao
+
+
+def _digitar(rotulo: str, texto: str, area: str = "main"):
+    """Cria a ação que preenche o campo de texto com o rótulo dado."""
+    def acao(at: AppTest) -> bool:
+        for widget in _widgets(at, "text_input", area):
+            if widget.label == rotulo:
+                widget.input(texto)
+                return True
+        return False
+    return acao
+
+
+def _clicar(chave: str):
+    """Cria a ação que clica no botão com a chave dada, se estiver habilitado."""
+    def acao(at: AppTest) -> bool:
+        for botao in at.button:
+            if botao.key == chave and not botao.disabled:
+                botao.click()
+                return True
+        return False
+    return acao
+
+
+CENARIOS = [
+    Cenario("home", "Home.py", [
+        Passo("abrir"),
+        Passo("período: semana", _escolher("Período", "Semana")),
+        Passo("período: mês", _escolher("Período", "Mês")),
+    ]),
+    Cenario("clientes", "pages/1_👤_Clientes.py", [
+        Passo("abrir"),
+        Passo("buscar 'ana'", _digitar("Buscar por nome, telefone ou e-mail", "ana")),
+        Passo("status: ativos", _escolher("Status", "Ativos")),
+        Passo("próxima página", _clicar("clientes_proxima")),
+        Passo("editar cliente", _escolher("Selecione um cliente para editar:", indice=1)),
+    ]),
+    Cenario("servicos", "pages/2_💇_Serviços.py", [
+        Passo("abrir"),
+        Passo("filtrar categoria", _escolher("Categoria", indice=1)),
+        Passo("editar serviço", _escolher("Selecione um serviço para editar:", indice=1)),
+    ]),
+    Cenario("agendamentos", "pages/3_📅_Agendamentos.py", [
+        Passo("abrir"),
+        Passo("período: 30 dias", _escolher("Filtrar por período", "30 dias")),
+        Passo("período: todos", _escolher("Filtrar por período", "Todos")),
+        Passo("agenda por data", _escolher("Visualização:", "Agenda por Data", tipo="radio")),
+        Passo("disponibilidade", _escolher("Visualização:", "Disponibilidade da Semana", tipo="radio")),
+        Passo("voltar à lista", _escolher("Visualização:", "Lista de Agendamentos", tipo="radio")),
+    ]),
+    Cenario("custos", "pages/4_💰_Custos.py", [
+        Passo("abrir"),
+        Passo("filtrar ano", _escolher("Ano", indice=1)),
+        Passo("tipo: fixo", _escolher("Tipo", "fixo")),
+        Passo("editar custo", _escolher("Selecione um custo para editar:", indice=1)),
+    ]),
+    Cenario("relatorio", "pages/5_📈_Relatório.py", [
+        Passo("abrir"),
+        Passo("profissional", _escolher("👩‍🎨 Profissional", indice=1, area="sidebar")),
+        Passo("mês anterior", _escolher("🗓️ Mês Base", indice=1, area="sidebar")),
+    ]),
+]
+
+
+def executar_cenario(cenario: Cenario, memoria: bool = True, timeout: float = 60) -> List[dict]:
+    """
+    Executa os passos de um cenário em uma nova sessão simulada.
+
+    Args:
+        cenario (Cenario): Página e interações.
+        memoria (bool): Mede o pico de memória de cada rerun (exige tracemalloc ativo).
+        timeout (float): Tempo máximo de cada rerun, em segundos.
+
+    Returns:
+        List[dict]: Uma medida por passo: passo, wall_ms, consultas, banco_ms,
+            pico_mb, erro (mensagem da exceção da página) e ignorado.
+    """
+    at = AppTest.from_file(str(RAIZ / cenario.pagina), default_timeout=timeout)
+    medidas = []
+    for passo in cenario.passos:
+        medida = {"passo": passo.descricao, "ignorado": False}
+        if passo.acao is not None and not passo.acao(at):
+            medida["ignorado"] = True
+            medidas.append(medida)
+            continue
+
+        antes = instrumentacao.totais_processo()
+        if memoria:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        inicio = time.perf_counter()
+        at.run()
+        medida["wall_ms"] = (time.perf_counter() - inicio) * 1000
+        depois = instrumentacao.totais_processo()
+        medida["consultas"] = depois["consultas"] - antes["consultas"]
+        medida["banco_ms"] = depois["tempo_ms"] - antes["tempo_ms"]
+        if memoria:
+            medida["pico_mb"] = (tracemalloc.get_traced_memory()[1] - base) / 2**20
+        medida["erro"] = at.exception[0].message if at.exception else None
+        medidas.append(medida)
+    return medidas
+
+
+def _resumir(execucoes: List[List[dict]]) -> List[dict]:
+    """Agrupa as execuções de um cenário por passo (mediana e máximo)."""
+    resumo = []
+    for medidas in zip(*execucoes):
+        validas = [m for m in medidas if not m["ignorado"]]
+        item = {"passo": medidas[0]["passo"], "execucoes": len(validas)}
+        if validas:
+            tempos = [m["wall_ms"] for m in validas]
+            item.update(
+                wall_ms=round(statistics.median(tempos), 1),
+                wall_max_ms=round(max(tempos), 1),
+                consultas=statistics.median(m["consultas"] for m in validas),
+                banco_ms=round(statistics.median(m["banco_ms"] for m in validas), 1),
+                erros=sorted({m["erro"] for m in validas if m["erro"]}),
+            )
+            if "pico_mb" in validas[0]:
+                item["pico_mb"] = round(max(m["pico_mb"] for m in validas), 1)
+        resumo.append(item)
+    return resumo
+
+
+_barreira = None
+
+
+def _iniciar_sessao(barreira, memoria: bool) -> None:
+    global _barreira
+    _barreira = barreira
+    # antes da primeira conexão do processo: o cursor instrumentado é escolhido ao conectar
+    os.environ["DEV_PAINEL_CONSULTAS"] = "1"
+    os.chdir(RAIZ)
+    if memoria:
+        tracemalloc.start()
+
+
+def _executar_sessao(nome: str, memoria: bool, frio: bool) -> List[dict]:
+    """Executa um cenário em um processo de sessão, depois que todas as sessões estão prontas."""
+    cenario = next(c for c in CENARIOS if c.nome == nome)
+    if frio:
+        st.cache_data.clear()
+    _barreira.wait()
+    return executar_cenario(cenario, memoria)
+
+
+def executar(
+    cenarios: List[Cenario],
+    repeticoes: int = 3,
+    sessoes: int = 1,
+    memoria: bool = True,
+    frio: bool = False
+) -> dict:
+    """
+    Mede os cenários em sequência ou com várias sessões simultâneas.
+
+    Cada sessão simultânea roda em um processo próprio (o AppTest troca o
+    Runtime global do Streamlit a cada rerun e não pode ser usado por várias
+    threads); as sessões começam cada execução juntas e disputam o mesmo banco.
+    Como no modo sequencial, o cache de cada processo é aproveitado entre
+    repetições, mas não é compartilhado entre sessões.
+
+    A instrumentação das consultas (DEV_PAINEL_CONSULTAS) fica ligada só
+    durante a execução; o pool é descartado antes, porque conexões já abertas
+    sem ela não usam o cursor instrumentado.
+
+    Args:
+        cenarios (List[Cenario]): Cenários a executar.
+        repeticoes (int): Execuções de cada cenário (por sessão).
+        sessoes (int): Sessões simuladas ao mesmo tempo.
+        memoria (bool): Mede o pico de memória por rerun.
+        frio (bool): Limpa o st.cache_data antes de cada execução.
+
+    Returns:
+        dict: Resumo por cenário e passo (mediana e máximo entre execuções e
+            sessões) e o tempo total de cada cenário.
+    """
+    resultado = {
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "repeticoes": repeticoes,
+        "sessoes": sessoes,
+        "cenarios": {},
+    }
+    executor = None
+    if sessoes > 1:
+        contexto = multiprocessing.get_context("spawn")
+        executor = ProcessPoolExecutor(
+            max_workers=sessoes,
+            mp_context=contexto,
+            initializer=_iniciar_sessao,
+            initargs=(contexto.Barrier(sessoes), memoria),
+        )
+    elif memoria:
+        tracemalloc.start()
+    instrumentacao_anterior = os.environ.get("DEV_PAINEL_CONSULTAS")
+    os.environ["DEV_PAINEL_CONSULTAS"] = "1"
+    try:
+        fechar_pool()  # descarta conexões abertas sem o cursor instrumentado
+        for cenario in cenarios:
+            print(f"⏱️  {cenario.nome} ({cenario.pagina})...")
+            execucoes: List[List[dict]] = []
+            inicio = time.perf_counter()
+            for _ in range(repeticoes):
+                if executor is None:
+                    if frio:
+                        st.cache_data.clear()
+                    execucoes.append(executar_cenario(cenario, memoria))
+                else:
+                    futuros = [executor.submit(_executar_sessao, cenario.nome, memoria, frio) for _ in range(sessoes)]
+                    execucoes.extend(f.result() for f in futuros)
+            resultado["cenarios"][cenario.nome] = {
+                "pagina": cenario.pagina,
+                "total_ms": round((time.perf_counter() - inicio) * 1000, 1),
+                "passos": _resumir(execucoes),
+            }
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        elif memoria:
+            tracemalloc.stop()
+        if instrumentacao_anterior is None:
+            os.environ.pop("DEV_PAINEL_CONSULTAS", None)
+        else:
+            os.environ["DEV_PAINEL_CONSULTAS"] = instrumentacao_anterior
+    return resultado
+
+
+def _mostrar(resultado: dict) -> None:
+    print(
+        f"\n{'cenário':<13} {'passo':<22} {'wall':>10} {'máx':>10} {'consultas':>9} {'banco':>10} {'memória':>9}"
+    )
+    for nome, item in resultado["cenarios"].items():
+        for passo in item["passos"]:
+            if not passo["execucoes"]:
+                print(f"{nome:<13} {passo['passo']:<22} {'(ignorado: widget ausente)':>30}")
+                continue
+            linha = (
+                f"{nome:<13} {passo['passo']:<22} {passo['wall_ms']:>7.1f} ms {passo['wall_max_ms']:>7.1f} ms"
+                f" {passo['consultas']:>9g} {passo['banco_ms']:>7.1f} ms"
+            )
+            linha += f" {passo['pico_mb']:>6.1f} MB" if "pico_mb" in passo else f" {'-':>9}"
+            if passo["erros"]:
+                linha += f"  ❌ {passo['erros'][0]}"
+            print(linha)
+        print(f"{'':<13} {'total':<22} {item['total_ms']:>7.1f} ms")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Interpreta os argumentos da linha de comando e executa os cenários."""
+    nomes = [c.nome for c in CENARIOS]
+    parser = argparse.ArgumentParser(prog="studio-benchmark-paginas", description="Mede reruns completos das páginas.")
+    parser.add_argument("--cenarios", default=",".join(nomes), help=f"cenários separados por vírgula ({', '.join(nomes)})")
+    parser.add_argument("--repeticoes", type=int, default=3, help="execuções de cada cenário (padrão: 3)")
+    parser.add_argument("--sessoes", type=int, default=1, help="sessões simultâneas (padrão: 1)")
+    parser.add_argument("--sem-memoria", action="store_true", help="não mede memória (tracemalloc deixa o Python mais lento)")
+    parser.add_argument("--frio", action="store_true", help="limpa o cache de leituras antes de cada execução")
+    parser.add_argument("--carregar", metavar="PRESET", help="recarrega o banco com scripts.seed antes de medir")
+    parser.add_argument("--semente", type=int, default=42, help="semente da carga (padrão: 42)")
+    parser.add_argument("--forcar", action="store_true", help="permite recarregar fora de APP_ENV=local_docker")
+    parser.add_argument("--saida", help="arquivo JSON onde gravar o resultado")
+    args = parser.parse_args(argv)
+
+    escolhidos = [n.strip() for n in args.cenarios.split(",") if n.strip()]
+    desconhecidos = [n for n in escolhidos if n not in nomes]
+    if desconhecidos:
+        parser.error(f"cenários desconhecidos: {', '.join(desconhecidos)}")
+    if args.sessoes < 1 or args.repeticoes < 1:
+        parser.error("--sessoes e --repeticoes devem ser ao menos 1")
+
+    mostrar_conexao_atual()
+    if args.carregar:
+        from scripts.seed import PRESETS, popular
+
+        if args.carregar not in PRESETS:
+            parser.error(f"preset desconhecido: {args.carregar} (opções: {', '.join(PRESETS)})")
+        if os.getenv("APP_ENV") != "local_docker" and not args.forcar:
+            parser.exit(1, "❌ Recusado: APP_ENV não é local_docker. Use --forcar para recarregar este banco.\n")
+        print(f"\n🌱 Carregando {args.carregar}...")
+        popular(PRESETS[args.carregar], args.semente, limpar=True)
+
+    os.chdir(RAIZ)  # as páginas abrem arquivos relativos à raiz (ex.: utils/contents)
+    resultado = executar(
+        [c for c in CENARIOS if c.nome in escolhidos],
+        args.repeticoes, args.sessoes, not args.sem_memoria, args.frio
+    )
+    _mostrar(resultado)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(resultado, arquivo, ensure_ascii=False, indent=2)
+        print(f"\n💾 Resultado gravado em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
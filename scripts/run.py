@@ -25,5 +25,68 @@ def init():
     print("🔧 Inicializando banco de dados...")
     from infra.database import inicializar_banco
     mostrar_conexao_atual()
-    inicializar_banco()
-    print("✅ Banco inicializado com sucesso!") 
\ No newline at end of file
+    aplicadas = inicializar_banco()
+    if aplicadas:
+        print(f"📦 Migrações aplicadas: {', '.join(str(v) for v in aplicadas)}")
+    else:
+        print("📦 Esquema já está atualizado.")
+    print("✅ Banco inicializado com sucesso!") 
+
+def rebuild():
+    """Recalcula o consolidado de faturamento mensal"""
+    print("🔁 Recalculando faturamento mensal...")
+    from services.dashboard_report_service import reconstruir_faturamento_mensal
+    mostrar_conexao_atual()
+    linhas = reconstruir_faturamento_mensal()
+    print(f"✅ Faturamento mensal recalculado ({linhas} linhas).")
+
+def seed():
+    """Gera dados sintéticos no banco (opções: studio-seed --help)"""
+    from scripts.seed import main
+    main()
+
+def benchmark():
+    """Mede os caminhos críticos do app (opções: studio-benchmark --help)"""
+    from scripts.benchmark import main
+    main()
+
+def benchmark_paginas():
+    """Mede reruns completos das páginas (opções: studio-benchmark-paginas --help)"""
+    from scripts.benchmark_paginas import main
+    main()
+
+def consultas_lentas():
+    """Relatório do log de consultas lentas, agrupado por consulta (opções: studio-consultas-lentas --help)"""
+    import argparse
+    from datetime import datetime
+    from infra.consultas_lentas import agrupar, arquivo, ler_registros
+
+    parser = argparse.ArgumentParser(prog="studio-consultas-lentas", description="Resume o log de consultas lentas.")
+    parser.add_argument("--arquivo", default=str(arquivo()), help="arquivo do log (padrão: CONSULTAS_LENTAS_ARQUIVO)")
+    parser.add_argument("--top", type=int, default=15, help="quantidade de consultas listadas (padrão: 15)")
+    parser.add_argument("--desde", type=datetime.fromisoformat, help="considera só registros a partir desta data (ISO)")
+    parser.add_argument("--planos", action="store_true", help="mostra o plano mais recente de cada consulta")
+    args = parser.parse_args()
+
+    grupos = agrupar(ler_registros(args.arquivo), args.desde)
+    if not grupos:
+        print(f"📭 Nenhuma consulta lenta registrada em {args.arquivo}.")
+        return
+
+    print(f"🐢 {len(grupos)} consultas lentas distintas ({sum(g['execucoes'] for g in grupos)} execuções)\n")
+    for posicao, grupo in enumerate(grupos[:args.top], start=1):
+        print(
+            f"{posicao:>2}. {grupo['execucoes']}× · total {grupo['total_ms']:.0f} ms · média {grupo['media_ms']:.1f} ms"
+            f" · p95 {grupo['p95_ms']:.1f} ms · máx {grupo['max_ms']:.1f} ms · última {grupo['ultima_em']}"
+        )
+        print(f"    origem: {', '.join(grupo['origens'])}")
+        print(f"    {grupo['consulta'][:300]}")
+        if args.planos:
+            if grupo["plano"]:
+                print(f"    plano ({grupo['plano_em']}):")
+                print("\n".join(f"      {linha}" for linha in grupo["plano"].splitlines()))
+            elif grupo["plano_erro"]:
+                print(f"    plano: erro ({grupo['plano_erro']})")
+            else:
+                print("    plano: não capturado")
+        print()
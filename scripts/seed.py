@@ -0,0 +1,447 @@
+# scripts/seed.py
+"""
+Gerador de dados sintéticos para reproduzir volumes de produção no banco local.
+
+Gera serviços ("Categoria - Profissional"), clientes, agendamentos e custos e
+grava tudo com COPY, em lotes, dentro de uma única transação. Os dados
+dependem apenas da semente, da escala e da data de referência (padrão: hoje),
+então duas cargas com os mesmos parâmetros são comparáveis entre si.
+
+Os agendamentos seguem o horário de funcionamento de agendamento_service e
+nunca se sobrepõem entre não cancelados do mesmo serviço (restrição
+agendamentos_sem_sobreposicao); cancelados podem ter o horário reaproveitado
+por outro agendamento. Passado: maioria realizada; futuro: pendentes.
+
+Uso:
+    studio-seed --preset medio --limpar
+    python -m scripts.seed --agendamentos 2000000 --semente 7 --limpar
+
+Por segurança só roda com APP_ENV=local_docker, a menos que --forcar seja usado.
+"""
+
+import argparse
+import csv
+import io
+import os
+import random
+import time
+import unicodedata
+from dataclasses import dataclass, replace
+from datetime import date, datetime, timedelta
+from typing import Iterable, Iterator, List, Optional
+
+from infra.database import get_connection, inicializar_banco, mostrar_conexao_atual
+from services.agendamento_service import DIAS_FECHADOS, HORA_ABERTURA, HORA_FECHAMENTO, PASSO_MINUTOS
+
+
+@dataclass(frozen=True)
+class Escala:
+    servicos: int
+    clientes: int
+    agendamentos: int
+    custos: int
+
+
+PRESETS = {
+    "pequeno": Escala(servicos=8, clientes=500, agendamentos=5_000, custos=300),
+    "medio": Escala(servicos=16, clientes=5_000, agendamentos=100_000, custos=2_000),
+    "grande": Escala(servicos=32, clientes=50_000, agendamentos=1_000_000, custos=10_000),
+    "enorme": Escala(servicos=48, clientes=200_000, agendamentos=5_000_000, custos=40_000),
+}
+
+# categoria -> (serviço, preço base, duração em minutos)
+CATALOGO = {
+    "Unhas": [("Manicure", 12, 30), ("Pedicure", 15, 45), ("Unhas de gel", 30, 60), ("Verniz gel", 20, 45)],
+    "Massagem": [("Massagem relaxante", 45, 60), ("Drenagem linfática", 50, 60), ("Massagem desportiva", 55, 90)],
+    "Sobrancelhas": [("Design de sobrancelhas", 12, 15), ("Henna", 18, 30), ("Laminação", 35, 45)],
+    "Depilação": [("Depilação pernas", 20, 30), ("Depilação axilas", 8, 15), ("Depilação virilha", 15, 30)],
+    "Pestanas": [("Extensão de pestanas", 60, 120), ("Manutenção de pestanas", 35, 60), ("Lifting de pestanas", 40, 60)],
+}
+PROFISSIONAIS = ["Lidia", "Pamyla", "Carla", "Sofia", "Beatriz", "Inês", "Marta", "Rita"]
+NOMES = [
+    "Ana", "Maria", "Joana", "Beatriz", "Mariana", "Inês", "Sofia", "Carolina", "Rita", "Catarina",
+    "Leonor", "Matilde", "Marta", "Sara", "Patrícia", "Cláudia", "Filipa", "Teresa", "Helena", "Luísa",
+    "João", "Pedro", "Tiago", "Miguel", "Rui",
+]
+SOBRENOMES = [
+    "Silva", "Santos", "Ferreira", "Pereira", "Oliveira", "Costa", "Rodrigues", "Martins", "Sousa",
+    "Fernandes", "Gonçalves", "Gomes", "Lopes", "Marques", "Alves", "Almeida", "Ribeiro", "Pinto",
+    "Carvalho", "Teixeira", "Moreira", "Correia", "Mendes", "Nunes", "Soares",
+]
+DOMINIOS = ["gmail.com", "hotmail.com", "sapo.pt", "outlook.pt", "icloud.com"]
+METODOS_PAGAMENTO = ["Dinheiro", "Cartão", "MB Way", "Transferência"]
+# minutos livres antes do primeiro agendamento do dia e entre agendamentos
+INTERVALOS = [0, 0, 0, PASSO_MINUTOS, 2 * PASSO_MINUTOS, 4 * PASSO_MINUTOS, 8 * PASSO_MINUTOS]
+# custos fixos mensais: (descrição, categoria, valor base)
+CUSTOS_FIXOS = [
+    ("Aluguel do espaço", "Aluguel", 900),
+    ("Conta de água", "Água", 45),
+    ("Conta de luz", "Energia", 120),
+    ("Internet e telefone", "Internet", 40),
+    ("Salários", "Salários", 2400),
+]
+# custos variáveis: (descrição, categoria, valor mínimo, valor máximo)
+CUSTOS_VARIAVEIS = [
+    ("Compra de materiais", "Materiais", 20, 400),
+    ("Comissão de atendimento", "Comissões", 30, 250),
+    ("Anúncio em redes sociais", "Marketing", 15, 150),
+    ("Reparação de equipamento", "Manutenção", 25, 300),
+    ("Taxas e impostos", "Impostos", 50, 600),
+]
+
+
+@dataclass
+class ServicoGerado:
+    id: int
+    nome: str
+    categoria: str
+    preco: float
+    duracao_minutos: int
+
+
+def _ascii(texto: str) -> str:
+    return unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode().lower()
+
+
+def _copiar(cursor, tabela: str, colunas: List[str], linhas: Iterable[tuple], tamanho_lote: int) -> int:
+    """
+    Grava as linhas com COPY ... FROM STDIN em CSV, um lote por vez.
+
+    Returns:
+        int: Quantidade de linhas gravadas.
+    """
+    comando = f"COPY {tabela} ({', '.join(colunas)}) FROM STDIN WITH (FORMAT csv)"
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer, lineterminator="\n")
+    total = pendentes = 0
+    for linha in linhas:
+        escritor.writerow(linha)  # None vira campo vazio, que o COPY lê como NULL
+        pendentes += 1
+        if pendentes == tamanho_lote:
+            buffer.seek(0)
+            cursor.copy_expert(comando, buffer)
+            total += pendentes
+            pendentes = 0
+            buffer.seek(0)
+            buffer.truncate()
+            print(f"   {tabela}: {total:,}".replace(",", "."), end="\r", flush=True)
+    if pendentes:
+        buffer.seek(0)
+        cursor.copy_expert(comando, buffer)
+        total += pendentes
+    print(f"   {tabela}: {total:,}".replace(",", ".") + " " * 10)
+    return total
+
+
+def _reservar_ids(cursor, tabela: str, quantidade: int) -> int:
+    """Reserva um bloco de IDs na sequência da tabela e retorna o primeiro."""
+    cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", (tabela,))
+    sequencia = cursor.fetchone()[0]
+    cursor.execute("SELECT nextval(%s)", (sequencia,))
+    primeiro = cursor.fetchone()[0]
+    if quantidade > 1:
+        cursor.execute("SELECT setval(%s, %s)", (sequencia, primeiro + quantidade - 1))
+    return primeiro
+
+
+def gerar_servicos(rnd: random.Random, quantidade: int, primeiro_id: int) -> List[ServicoGerado]:
+    """
+    Gera serviços distribuídos entre as categorias, cada um com um profissional.
+
+    Returns:
+        List[ServicoGerado]: Serviços com IDs a partir de primeiro_id.
+    """
+    categorias = list(CATALOGO)
+    servicos = []
+    for i in range(quantidade):
+        categoria = categorias[i % len(categorias)]
+        nome, preco, duracao = rnd.choice(CATALOGO[categoria])
+        profissional = rnd.choice(PROFISSIONAIS)
+        servicos.append(ServicoGerado(
+            id=primeiro_id + i,
+            nome=nome,
+            categoria=f"{categoria} - {profissional}",
+            preco=round(preco * rnd.uniform(0.85, 1.2) * 2) / 2,
+            duracao_minutos=duracao,
+        ))
+    return servicos
+
+
+def gerar_clientes(rnd: random.Random, quantidade: int, inicio: datetime, fim: datetime) -> Iterator[tuple]:
+    """
+    Gera clientes (nome, telefone, e-mail, data de cadastro, observações).
+
+    Yields:
+        tuple: Linha na ordem (nome, telefone, email, data_cadastro, observacoes).
+    """
+    segundos = int((fim - inicio).total_seconds())
+    for i in range(quantidade):
+        nome = rnd.choice(NOMES)
+        sobrenome = f"{rnd.choice(SOBRENOMES)} {rnd.choice(SOBRENOMES)}"
+        telefone = None if rnd.random() < 0.05 else (
+            f"9{rnd.choice('1236')}{rnd.randint(0, 9)} {rnd.randint(0, 999):03d} {rnd.randint(0, 999):03d}"
+        )
+        email = None if rnd.random() < 0.1 else (
+            f"{_ascii(nome)}.{_ascii(sobrenome.split()[-1])}{i}@{rnd.choice(DOMINIOS)}"
+        )
+        observacoes = rnd.choice(["Prefere manhãs", "Alergia a acetona", "Pele sensível"]) if rnd.random() < 0.05 else None
+        data_cadastro = inicio + timedelta(seconds=rnd.randint(0, segundos))
+        yield (f"{nome} {sobrenome}", telefone, email, data_cadastro, observacoes)
+
+
+def _status(rnd: random.Random, data_hora: datetime, agora: datetime) -> str:
+    sorteio = rnd.random()
+    if data_hora < agora:
+        return "realizado" if sorteio < 0.8 else ("cancelado" if sorteio < 0.92 else "pendente")
+    return "pendente" if sorteio < 0.88 else "cancelado"
+
+
+def gerar_agendamentos(
+    rnd: random.Random,
+    servicos: List[ServicoGerado],
+    quantidade: int,
+    primeiro_cliente: int,
+    qtd_clientes: int,
+    agora: datetime,
+    ultimo_dia: date
+) -> Iterator[tuple]:
+    """
+    Gera os agendamentos de cada serviço do último dia para trás até atingir a cota.
+
+    Dentro de um dia, os horários avançam a partir da abertura com intervalos
+    aleatórios; um cancelamento pode liberar o horário para outro agendamento.
+    Clientes mais antigos (IDs menores) voltam com mais frequência.
+
+    Yields:
+        tuple: Linha na ordem das colunas de COLUNAS_AGENDAMENTOS.
+    """
+    for indice, servico in enumerate(servicos):
+        cota = quantidade // len(servicos) + (1 if indice < quantidade % len(servicos) else 0)
+        duracao = timedelta(minutes=servico.duracao_minutos)
+        dia = ultimo_dia
+        while cota > 0:
+            if dia.weekday() not in DIAS_FECHADOS:
+                inicio = datetime.combine(dia, HORA_ABERTURA) + timedelta(minutes=rnd.choice(INTERVALOS))
+                fechamento = datetime.combine(dia, HORA_FECHAMENTO)
+                # preço de anos anteriores ~4% menor por ano (valor gravado no agendamento)
+                anos = (ultimo_dia - dia).days / 365
+                valor = round(servico.preco * max(1 - 0.04 * anos, 0.6), 2)
+                while cota > 0 and inicio + duracao <= fechamento:
+                    status = _status(rnd, inicio, agora)
+                    pago = status == "realizado" and rnd.random() < 0.95
+                    cliente_id = primeiro_cliente + int(qtd_clientes * rnd.random() ** 2)
+                    yield (
+                        cliente_id, servico.id, inicio, status, pago,
+                        rnd.choice(METODOS_PAGAMENTO) if pago else None,
+                        status == "realizado" or (status == "pendente" and rnd.random() < 0.3),
+                        None, valor, servico.duracao_minutos,
+                    )
+                    cota -= 1
+                    if status != "cancelado" or rnd.random() < 0.5:
+                        inicio += duracao + timedelta(minutes=rnd.choice(INTERVALOS))
+            dia -= timedelta(days=1)
+
+
+COLUNAS_AGENDAMENTOS = [
+    "cliente_id", "servico_id", "data_hora", "status", "pago", "metodo_pagamento",
+    "cliente_confirmado", "observacoes", "valor", "duracao_minutos",
+]
+
+
+def gerar_custos(rnd: random.Random, quantidade: int, inicio: date, fim: date) -> Iterator[tuple]:
+    """
+    Gera custos fixos recorrentes (um de cada por mês, dos meses mais recentes
+    para trás) e completa a quantidade com custos variáveis espalhados no período.
+
+    Yields:
+        tuple: Linha na ordem (descricao, valor, tipo, data, categoria, recorrente).
+    """
+    meses = []
+    ano, mes = fim.year, fim.month
+    while (ano, mes) >= (inicio.year, inicio.month):
+        meses.append((ano, mes))
+        ano, mes = (ano - 1, 12) if mes == 1 else (ano, mes - 1)
+
+    gerados = 0
+    for ano, mes in meses:
+        for descricao, categoria, base in CUSTOS_FIXOS:
+            if gerados == quantidade:
+                return
+            valor = round(base * rnd.uniform(0.9, 1.1), 2)
+            yield (descricao, valor, "fixo", datetime(ano, mes, rnd.randint(1, 8)), categoria, True)
+            gerados += 1
+
+    dias = max((fim - inicio).days, 1)
+    for _ in range(quantidade - gerados):
+        descricao, categoria, minimo, maximo = rnd.choice(CUSTOS_VARIAVEIS)
+        data = datetime.combine(inicio + timedelta(days=rnd.randrange(dias)), HORA_ABERTURA)
+        yield (descricao, round(rnd.uniform(minimo, maximo), 2), "variavel", data, categoria, False)
+
+
+def _inicio_agendamentos(escala: Escala, servicos: List[ServicoGerado], ultimo_dia: date) -> date:
+    """Estima o primeiro dia com agendamentos, pelo serviço que precisa de mais dias para a sua cota."""
+    minutos_abertos = (HORA_FECHAMENTO.hour - HORA_ABERTURA.hour) * 60
+    intervalo_medio = sum(INTERVALOS) / len(INTERVALOS)
+    cota = escala.agendamentos / len(servicos)
+    dias = max(
+        cota / (minutos_abertos / (s.duracao_minutos + intervalo_medio)) * 7 / (7 - len(DIAS_FECHADOS))
+        for s in servicos
+    )
+    return ultimo_dia - timedelta(days=int(dias) + 1)
+
+
+def popular(
+    escala: Escala,
+    semente: int = 42,
+    referencia: Optional[datetime] = None,
+    limpar: bool = False,
+    tamanho_lote: int = 50_000
+) -> dict:
+    """
+    Gera e grava os dados sintéticos em uma única transação.
+
+    O trigger do consolidado faturamento_mensal fica desligado durante a carga
+    (dentro da mesma transação) e a tabela é reconstruída ao final; as
+    estatísticas das tabelas são atualizadas com ANALYZE.
+
+    Args:
+        escala (Escala): Quantidades de cada entidade.
+        semente (int): Semente do gerador aleatório.
+        referencia (Optional[datetime]): "Agora" dos dados (padrão: datetime.now()).
+        limpar (bool): Apaga os dados existentes antes da carga.
+        tamanho_lote (int): Linhas por comando COPY.
+
+    Returns:
+        dict: Linhas gravadas por tabela e duração de cada etapa em segundos.
+    """
+    rnd = random.Random(semente)
+    agora = (referencia or datetime.now()).replace(second=0, microsecond=0)
+    ultimo_dia = agora.date() + timedelta(days=30)
+    resultado: dict = {"linhas": {}, "segundos": {}}
+
+    inicializar_banco()
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        etapa = time.perf_counter()
+        if limpar:
+            cursor.execute(
+                "TRUNCATE agendamentos, custos, clientes, servicos, faturamento_mensal RESTART IDENTITY"
+            )
+
+        servicos = gerar_servicos(rnd, escala.servicos, _reservar_ids(cursor, "servicos", escala.servicos))
+        resultado["linhas"]["servicos"] = _copiar(
+            cursor, "servicos", ["id", "nome", "categoria", "preco", "duracao_minutos"],
+            ((s.id, s.nome, s.categoria, s.preco, s.duracao_minutos) for s in servicos), tamanho_lote
+        )
+
+        primeiro_dia = _inicio_agendamentos(escala, servicos, ultimo_dia)
+        inicio_cadastro = datetime.combine(primeiro_dia - timedelta(days=180), HORA_ABERTURA)
+        primeiro_cliente = _reservar_ids(cursor, "clientes", escala.clientes)
+        resultado["linhas"]["clientes"] = _copiar(
+            cursor, "clientes", ["id", "nome", "telefone", "email", "data_cadastro", "observacoes"],
+            (
+                (primeiro_cliente + i,) + linha
+                for i, linha in enumerate(gerar_clientes(rnd, escala.clientes, inicio_cadastro, agora))
+            ),
+            tamanho_lote
+        )
+        resultado["segundos"]["cadastros"] = time.perf_counter() - etapa
+
+        etapa = time.perf_counter()
+        cursor.execute("ALTER TABLE agendamentos DISABLE TRIGGER trg_faturamento_insert")
+        resultado["linhas"]["agendamentos"] = _copiar(
+            cursor, "agendamentos", COLUNAS_AGENDAMENTOS,
+            gerar_agendamentos(
+                rnd, servicos, escala.agendamentos, primeiro_cliente, escala.clientes, agora, ultimo_dia
+            ),
+            tamanho_lote
+        )
+        cursor.execute("ALTER TABLE agendamentos ENABLE TRIGGER trg_faturamento_insert")
+        resultado["segundos"]["agendamentos"] = time.perf_counter() - etapa
+
+        etapa = time.perf_counter()
+        cursor.execute("SELECT MIN(data_hora) FROM agendamentos WHERE servico_id >= %s", (servicos[0].id,))
+        inicio_custos = cursor.fetchone()[0] or agora
+        resultado["linhas"]["custos"] = _copiar(
+            cursor, "custos", ["descricao", "valor", "tipo", "data", "categoria", "recorrente"],
+            gerar_custos(rnd, escala.custos, inicio_custos.date(), agora.date()), tamanho_lote
+        )
+        cursor.execute(
+            """
+            UPDATE clientes c
+            SET ultima_visita = v.ultima
+            FROM (
+                SELECT cliente_id, MAX(data_hora) AS ultima
+                FROM agendamentos
+                WHERE status = 'realizado'
+                GROUP BY cliente_id
+            ) v
+            WHERE c.id = v.cliente_id
+              AND c.id >= %s
+              AND (c.ultima_visita IS NULL OR c.ultima_visita < v.ultima)
+            """,
+            (primeiro_cliente,)
+        )
+        cursor.execute("SELECT reconstruir_faturamento_mensal()")
+        resultado["linhas"]["faturamento_mensal"] = cursor.fetchone()[0]
+        conn.commit()
+        resultado["segundos"]["custos_e_consolidados"] = time.perf_counter() - etapa
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+    etapa = time.perf_counter()
+    conn = get_connection()
+    conn.autocommit = True
+    cursor = conn.cursor()
+    try:
+        for tabela in ("servicos", "clientes", "agendamentos", "custos", "faturamento_mensal"):
+            cursor.execute(f"ANALYZE {tabela}")
+    finally:
+        # a conexão volta ao pool, que não restaura o autocommit
+        cursor.close()
+        conn.autocommit = False
+        conn.close()
+    resultado["segundos"]["analyze"] = time.perf_counter() - etapa
+    return resultado
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Interpreta os argumentos da linha de comando e executa a carga."""
+    parser = argparse.ArgumentParser(prog="studio-seed", description="Gera dados sintéticos no banco.")
+    parser.add_argument("--preset", choices=PRESETS, default="pequeno", help="escala base (padrão: pequeno)")
+    parser.add_argument("--servicos", type=int, help="quantidade de serviços")
+    parser.add_argument("--clientes", type=int, help="quantidade de clientes")
+    parser.add_argument("--agendamentos", type=int, help="quantidade de agendamentos")
+    parser.add_argument("--custos", type=int, help="quantidade de custos")
+    parser.add_argument("--semente", type=int, default=42, help="semente do gerador (padrão: 42)")
+    parser.add_argument("--referencia", type=datetime.fromisoformat, help="data/hora tratada como agora (ISO)")
+    parser.add_argument("--lote", type=int, default=50_000, help="linhas por COPY (padrão: 50000)")
+    parser.add_argument("--limpar", action="store_true", help="apaga todos os dados antes da carga")
+    parser.add_argument("--forcar", action="store_true", help="permite rodar fora de APP_ENV=local_docker")
+    args = parser.parse_args(argv)
+
+    if os.getenv("APP_ENV") != "local_docker" and not args.forcar:
+        parser.exit(1, "❌ Recusado: APP_ENV não é local_docker. Use --forcar para gravar neste banco.\n")
+
+    escala = replace(PRESETS[args.preset], **{
+        campo: valor for campo in ("servicos", "clientes", "agendamentos", "custos")
+        if (valor := getattr(args, campo)) is not None
+    })
+    if escala.servicos < 1 or escala.clientes < 1:
+        parser.error("são necessários ao menos 1 serviço e 1 cliente")
+
+    mostrar_conexao_atual()
+    print(f"\n🌱 Gerando dados ({escala}, semente {args.semente})...")
+    resultado = popular(escala, args.semente, args.referencia, args.limpar, args.lote)
+    for etapa, segundos in resultado["segundos"].items():
+        print(f"⏱️  {etapa}: {segundos:.1f} s")
+    print("✅ Carga concluída: " + ", ".join(f"{t} {n:,}".replace(",", ".") for t, n in resultado["linhas"].items()))
+
+
+if __name__ == "__main__":
+    main()
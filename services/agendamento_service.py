@@ -2,16 +2,28 @@
 Serviço responsável pela lógica de negócio dos agendamentos.
 """
 
-from typing import List, Optional, Tuple
-from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta, time
 from models.models import Agendamento
+from infra.cache import cache_por_tabelas
 from repositories import agendamento_repo
+from utils.intervalos import IndiceIntervalos
 
+# Horário de funcionamento usado na busca de horários livres
+HORA_ABERTURA = time(9, 0)
+HORA_FECHAMENTO = time(19, 0)
+DIAS_FECHADOS = {6}  # domingo (datetime.weekday)
+PASSO_MINUTOS = 15
 
+
+@cache_por_tabelas("agendamentos")
 def obter_agendamentos_filtrados(
     status: Optional[str] = None,
     data_inicio: Optional[datetime] = None,
-    data_fim: Optional[datetime] = None
+    data_fim: Optional[datetime] = None,
+    limite: Optional[int] = None,
+    cursor_pagina: Optional[Tuple[datetime, int]] = None,
+    crescente: bool = False
 ) -> List[Agendamento]:
     """
     Retorna uma lista de agendamentos filtrados por status e/ou período.
@@ -20,6 +32,9 @@ def obter_agendamentos_filtrados(
         status (Optional[str]): Status do agendamento (pendente, realizado, cancelado).
         data_inicio (Optional[datetime]): Data inicial do período.
         data_fim (Optional[datetime]): Data final do período.
+        limite (Optional[int]): Tamanho da página.
+        cursor_pagina (Optional[Tuple[datetime, int]]): (data_hora, id) do último item da página anterior.
+        crescente (bool): Ordena do mais antigo para o mais recente.
 
     Returns:
         List[Agendamento]: Lista de agendamentos que atendem aos filtros.
@@ -27,10 +42,51 @@ def obter_agendamentos_filtrados(
     return agendamento_repo.listar_agendamentos(
         filtro_status=status,
         data_inicio=data_inicio,
-        data_fim=data_fim
+        data_fim=data_fim,
+        limite=limite,
+        cursor_pagina=cursor_pagina,
+        crescente=crescente
     )
 
 
+@cache_por_tabelas("agendamentos")
+def obter_estatisticas_status(
+    data_inicio: Optional[datetime] = None,
+    data_fim: Optional[datetime] = None
+) -> Dict[str, int]:
+    """
+    Retorna o total de agendamentos e a quantidade por status.
+
+    Args:
+        data_inicio (Optional[datetime]): Data inicial do período.
+        data_fim (Optional[datetime]): Data final do período.
+
+    Returns:
+        Dict[str, int]: Chaves total, pendente, realizado e cancelado.
+    """
+    contagens = agendamento_repo.contar_agendamentos_por_status(data_inicio, data_fim)
+    return {
+        "total": sum(contagens.values()),
+        "pendente": contagens.get("pendente", 0),
+        "realizado": contagens.get("realizado", 0),
+        "cancelado": contagens.get("cancelado", 0),
+    }
+
+
+@cache_por_tabelas("agendamentos", "clientes", "servicos", ttl=60)
+def obter_proximos_agendamentos(dias: int = 7) -> List[dict]:
+    """
+    Retorna os agendamentos pendentes dos próximos dias, com dados de cliente e serviço.
+
+    Args:
+        dias (int): Quantidade de dias à frente.
+
+    Returns:
+        List[dict]: Agendamentos ordenados por data e hora.
+    """
+    return agendamento_repo.obter_proximos_agendamentos(dias)
+
+
 def deletar_agendamento(agendamento_id: int) -> bool:
     """
     Exclui um agendamento pelo ID.
@@ -44,6 +100,7 @@ def deletar_agendamento(agendamento_id: int) -> bool:
     return agendamento_repo.excluir_agendamento(agendamento_id)
 
 
+@cache_por_tabelas("agendamentos")
 def buscar_agendamento_por_id(agendamento_id: int) -> Optional[Agendamento]:
     """
     Busca um agendamento específico pelo ID.
@@ -72,14 +129,17 @@ def atualizar_status_agendamento(agendamento_id: int, novo_status: str) -> bool:
     if not agendamento:
         return False
 
-    return agendamento_repo.atualizar_agendamento(
-        id=agendamento.id,
-        cliente_id=agendamento.cliente_id,
-        servico_id=agendamento.servico_id,
-        data_hora=agendamento.data_hora,
-        status=novo_status,
-        observacoes=agendamento.observacoes
-    )
+    try:
+        return agendamento_repo.atualizar_agendamento(
+            id=agendamento.id,
+            cliente_id=agendamento.cliente_id,
+            servico_id=agendamento.servico_id,
+            data_hora=agendamento.data_hora,
+            status=novo_status,
+            observacoes=agendamento.observacoes
+        )
+    except agendamento_repo.ConflitoHorario:
+        return False
 
 
 def salvar_agendamento(
@@ -94,6 +154,10 @@ def salvar_agendamento(
     """
     Cria ou edita um agendamento, garantindo que não haja sobreposição de horários.
 
+    A sobreposição é impedida pelo banco (restrição agendamentos_sem_sobreposicao),
+    então dois cadastros simultâneos não conseguem reservar o mesmo horário.
+    O conflito é convertido na mensagem de erro com uma sugestão de horário.
+
     Args:
         modo (str): "criar" ou "editar".
         cliente_id (int): ID do cliente.
@@ -106,39 +170,101 @@ def salvar_agendamento(
     Returns:
         Tuple[bool, str, Optional[datetime]]: Sucesso, mensagem, sugestão de horário se houver conflito.
     """
-    duracao = agendamento_repo.obter_duracao_servico(servico_id)
-    if verificar_sobreposicao(servico_id, data_hora, duracao, agendamento_id):
-        sugestao = sugerir_proximo_horario(servico_id, data_hora, duracao)
+    try:
+        if modo == "criar":
+            novo_id = agendamento_repo.adicionar_agendamento(
+                cliente_id=cliente_id,
+                servico_id=servico_id,
+                data_hora=data_hora,
+                status=status,
+                observacoes=observacoes
+            )
+            if novo_id:
+                return True, "Agendamento criado com sucesso.", None
+            return False, "Erro ao criar agendamento.", None
+
+        elif modo == "editar" and agendamento_id:
+            sucesso = agendamento_repo.atualizar_agendamento(
+                id=agendamento_id,
+                cliente_id=cliente_id,
+                servico_id=servico_id,
+                data_hora=data_hora,
+                status=status,
+                observacoes=observacoes
+            )
+            if sucesso:
+                return True, "Agendamento atualizado com sucesso.", None
+            return False, "Erro ao atualizar agendamento.", None
+
+    except agendamento_repo.ConflitoHorario:
+        duracao = agendamento_repo.obter_duracao_servico(servico_id)
+        sugestao = sugerir_proximo_horario(servico_id, data_hora, duracao, agendamento_id)
         return False, "Conflito: já existe um agendamento nesse horário.", sugestao
 
-    if modo == "criar":
-        novo_id = agendamento_repo.adicionar_agendamento(
-            cliente_id=cliente_id,
-            servico_id=servico_id,
-            data_hora=data_hora,
-            status=status,
-            observacoes=observacoes
-        )
-        if novo_id:
-            return True, "Agendamento criado com sucesso.", None
-        return False, "Erro ao criar agendamento.", None
-
-    elif modo == "editar" and agendamento_id:
-        sucesso = agendamento_repo.atualizar_agendamento(
-            id=agendamento_id,
-            cliente_id=cliente_id,
-            servico_id=servico_id,
-            data_hora=data_hora,
-            status=status,
-            observacoes=observacoes
-        )
-        if sucesso:
-            return True, "Agendamento atualizado com sucesso.", None
-        return False, "Erro ao atualizar agendamento.", None
-
     return False, "Modo de operação inválido.", None
 
 
+def criar_agendamentos_em_lote(agendamentos: List[Agendamento]) -> Tuple[List[int], List[Agendamento]]:
+    """
+    Cria vários agendamentos de uma vez, descartando os que se sobrepõem.
+
+    Os horários já ocupados de todos os serviços envolvidos são lidos em uma
+    única consulta. Para cada serviço, os candidatos são verificados em ordem
+    de início contra o índice de intervalos existentes e contra os candidatos
+    já aceitos do próprio lote. Cada candidato usa o próprio duracao_minutos,
+    se informado, ou a duração do serviço. Os aceitos são gravados em uma só
+    transação.
+
+    Args:
+        agendamentos (List[Agendamento]): Agendamentos a criar (id é ignorado).
+
+    Returns:
+        Tuple[List[int], List[Agendamento]]: IDs criados (na ordem recebida, sem
+            os conflitantes) e agendamentos descartados por conflito.
+
+    Raises:
+        ConflitoHorario: Se outro cadastro reservar um dos horários entre a
+            verificação e a gravação (nada é gravado nesse caso).
+    """
+    duracoes_servico = {
+        servico_id: agendamento_repo.obter_duracao_servico(servico_id)
+        for servico_id in {a.servico_id for a in agendamentos if a.servico_id is not None}
+    }
+
+    def duracao(ag: Agendamento) -> timedelta:
+        return timedelta(minutes=ag.duracao_minutos or duracoes_servico[ag.servico_id])
+
+    ativos = [a for a in agendamentos if a.status != "cancelado" and a.servico_id is not None]
+
+    ocupados: Dict[int, list] = {}
+    if ativos:
+        inicio = min(a.data_hora for a in ativos)
+        fim = max(a.data_hora + duracao(a) for a in ativos)
+        for servico_id, ag_inicio, ag_fim in agendamento_repo.listar_intervalos_periodo(inicio, fim):
+            ocupados.setdefault(servico_id, []).append((ag_inicio, ag_fim))
+
+    conflitantes = set()
+    por_servico: Dict[int, List[Tuple[int, Agendamento]]] = {}
+    for posicao, ag in enumerate(agendamentos):
+        if ag.status != "cancelado" and ag.servico_id is not None:
+            por_servico.setdefault(ag.servico_id, []).append((posicao, ag))
+    for servico_id, candidatos in por_servico.items():
+        indice = IndiceIntervalos(ocupados.get(servico_id, []))
+        maior_fim_aceito = None
+        for posicao, ag in sorted(candidatos, key=lambda c: c[1].data_hora):
+            fim = ag.data_hora + duracao(ag)
+            if indice.sobrepoe(ag.data_hora, fim) or (
+                maior_fim_aceito is not None and ag.data_hora < maior_fim_aceito
+            ):
+                conflitantes.add(posicao)
+            else:
+                maior_fim_aceito = fim if maior_fim_aceito is None else max(maior_fim_aceito, fim)
+
+    aceitos = [a for i, a in enumerate(agendamentos) if i not in conflitantes]
+    conflitos = [a for i, a in enumerate(agendamentos) if i in conflitantes]
+    return agendamento_repo.adicionar_agendamentos_em_lote(aceitos), conflitos
+
+
 def verificar_sobreposicao(
     servico_id: int,
     inicio: datetime,
@@ -157,18 +283,152 @@ def verificar_sobreposicao(
     Returns:
         bool: True se houver sobreposição, False caso contrário.
     """
-    fim = inicio + timedelta(minutes=duracao)
-    agendamentos = agendamento_repo.listar_agendamentos_por_servico(servico_id)
-    for ag in agendamentos:
-        if agendamento_id and ag.id == agendamento_id:
-            continue
-        ag_fim = ag.data_hora + timedelta(minutes=duracao)
-        if inicio < ag_fim and fim > ag.data_hora:
-            return True
-    return False
+    return verificar_sobreposicoes(servico_id, [inicio], duracao, agendamento_id)[0]
+
+
+def verificar_sobreposicoes(
+    servico_id: int,
+    inicios: List[datetime],
+    duracao: int,
+    agendamento_id: Optional[int] = None
+) -> List[bool]:
+    """
+    Verifica vários horários candidatos de uma vez.
+
+    Os agendamentos da janela que cobre todos os candidatos são lidos em uma única
+    consulta e organizados em um IndiceIntervalos; cada candidato custa O(log n).
+    Agendamentos cancelados são ignorados e cada existente usa a própria duração.
+
+    Args:
+        servico_id (int): ID do serviço.
+        inicios (List[datetime]): Horários de início candidatos.
+        duracao (int): Duração do novo agendamento em minutos.
+        agendamento_id (Optional[int]): ID do agendamento atual (para excluir da verificação).
+
+    Returns:
+        List[bool]: Para cada candidato, True se houver sobreposição.
+    """
+    if not inicios:
+        return []
+
+    delta = timedelta(minutes=duracao)
+    indice = montar_indice_ocupacao(servico_id, min(inicios), max(inicios) + delta, agendamento_id)
+    return [indice.sobrepoe(inicio, inicio + delta) for inicio in inicios]
+
+
+def montar_indice_ocupacao(
+    servico_id: int,
+    inicio: datetime,
+    fim: datetime,
+    agendamento_id: Optional[int] = None
+) -> IndiceIntervalos:
+    """
+    Monta o índice de intervalos ocupados de um serviço em um período.
+
+    Args:
+        servico_id (int): ID do serviço.
+        inicio (datetime): Início do período.
+        fim (datetime): Fim do período (exclusivo).
+        agendamento_id (Optional[int]): ID de agendamento a desconsiderar.
+
+    Returns:
+        IndiceIntervalos: Intervalos ocupados no período.
+    """
+    ocupados = agendamento_repo.listar_intervalos_ocupados(servico_id, inicio, fim)
+    return IndiceIntervalos(
+        (ag_inicio, ag_fim) for ag_id, ag_inicio, ag_fim in ocupados if ag_id != agendamento_id
+    )
+
+
+@cache_por_tabelas("agendamentos", "servicos")
+def buscar_horarios_disponiveis(
+    servico_id: int,
+    a_partir_de: datetime,
+    quantidade: int = 5,
+    dias: int = 7,
+    duracao: Optional[int] = None,
+    passo_minutos: int = PASSO_MINUTOS,
+    agendamento_id: Optional[int] = None
+) -> List[datetime]:
+    """
+    Retorna os próximos horários livres de um serviço dentro do horário de funcionamento.
+
+    Os agendamentos da janela são lidos em uma única consulta indexada e percorridos
+    uma única vez, em ordem, junto com os horários candidatos.
+
+    Args:
+        servico_id (int): ID do serviço.
+        a_partir_de (datetime): Momento a partir do qual procurar.
+        quantidade (int): Quantidade máxima de horários retornados.
+        dias (int): Quantidade de dias da janela de busca (a partir do dia de a_partir_de).
+        duracao (Optional[int]): Duração em minutos (padrão: duração do serviço).
+        passo_minutos (int): Intervalo entre horários candidatos.
+        agendamento_id (Optional[int]): ID de agendamento a desconsiderar (edição).
+
+    Returns:
+        List[datetime]: Horários de início disponíveis, em ordem.
+    """
+    if duracao is None:
+        duracao = agendamento_repo.obter_duracao_servico(servico_id)
+    fim_janela = datetime.combine(a_partir_de.date() + timedelta(days=dias), time.min)
+
+    ocupados = [
+        (inicio, fim)
+        for ag_id, inicio, fim in agendamento_repo.listar_intervalos_ocupados(servico_id, a_partir_de, fim_janela)
+        if ag_id != agendamento_id
+    ]
+    return _varrer_horarios_livres(ocupados, a_partir_de, fim_janela, duracao, passo_minutos, quantidade)
 
 
-def sugerir_proximo_horario(servico_id: int, inicio: datetime, duracao: int) -> Optional[datetime]:
+def _alinhar(momento: datetime, base: datetime, passo: timedelta) -> datetime:
+    """Arredonda o momento para cima na grade base + k * passo."""
+    if momento <= base:
+        return base
+    return base + -(-(momento - base) // passo) * passo
+
+
+def _varrer_horarios_livres(
+    ocupados: List[Tuple[datetime, datetime]],
+    inicio: datetime,
+    fim: datetime,
+    duracao: int,
+    passo_minutos: int,
+    quantidade: int
+) -> List[datetime]:
+    delta = timedelta(minutes=duracao)
+    passo = timedelta(minutes=passo_minutos)
+    livres: List[datetime] = []
+    i = 0
+    ocupado_ate = datetime.min  # maior fim entre os intervalos já percorridos
+
+    dia = inicio.date()
+    while dia < fim.date() and len(livres) < quantidade:
+        if dia.weekday() not in DIAS_FECHADOS:
+            abertura = datetime.combine(dia, HORA_ABERTURA)
+            fechamento = datetime.combine(dia, HORA_FECHAMENTO)
+            candidato = _alinhar(inicio, abertura, passo)
+
+            while candidato + delta <= fechamento and len(livres) < quantidade:
+                # Consome os intervalos que começam antes do fim do candidato
+                while i < len(ocupados) and ocupados[i][0] < candidato + delta:
+                    ocupado_ate = max(ocupado_ate, ocupados[i][1])
+                    i += 1
+                if ocupado_ate > candidato:
+                    candidato = _alinhar(ocupado_ate, abertura, passo)
+                    continue
+                livres.append(candidato)
+                candidato += passo
+        dia += timedelta(days=1)
+
+    return livres
+
+
+def sugerir_proximo_horario(
+    servico_id: int,
+    inicio: datetime,
+    duracao: int,
+    agendamento_id: Optional[int] = None
+) -> Optional[datetime]:
     """
     Sugere o próximo horário disponível após um conflito.
 
@@ -176,19 +436,12 @@ def sugerir_proximo_horario(servico_id: int, inicio: datetime, duracao: int) ->
         servico_id (int): ID do serviço.
         inicio (datetime): Data e hora desejada.
         duracao (int): Duração do serviço em minutos.
+        agendamento_id (Optional[int]): ID do agendamento em edição.
 
     Returns:
-        Optional[datetime]: Próximo horário disponível.
+        Optional[datetime]: Próximo horário disponível em até 14 dias, ou None.
     """
-    fim = inicio + timedelta(minutes=duracao)
-    agendamentos = sorted(
-        agendamento_repo.listar_agendamentos_por_servico(servico_id),
-        key=lambda x: x.data_hora
+    horarios = buscar_horarios_disponiveis(
+        servico_id, inicio, quantidade=1, dias=14, duracao=duracao, agendamento_id=agendamento_id
     )
-    for ag in agendamentos:
-        ag_fim = ag.data_hora + timedelta(minutes=duracao)
-        if fim <= ag.data_hora:
-            return inicio
-        inicio = max(inicio, ag_fim)
-        fim = inicio + timedelta(minutes=duracao)
-    return inicio
+    return horarios[0] if horarios else None
@@ -5,12 +5,14 @@ Este módulo implementa a lógica de negócio para operações com clientes.
 Atua como intermediário entre o repositório de dados e a interface (front).
 """
 
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 from datetime import datetime
 from models.models import Cliente
+from infra.cache import cache_por_tabelas
 from repositories import cliente_repo
 
 
+@cache_por_tabelas("clientes")
 def listar_clientes() -> list[Cliente]:
     """
     Lista todos os clientes cadastrados.
@@ -21,6 +23,7 @@ def listar_clientes() -> list[Cliente]:
     return cliente_repo.listar_clientes()
 
 
+@cache_por_tabelas("clientes")
 def buscar_cliente(cliente_id: int) -> Optional[Cliente]:
     """
     Busca um cliente pelo seu ID.
@@ -34,6 +37,39 @@ def buscar_cliente(cliente_id: int) -> Optional[Cliente]:
     return cliente_repo.buscar_cliente(cliente_id)
 
 
+@cache_por_tabelas("clientes")
+def buscar_clientes(
+    termo: str = "",
+    limite: int = 50,
+    cursor_pagina: Optional[tuple] = None,
+    status: Optional[str] = None
+) -> Tuple[List[Cliente], Optional[tuple]]:
+    """
+    Busca clientes por nome, e-mail ou telefone, uma página por vez.
+
+    Args:
+        termo (str): Texto buscado (vazio lista todos).
+        limite (int): Clientes por página.
+        cursor_pagina (Optional[tuple]): Cursor devolvido pela página anterior.
+        status (Optional[str]): "ativos", "inativos" ou None.
+
+    Returns:
+        Tuple[List[Cliente], Optional[tuple]]: Clientes da página e cursor da próxima.
+    """
+    return cliente_repo.buscar_clientes(termo, limite, cursor_pagina, status)
+
+
+@cache_por_tabelas("clientes")
+def estatisticas_clientes() -> Tuple[int, int]:
+    """
+    Retorna o total de clientes e quantos visitaram o studio nos últimos 90 dias.
+
+    Returns:
+        Tuple[int, int]: Total de clientes e clientes ativos.
+    """
+    return cliente_repo.contar_clientes()
+
+
 def adicionar_cliente(
     nome: str,
     telefone: str,
@@ -57,6 +93,22 @@ def adicionar_cliente(
     return cliente_repo.adicionar_cliente(nome, telefone, email, observacoes)
 
 
+def adicionar_clientes_em_lote(clientes: List[Cliente]) -> List[Optional[int]]:
+    """
+    Adiciona vários clientes em uma única transação.
+
+    Args:
+        clientes (List[Cliente]): Clientes a inserir (id é ignorado).
+
+    Returns:
+        List[Optional[int]]: ID de cada cliente, na ordem recebida, ou None
+            para os que têm dados inválidos (não inseridos).
+    """
+    validos = [c for c in clientes if c.nome and c.nome.strip()]
+    ids = iter(cliente_repo.adicionar_clientes_em_lote(validos))
+    return [next(ids) if c.nome and c.nome.strip() else None for c in clientes]
+
+
 def atualizar_cliente(
     cliente_id: int,
     nome: str,
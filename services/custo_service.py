@@ -5,6 +5,7 @@ Serviço responsável pela lógica de negócios relacionada a custos.
 from typing import Optional, List
 from datetime import datetime
 from models.models import Custo
+from infra.cache import cache_por_tabelas
 from repositories import custo_repo
 import pandas as pd
 
@@ -38,6 +39,23 @@ def criar_custo(
         return None
 
 
+def criar_custos_em_lote(custos: List[Custo]) -> List[int]:
+    """
+    Cria vários custos em uma única transação (por exemplo, um extrato importado).
+
+    Args:
+        custos (List[Custo]): Custos a inserir (id é ignorado).
+
+    Returns:
+        List[int]: IDs criados, na ordem recebida, ou lista vazia em caso de erro.
+    """
+    try:
+        return custo_repo.adicionar_custos_em_lote(custos)
+    except Exception as e:
+        print(f"Erro ao criar custos em lote: {e}")
+        return []
+
+
 def editar_custo(
     custo_id: int,
     descricao: str,
@@ -78,6 +96,7 @@ def remover_custo(custo_id: int) -> bool:
     return custo_repo.excluir_custo(custo_id)
 
 
+@cache_por_tabelas("custos")
 def obter_custos(
     mes: Optional[int] = None,
     ano: Optional[int] = None,
@@ -97,6 +116,7 @@ def obter_custos(
     return custo_repo.listar_custos(mes, ano, tipo)
 
 
+@cache_por_tabelas("custos")
 def obter_custo_por_id(custo_id: int) -> Optional[Custo]:
     """
     Busca um custo pelo ID.
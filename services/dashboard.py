@@ -9,6 +9,7 @@ Data: 2025-04-29
 
 from datetime import datetime, timedelta
 from infra.database import get_connection
+from infra.cache import cache_por_tabelas
 from utils.formatters import converter_para_euro
 
 
@@ -35,11 +36,15 @@ def obter_aniversariantes_mes() -> list[tuple[int, str]]:
     return aniversariantes
 
 
+@cache_por_tabelas("clientes", "servicos", "agendamentos", ttl=60)
 def resumo_studio() -> dict:
     """
     Gera um resumo estatístico e financeiro do estúdio, incluindo métricas do dia,
     semana e mês, além de alertas para cancelamentos e agendamentos pendentes.
 
+    Todas as métricas vêm de uma única consulta com agregados condicionais,
+    executada em REPEATABLE READ para que os números sejam do mesmo snapshot.
+
     Returns:
         dict: Dicionário contendo:
             - total_clientes (int)
@@ -57,95 +62,93 @@ def resumo_studio() -> dict:
             - alerta_pendentes (bool)
             - pendentes_atrasados (int)
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    # Totais gerais
-    cursor.execute("SELECT COUNT(*) FROM clientes")
-    total_clientes = cursor.fetchone()[0]
-
-    cursor.execute("SELECT COUNT(*) FROM servicos")
-    total_servicos = cursor.fetchone()[0]
-
-    cursor.execute("SELECT COUNT(*) FROM agendamentos WHERE status = 'pendente'")
-    agendamentos_pendentes = cursor.fetchone()[0]
-
     hoje = datetime.now()
     inicio_mes = datetime(hoje.year, hoje.month, 1)
     fim_mes = datetime(hoje.year + 1, 1, 1) if hoje.month == 12 else datetime(hoje.year, hoje.month + 1, 1)
-
-    cursor.execute(
-        """
-        SELECT SUM(s.preco)
-        FROM agendamentos a
-        JOIN servicos s ON a.servico_id = s.id
-        WHERE a.status = 'realizado'
-          AND a.data_hora >= %s AND a.data_hora < %s
-        """,
-        (inicio_mes, fim_mes)
-    )
-    faturamento_mes = cursor.fetchone()[0] or 0
-
-    # Métricas do dia
     hoje_inicio = datetime(hoje.year, hoje.month, hoje.day)
     hoje_fim = hoje_inicio + timedelta(days=1)
-
-    cursor.execute(
-        "SELECT COUNT(*) FROM agendamentos WHERE data_hora >= %s AND data_hora < %s",
-        (hoje_inicio, hoje_fim)
-    )
-    agendamentos_hoje = cursor.fetchone()[0]
-
     semana_inicio = hoje - timedelta(days=hoje.weekday())
     semana_fim = semana_inicio + timedelta(days=7)
+    data_limite = hoje - timedelta(days=30)
 
-    cursor.execute(
-        "SELECT COUNT(*) FROM agendamentos WHERE data_hora >= %s AND data_hora < %s",
-        (semana_inicio, semana_fim)
-    )
-    agendamentos_semana = cursor.fetchone()[0]
+    parametros = {
+        "agora": hoje,
+        "inicio_mes": inicio_mes,
+        "fim_mes": fim_mes,
+        "hoje_inicio": hoje_inicio,
+        "hoje_fim": hoje_fim,
+        "semana_inicio": semana_inicio,
+        "semana_fim": semana_fim,
+        "data_limite": data_limite,
+        # Só entram no agregado os pendentes e as linhas a partir do período mais antigo
+        "desde": min(inicio_mes, hoje_inicio, semana_inicio, data_limite),
+    }
 
+    conn = get_connection()
+    cursor = conn.cursor()
+
+    # Todas as métricas em um único comando e um único snapshot (REPEATABLE READ)
     cursor.execute(
         """
-        SELECT SUM(s.preco), COUNT(DISTINCT a.id), COUNT(DISTINCT a.cliente_id)
+        SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY;
+        SELECT
+            (SELECT COUNT(*) FROM clientes),
+            (SELECT COUNT(*) FROM servicos),
+            COUNT(*) FILTER (WHERE a.status = 'pendente'),
+            SUM(a.valor) FILTER (
+                WHERE a.status = 'realizado'
+                  AND a.data_hora >= %(inicio_mes)s AND a.data_hora < %(fim_mes)s
+            ),
+            COUNT(*) FILTER (WHERE a.data_hora >= %(hoje_inicio)s AND a.data_hora < %(hoje_fim)s),
+            COUNT(*) FILTER (WHERE a.data_hora >= %(semana_inicio)s AND a.data_hora < %(semana_fim)s),
+            SUM(a.valor) FILTER (
+                WHERE a.status = 'realizado'
+                  AND a.data_hora >= %(hoje_inicio)s AND a.data_hora < %(hoje_fim)s
+            ),
+            COUNT(*) FILTER (
+                WHERE a.servico_id IS NOT NULL AND a.status = 'realizado'
+                  AND a.data_hora >= %(hoje_inicio)s AND a.data_hora < %(hoje_fim)s
+            ),
+            COUNT(DISTINCT a.cliente_id) FILTER (
+                WHERE a.servico_id IS NOT NULL AND a.status = 'realizado'
+                  AND a.data_hora >= %(hoje_inicio)s AND a.data_hora < %(hoje_fim)s
+            ),
+            COUNT(*) FILTER (WHERE a.status = 'cancelado' AND a.data_hora >= %(data_limite)s),
+            COUNT(*) FILTER (WHERE a.status = 'pendente' AND a.data_hora < %(agora)s)
         FROM agendamentos a
-        JOIN servicos s ON a.servico_id = s.id
-        WHERE a.status = 'realizado'
-          AND a.data_hora >= %s AND a.data_hora < %s
+        WHERE a.status = 'pendente' OR a.data_hora >= %(desde)s
         """,
-        (hoje_inicio, hoje_fim)
+        parametros
     )
-    faturamento_dia_row = cursor.fetchone()
-    faturamento_dia = faturamento_dia_row[0] or 0
-    atendimentos_dia = faturamento_dia_row[1] or 0
-    clientes_dia = faturamento_dia_row[2] or 0
+    row = cursor.fetchone()
+    conn.rollback()
+    cursor.close()
+    conn.close()
+
+    (
+        total_clientes,
+        total_servicos,
+        agendamentos_pendentes,
+        faturamento_mes,
+        agendamentos_hoje,
+        agendamentos_semana,
+        faturamento_dia,
+        atendimentos_dia,
+        clientes_dia,
+        cancelamentos_mes,
+        pendentes_atrasados,
+    ) = row
+
+    faturamento_mes = faturamento_mes or 0
+    faturamento_dia = faturamento_dia or 0
+    atendimentos_dia = atendimentos_dia or 0
+    clientes_dia = clientes_dia or 0
     ticket_medio_dia = faturamento_dia / atendimentos_dia if atendimentos_dia > 0 else 0
 
     # Alertas
-    data_limite = hoje - timedelta(days=30)
-    cursor.execute(
-        """
-        SELECT COUNT(*) FROM agendamentos
-        WHERE status = 'cancelado' AND data_hora >= %s
-        """,
-        (data_limite,)
-    )
-    cancelamentos_mes = cursor.fetchone()[0]
     alerta_cancelamentos = cancelamentos_mes > 10
-
-    cursor.execute(
-        """
-        SELECT COUNT(*) FROM agendamentos
-        WHERE status = 'pendente' AND data_hora < %s
-        """,
-        (hoje,)
-    )
-    pendentes_atrasados = cursor.fetchone()[0]
     alerta_pendentes = pendentes_atrasados > 5
 
-    cursor.close()
-    conn.close()
-
     return {
         "total_clientes": total_clientes,
         "total_servicos": total_servicos,
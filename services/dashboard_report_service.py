@@ -7,70 +7,101 @@ Autor: Maryucha M. Mariani
 Data: 2025-04-29
 """
 
-from typing import Tuple, Dict
+import os
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Tuple, Dict, List, Optional
 import pandas as pd
+from infra.cache import cache_por_tabelas
 
-from repositories.cliente_repo import listar_clientes
-from repositories.servico_repo import listar_servicos
-from repositories.agendamento_repo import listar_agendamentos
-from repositories.custo_repo import listar_custos
+from repositories import relatorio_repo
+from repositories import custo_repo
 
 
-def gerar_dataframe_base() -> pd.DataFrame:
+@cache_por_tabelas("agendamentos", "servicos", "clientes")
+def gerar_dataframe_base(
+    ano: Optional[int] = None,
+    mes: Optional[int] = None,
+    profissional: Optional[str] = None
+) -> pd.DataFrame:
     """
     Gera um DataFrame base contendo informações de agendamentos realizados.
 
+    Junção, filtros e colunas de data são resolvidos no banco; sem filtros,
+    retorna todo o histórico. As linhas chegam em lotes de um cursor no
+    servidor e cada lote vira um DataFrame antes de o próximo ser lido.
+
+    Args:
+        ano (Optional[int]): Ano dos atendimentos.
+        mes (Optional[int]): Mês dos atendimentos.
+        profissional (Optional[str]): Nome do profissional ou "Todos".
+
     Returns:
-        pd.DataFrame: DataFrame com colunas: Cliente, Serviço, Profissional, Data e Hora, Valor, Ano, Mês, Dia.
+        pd.DataFrame: DataFrame com colunas: Cliente, Serviço, Profissional, Data e Hora, Valor (R$), Ano, Mês, Dia.
     """
-    agendamentos = listar_agendamentos()
-    servicos = listar_servicos()
-    clientes = listar_clientes()
+    if profissional == "Todos":
+        profissional = None
+    lotes = [
+        pd.DataFrame.from_records(lote, columns=relatorio_repo.COLUNAS_ATENDIMENTOS)
+        for lote in relatorio_repo.iterar_atendimentos_realizados(ano, mes, profissional)
+    ]
+    if not lotes:
+        return pd.DataFrame(columns=relatorio_repo.COLUNAS_ATENDIMENTOS)
+    return pd.concat(lotes, ignore_index=True)
 
-    servico_precos = {s.id: s.preco for s in servicos}
-    servico_nomes = {s.id: s.nome for s in servicos}
-    servico_categorias = {s.id: s.categoria for s in servicos}
-    cliente_nomes = {c.id: c.nome for c in clientes}
 
-    realizados = [a for a in agendamentos if a.status == "realizado"]
+@cache_por_tabelas("faturamento_mensal", "agendamentos", "servicos")
+def listar_periodos_disponiveis() -> Dict[int, List[int]]:
+    """
+    Retorna os meses com atendimentos realizados, agrupados por ano.
 
-    df = pd.DataFrame([{
-        "Cliente": cliente_nomes.get(a.cliente_id, "Cliente não encontrado"),
-        "Serviço": servico_nomes.get(a.servico_id, "Serviço não encontrado"),
-        "Profissional": servico_categorias.get(a.servico_id, "Não definido"),
-        "Data e Hora": a.data_hora,
-        "Valor (R$)": servico_precos.get(a.servico_id, 0)
-    } for a in realizados])
+    Returns:
+        Dict[int, List[int]]: Ano (do mais recente) -> meses em ordem crescente.
+    """
+    periodos: Dict[int, List[int]] = {}
+    for ano, mes in relatorio_repo.listar_periodos_realizados():
+        periodos.setdefault(ano, []).append(mes)
+    return periodos
 
-    # Garante que as colunas existam mesmo se o DataFrame estiver vazio
-    if df.empty:
-        df = pd.DataFrame(columns=[
-            "Cliente", "Serviço", "Profissional", "Data e Hora", "Valor (R$)", "Ano", "Mês", "Dia"
-        ])
-    else:
-        df["Ano"] = df["Data e Hora"].dt.year
-        df["Mês"] = df["Data e Hora"].dt.month
-        df["Dia"] = df["Data e Hora"].dt.day
 
-    return df
+@cache_por_tabelas("faturamento_mensal", "agendamentos", "servicos")
+def listar_profissionais() -> List[str]:
+    """
+    Retorna os profissionais que possuem atendimentos realizados.
 
+    Returns:
+        List[str]: Profissionais em ordem alfabética.
+    """
+    return relatorio_repo.listar_profissionais_realizados()
 
-def filtrar_dataframe(df: pd.DataFrame, profissional: str, ano: int, mes: int) -> pd.DataFrame:
+
+@cache_por_tabelas("custos")
+def calcular_custos_meses(periodos: List[Tuple[int, int]]) -> Dict[Tuple[int, int], Tuple[float, float, float]]:
     """
-    Aplica os filtros de profissional, ano e mês ao DataFrame base.
+    Calcula os custos fixos, variáveis e totais de vários meses com uma única consulta.
 
     Args:
-        df (pd.DataFrame): DataFrame base.
-        profissional (str): Nome do profissional ou "Todos".
-        ano (int): Ano selecionado.
-        mes (int): Mês selecionado.
+        periodos (List[Tuple[int, int]]): Pares (ano, mês).
 
     Returns:
-        pd.DataFrame: DataFrame filtrado.
+        Dict[Tuple[int, int], Tuple[float, float, float]]: (ano, mês) -> custos fixos, variáveis e total.
     """
-    if profissional != "Todos":
-        df = df[df["Profissional"] == profissional]
-    return df[(df["Ano"] == ano) & (df["Mês"] == mes)]
+    if not periodos:
+        return {}
+    inicio = min(periodos)
+    ultimo_ano, ultimo_mes = max(periodos)
+    fim = (ultimo_ano + 1, 1) if ultimo_mes == 12 else (ultimo_ano, ultimo_mes + 1)
+    somas = custo_repo.somar_custos_por_mes(datetime(*inicio, 1), datetime(*fim, 1))
+
+    custos = {}
+    for periodo in periodos:
+        por_tipo = somas.get(periodo, {})
+        fixos = por_tipo.get("fixo", 0)
+        variaveis = por_tipo.get("variavel", 0)
+        custos[periodo] = (fixos, variaveis, fixos + variaveis)
+    return custos
 
 
 def calcular_custos_mes(ano: int, mes: int) -> Tuple[float, float, float]:
@@ -84,35 +115,52 @@ def calcular_custos_mes(ano: int, mes: int) -> Tuple[float, float, float]:
     Returns:
         Tuple[float, float, float]: Custos fixos, variáveis e total.
     """
-    custos = listar_custos()
-    custos_mes = [c for c in custos if c.data.year == ano and c.data.month == mes]
+    return calcular_custos_meses([(ano, mes)])[(ano, mes)]
 
-    fixos = sum(c.valor for c in custos_mes if c.tipo == "fixo")
-    variaveis = sum(c.valor for c in custos_mes if c.tipo == "variavel")
-    total = fixos + variaveis
 
-    return fixos, variaveis, total
+@cache_por_tabelas("faturamento_mensal", "agendamentos", "servicos")
+def obter_resumo_faturamento(ano: int, mes: int, profissional: str = "Todos") -> Dict[str, float]:
+    """
+    Retorna faturamento, atendimentos e ticket médio do mês a partir do consolidado mensal.
 
+    Args:
+        ano (int): Ano selecionado.
+        mes (int): Mês selecionado.
+        profissional (str): Nome do profissional ou "Todos".
+
+    Returns:
+        Dict[str, float]: Dicionário com faturamento, atendimentos e ticket_medio.
+    """
+    faturamento, qtd = relatorio_repo.obter_faturamento_mensal(
+        ano, mes, None if profissional == "Todos" else profissional
+    )
+    return {
+        "faturamento": faturamento,
+        "atendimentos": qtd,
+        "ticket_medio": faturamento / qtd if qtd else 0
+    }
 
-def calcular_metricas(df_base: pd.DataFrame, custos: Tuple[float, float, float]) -> Dict[str, float]:
+
+def calcular_metricas(ano: int, mes: int, profissional: str, custos: Tuple[float, float, float]) -> Dict[str, float]:
     """
     Calcula métricas principais do relatório como faturamento, lucro e ticket médio.
 
     Args:
-        df_base (pd.DataFrame): DataFrame filtrado.
+        ano (int): Ano selecionado.
+        mes (int): Mês selecionado.
+        profissional (str): Nome do profissional ou "Todos".
         custos (Tuple[float, float, float]): Custos fixos, variáveis e total.
 
     Returns:
         Dict[str, float]: Dicionário com métricas financeiras.
     """
-    faturamento = df_base["Valor (R$)"].sum()
-    qtd = len(df_base)
-    ticket_medio = faturamento / qtd if qtd else 0
-    lucro = faturamento - custos[2]
+    resumo = obter_resumo_faturamento(ano, mes, profissional)
+    lucro = resumo["faturamento"] - custos[2]
 
     return {
-        "faturamento": faturamento,
-        "ticket_medio": ticket_medio,
+        "faturamento": resumo["faturamento"],
+        "atendimentos": resumo["atendimentos"],
+        "ticket_medio": resumo["ticket_medio"],
         "lucro_liquido": lucro,
         "custos_fixos": custos[0],
         "custos_variaveis": custos[1],
@@ -120,18 +168,149 @@ def calcular_metricas(df_base: pd.DataFrame, custos: Tuple[float, float, float])
     }
 
 
-def gerar_csv(df: pd.DataFrame, ano: int, mes: int) -> Tuple[str, str]:
+def reconstruir_faturamento_mensal() -> int:
+    """
+    Recalcula do zero o consolidado de faturamento mensal.
+
+    Returns:
+        int: Quantidade de linhas (ano, mês, profissional, serviço) geradas.
+    """
+    return relatorio_repo.reconstruir_faturamento_mensal()
+
+
+FORMATOS_EXPORTACAO = {
+    "CSV": (".csv", "text/csv"),
+    "Parquet": (".parquet", "application/vnd.apache.parquet"),
+}
+
+
+def _esquema_parquet():
+    import pyarrow as pa
+
+    return pa.schema([
+        ("Cliente", pa.string()),
+        ("Serviço", pa.string()),
+        ("Profissional", pa.string()),
+        ("Data e Hora", pa.timestamp("us")),
+        ("Valor (R$)", pa.float64()),
+        ("Ano", pa.int32()),
+        ("Mês", pa.int32()),
+        ("Dia", pa.int32()),
+    ])
+
+
+def _escrever_parquet(caminho: str, ano: Optional[int], mes: Optional[int], profissional: Optional[str]) -> int:
+    """
+    Grava os atendimentos em Parquet, um row group por lote do cursor no servidor.
+
+    Returns:
+        int: Quantidade de linhas exportadas.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    esquema = _esquema_parquet()
+    total = 0
+    with pq.ParquetWriter(caminho, esquema) as escritor:
+        for lote in relatorio_repo.iterar_atendimentos_realizados(ano, mes, profissional):
+            colunas = [list(c) for c in zip(*lote)]
+            colunas[4] = [float(v) for v in colunas[4]]
+            escritor.write_batch(pa.record_batch(colunas, schema=esquema))
+            total += len(lote)
+    return total
+
+
+def diretorio_exportacao() -> Path:
+    """Diretório dos arquivos exportados (EXPORTACAO_DIR, padrão: studio_exportacoes no temp do sistema)."""
+    return Path(os.getenv("EXPORTACAO_DIR") or Path(tempfile.gettempdir()) / "studio_exportacoes")
+
+
+def limpar_exportacoes_antigas(maximo: Optional[int] = None, idade_max_horas: Optional[float] = None) -> int:
     """
-    Gera o conteúdo e o nome do arquivo CSV para exportação.
+    Apaga as exportações mais antigas que o limite de idade ou além da quantidade máxima.
+
+    Os arquivos ficam na sessão de quem os gerou e só são removidos por ela se
+    os filtros mudarem; esta limpeza cobre as sessões encerradas.
 
     Args:
-        df (pd.DataFrame): DataFrame filtrado.
-        ano (int): Ano selecionado.
-        mes (int): Mês selecionado.
+        maximo (Optional[int]): Quantidade mantida (padrão EXPORTACAO_MAX_ARQUIVOS, 20).
+        idade_max_horas (Optional[float]): Idade máxima (padrão EXPORTACAO_MAX_HORAS, 2).
+
+    Returns:
+        int: Quantidade de arquivos apagados.
+    """
+    maximo = maximo if maximo is not None else int(os.getenv("EXPORTACAO_MAX_ARQUIVOS", "20"))
+    if idade_max_horas is None:
+        idade_max_horas = float(os.getenv("EXPORTACAO_MAX_HORAS", "2"))
+    pasta = diretorio_exportacao()
+    if not pasta.is_dir():
+        return 0
+
+    arquivos = []
+    for arquivo in pasta.glob("relatorio_*"):
+        try:
+            arquivos.append((arquivo.stat().st_mtime, arquivo))
+        except FileNotFoundError:  # apagado por outra sessão
+            pass
+    arquivos.sort(reverse=True)
+
+    limite = time.time() - idade_max_horas * 3600
+    apagados = 0
+    for posicao, (modificado, arquivo) in enumerate(arquivos):
+        if posicao < maximo and modificado >= limite:
+            continue
+        try:
+            arquivo.unlink()
+            apagados += 1
+        except FileNotFoundError:
+            pass
+    return apagados
+
+
+def exportar_relatorio(
+    formato: str,
+    ano: Optional[int] = None,
+    mes: Optional[int] = None,
+    profissional: str = "Todos"
+) -> Tuple[str, str, int]:
+    """
+    Exporta os atendimentos realizados para um arquivo temporário em CSV ou Parquet.
+
+    O CSV é gerado pelo COPY do PostgreSQL e o Parquet é escrito lote a lote a
+    partir de um cursor no servidor: nenhum dos dois monta o resultado inteiro
+    em memória. Sem ano, exporta todo o histórico. O arquivo é gravado em
+    diretorio_exportacao(); o chamador deve removê-lo depois de usá-lo, e os
+    esquecidos são apagados por limpar_exportacoes_antigas a cada nova
+    exportação. A entrega pelo st.download_button não é em streaming: ele lê
+    o arquivo inteiro para a memória.
+
+    Args:
+        formato (str): "CSV" ou "Parquet".
+        ano (Optional[int]): Ano selecionado (None para todo o histórico).
+        mes (Optional[int]): Mês selecionado.
+        profissional (str): Nome do profissional ou "Todos".
 
     Returns:
-        Tuple[str, str]: Conteúdo CSV codificado e nome do arquivo.
+        Tuple[str, str, int]: Caminho do arquivo temporário, nome sugerido para
+            download e quantidade de linhas exportadas.
     """
-    csv = df.to_csv(index=False, sep=";").encode("utf-8")
-    nome_arquivo = f"relatorio_faturamento_{ano}_{mes}.csv"
-    return csv, nome_arquivo
+    extensao, _ = FORMATOS_EXPORTACAO[formato]
+    profissional = None if profissional == "Todos" else profissional
+    periodo = f"{ano}_{mes}" if ano else "completo"
+    nome_arquivo = f"relatorio_faturamento_{periodo}{extensao}"
+
+    pasta = diretorio_exportacao()
+    pasta.mkdir(parents=True, exist_ok=True)
+    arquivo = tempfile.NamedTemporaryFile(prefix="relatorio_", suffix=extensao, dir=pasta, delete=False)
+    try:
+        if formato == "CSV":
+            with arquivo:
+                linhas = relatorio_repo.copiar_atendimentos_csv(arquivo, ano, mes, profissional)
+        else:
+            arquivo.close()
+            linhas = _escrever_parquet(arquivo.name, ano, mes, profissional)
+    except Exception:
+        os.remove(arquivo.name)
+        raise
+    limpar_exportacoes_antigas()
+    return arquivo.name, nome_arquivo, linhas
@@ -0,0 +1,105 @@
+"""
+Serviço de disponibilidade da agenda.
+
+Monta a matriz de ocupação serviços × horários de uma semana inteira com
+aritmética de intervalos vetorizada (NumPy), a partir de uma única leitura dos
+agendamentos do período.
+"""
+
+from datetime import datetime, timedelta, time
+from typing import List, Tuple
+
+import numpy as np
+
+from models.models import Servico
+from infra.cache import cache_por_tabelas
+from repositories import agendamento_repo, servico_repo
+from services.agendamento_service import HORA_ABERTURA, HORA_FECHAMENTO, DIAS_FECHADOS, PASSO_MINUTOS
+
+
+def _matriz_ocupacao(
+    linhas: np.ndarray,
+    inicios: np.ndarray,
+    fins: np.ndarray,
+    n_linhas: int,
+    n_slots: int,
+    passo_minutos: int
+) -> np.ndarray:
+    """
+    Marca os slots ocupados por cada intervalo usando um array de diferenças.
+
+    Args:
+        linhas (np.ndarray): Linha (serviço) de cada intervalo.
+        inicios (np.ndarray): Início de cada intervalo, em minutos desde o início da grade.
+        fins (np.ndarray): Fim de cada intervalo, em minutos desde o início da grade.
+        n_linhas (int): Quantidade de serviços.
+        n_slots (int): Quantidade de slots da grade.
+        passo_minutos (int): Tamanho de cada slot.
+
+    Returns:
+        np.ndarray: Matriz booleana (n_linhas × n_slots), True onde o slot está ocupado.
+    """
+    # O slot k cobre [k * passo, (k + 1) * passo); o intervalo ocupa de floor(inicio / passo)
+    # até ceil(fim / passo) - 1.
+    primeiro = np.clip(inicios // passo_minutos, 0, n_slots)
+    ultimo = np.clip(-(-fins // passo_minutos), 0, n_slots)
+
+    diferencas = np.zeros((n_linhas, n_slots + 1), dtype=np.int32)
+    np.add.at(diferencas, (linhas, primeiro), 1)
+    np.add.at(diferencas, (linhas, ultimo), -1)
+    return np.cumsum(diferencas[:, :-1], axis=1) > 0
+
+
+@cache_por_tabelas("agendamentos", "servicos")
+def calcular_matriz_ocupacao(
+    inicio: datetime,
+    dias: int = 7,
+    passo_minutos: int = PASSO_MINUTOS
+) -> Tuple[List[Servico], List[datetime], np.ndarray]:
+    """
+    Calcula a ocupação de todos os serviços nos horários de funcionamento dos próximos dias.
+
+    Args:
+        inicio (datetime): Dia inicial (a grade começa à meia-noite desse dia).
+        dias (int): Quantidade de dias.
+        passo_minutos (int): Tamanho de cada slot em minutos.
+
+    Returns:
+        Tuple[List[Servico], List[datetime], np.ndarray]: Serviços (linhas), início de cada
+        slot dentro do horário de funcionamento (colunas) e matriz booleana de ocupação.
+    """
+    servicos = servico_repo.listar_servicos()
+    grade_inicio = datetime.combine(inicio.date(), time.min)
+    grade_fim = grade_inicio + timedelta(days=dias)
+    n_slots = dias * 24 * 60 // passo_minutos
+
+    linha_por_servico = {s.id: i for i, s in enumerate(servicos)}
+    ocupados = [
+        (linha_por_servico[servico_id], ag_inicio, ag_fim)
+        for servico_id, ag_inicio, ag_fim in agendamento_repo.listar_intervalos_periodo(grade_inicio, grade_fim)
+        if servico_id in linha_por_servico
+    ]
+
+    base = np.datetime64(grade_inicio, "m")
+    if ocupados:
+        linhas = np.fromiter((o[0] for o in ocupados), dtype=np.int64, count=len(ocupados))
+        inicios = (np.array([o[1] for o in ocupados], dtype="datetime64[m]") - base).astype(np.int64)
+        fins = (np.array([o[2] for o in ocupados], dtype="datetime64[m]") - base).astype(np.int64)
+    else:
+        linhas = inicios = fins = np.empty(0, dtype=np.int64)
+    ocupacao = _matriz_ocupacao(linhas, inicios, fins, len(servicos), n_slots, passo_minutos)
+
+    # Mantém apenas os slots inteiros dentro do horário de funcionamento
+    minutos = np.arange(n_slots) * passo_minutos
+    minuto_do_dia = minutos % (24 * 60)
+    dia_semana = (grade_inicio.weekday() + minutos // (24 * 60)) % 7
+    abertura = HORA_ABERTURA.hour * 60 + HORA_ABERTURA.minute
+    fechamento = HORA_FECHAMENTO.hour * 60 + HORA_FECHAMENTO.minute
+    mascara = (
+        (minuto_do_dia >= abertura)
+        & (minuto_do_dia + passo_minutos <= fechamento)
+        & ~np.isin(dia_semana, list(DIAS_FECHADOS))
+    )
+
+    slots = [grade_inicio + timedelta(minutes=int(m)) for m in minutos[mascara]]
+    return servicos, slots, ocupacao[:, mascara]
@@ -6,8 +6,10 @@ as operações entre a camada de repositório e a camada de apresentação.
 
 from typing import Optional, List, Tuple
 from models.models import Servico
+from infra.cache import cache_por_tabelas
 from repositories import servico_repo
 
+@cache_por_tabelas("servicos")
 def obter_servicos() -> List[Servico]:
     """
     Retorna todos os serviços cadastrados, ordenados por categoria e nome.
@@ -17,6 +19,7 @@ def obter_servicos() -> List[Servico]:
     """
     return servico_repo.listar_servicos()
 
+@cache_por_tabelas("servicos")
 def buscar_servico_por_id(servico_id: int) -> Optional[Servico]:
     """
     Busca um serviço pelo seu ID.
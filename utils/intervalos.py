@@ -0,0 +1,46 @@
+"""
+intervalos.py
+Estrutura de consulta de sobreposição de intervalos de tempo.
+"""
+from bisect import bisect_left
+from datetime import datetime
+from itertools import accumulate
+from typing import Iterable, List, Tuple
+
+
+class IndiceIntervalos:
+    """
+    Índice de intervalos [inicio, fim) ordenados pelo início.
+
+    Guarda, para cada posição, o maior fim entre os intervalos até ela. Os
+    intervalos que começam antes do fim de um candidato formam um prefixo da
+    lista ordenada, então basta uma busca binária e uma comparação com o maior
+    fim desse prefixo: cada verificação custa O(log n).
+    """
+
+    def __init__(self, intervalos: Iterable[Tuple[datetime, datetime]]):
+        self._intervalos = sorted(intervalos)
+        self._inicios = [inicio for inicio, _ in self._intervalos]
+        self._maior_fim = list(accumulate((fim for _, fim in self._intervalos), max))
+
+    def __len__(self) -> int:
+        return len(self._intervalos)
+
+    @property
+    def intervalos(self) -> List[Tuple[datetime, datetime]]:
+        """Intervalos ordenados pelo início."""
+        return list(self._intervalos)
+
+    def sobrepoe(self, inicio: datetime, fim: datetime) -> bool:
+        """
+        Verifica se [inicio, fim) se sobrepõe a algum intervalo do índice.
+
+        Args:
+            inicio (datetime): Início do intervalo candidato.
+            fim (datetime): Fim do intervalo candidato.
+
+        Returns:
+            bool: True se houver sobreposição.
+        """
+        pos = bisect_left(self._inicios, fim)
+        return pos > 0 and self._maior_fim[pos - 1] > inicio
@@ -0,0 +1,127 @@
+"""
+painel_dev.py
+
+Painel de desenvolvedor exibido na barra lateral com as consultas ao banco
+feitas pelo rerun atual da página e o uso do cache de leituras. Só aparece com
+DEV_PAINEL_CONSULTAS=1.
+
+As mesmas chamadas delimitam o perfil opcional do rerun (infra.perfil,
+PERFIL_PAGINAS=1 ou ?perfil=1 na URL).
+
+Uso em cada página:
+    iniciar_pagina()                # logo após st.set_page_config
+    try:
+        ...
+        mostrar_painel_consultas()  # no final do script
+    finally:
+        encerrar_pagina()           # também quando st.stop/st.rerun interrompem a página
+"""
+
+import sys
+import threading
+from typing import Optional
+
+import pandas as pd
+import streamlit as st
+
+from infra import instrumentacao, perfil
+from infra.cache import estatisticas_cache
+from infra.database import estatisticas_pool
+
+
+# perfil do rerun em andamento; fora do st.session_state porque, depois de um
+# st.stop/st.rerun, qualquer acesso a ele levanta a interrupção de novo
+_thread = threading.local()
+
+
+def iniciar_pagina() -> None:
+    """Marca o início de um rerun, zerando as consultas registradas da sessão."""
+    if instrumentacao.ativa():
+        instrumentacao.iniciar_rerun()
+
+    encerrar_pagina()  # página sem o try/finally de encerrar_pagina
+    pagina = sys._getframe(1).f_globals.get("__file__", "pagina")
+    pedido = st.query_params.get("perfil", "").lower() in ("1", "true", "sim")
+    _thread.perfil = perfil.iniciar(pagina, pedido)
+
+
+def _retirar_perfil() -> Optional[perfil.PerfilRerun]:
+    atual = getattr(_thread, "perfil", None)
+    _thread.perfil = None
+    return atual
+
+
+def encerrar_pagina() -> None:
+    """
+    Para e descarta o perfil de um rerun interrompido (st.stop, st.rerun, exceção).
+
+    Não faz nada se mostrar_painel_consultas já gravou o perfil. Não usa a API
+    do Streamlit, então pode ser chamada no finally de uma página interrompida.
+    """
+    atual = _retirar_perfil()
+    if atual is not None:
+        atual.parar()
+
+
+def _finalizar_perfil() -> None:
+    atual = _retirar_perfil()
+    if atual is None:
+        return
+    caminho = atual.gravar()
+    if caminho is not None and st.query_params.get("perfil"):
+        st.sidebar.caption(f"🔬 Perfil gravado em {caminho}")
+
+
+def mostrar_painel_consultas(top_n: Optional[int] = None) -> None:
+    """
+    Exibe na barra lateral o total de consultas, o tempo no banco e as mais lentas.
+
+    Args:
+        top_n (Optional[int]): Quantidade de consultas listadas (padrão DEV_PAINEL_TOP_N).
+    """
+    _finalizar_perfil()
+    if not instrumentacao.ativa():
+        return
+
+    resumo = instrumentacao.resumo_rerun(top_n)
+
+    with st.sidebar.expander("🛠️ Consultas deste rerun", expanded=False):
+        col1, col2 = st.columns(2)
+        col1.metric("Consultas", resumo["total_consultas"])
+        col2.metric("Tempo no banco", f"{resumo['tempo_total_ms']:.1f} ms")
+
+        if resumo["mais_lentas"]:
+            st.caption("Mais lentas")
+            st.dataframe(pd.DataFrame([{
+                "ms": round(r.duracao_ms, 2),
+                "Linhas": r.linhas,
+                "Origem": r.origem,
+                "SQL": r.sql[:200],
+                "Parâmetros": r.parametros,
+            } for r in resumo["mais_lentas"]]), use_container_width=True, hide_index=True)
+
+            st.caption("Por função")
+            st.dataframe(pd.DataFrame([{
+                "Origem": origem,
+                "Consultas": item["consultas"],
+                "ms": round(item["tempo_ms"], 2),
+            } for origem, item in sorted(
+                resumo["por_origem"].items(), key=lambda i: i[1]["tempo_ms"], reverse=True
+            )]), use_container_width=True, hide_index=True)
+
+        cache = estatisticas_cache()
+        if cache:
+            st.caption("Cache por função (desde o início do processo)")
+            st.dataframe(pd.DataFrame([{
+                "Função": nome,
+                "Hits": item["hits"],
+                "Misses": item["misses"],
+            } for nome, item in sorted(cache.items())]), use_container_width=True, hide_index=True)
+
+        pool = estatisticas_pool()
+        if pool:
+            st.caption(
+                f"Pool: {pool['abertas']} abertas, {pool['ociosas']} ociosas · "
+                f"{pool['reaproveitadas']}/{pool['checkouts']} reaproveitadas · "
+                f"{pool['esperas']} esperas · checkout médio {pool['tempo_checkout_ms_medio']:.2f} ms"
+            )